@@ -0,0 +1,95 @@
+"""
+Сравнение сериализаторов JsonFormatter с прежней реализацией
+
+Запуск: python -m benchmarks.bench_formatters
+"""
+
+import dataclasses
+import json
+import timeit
+from datetime import datetime
+from decimal import Decimal
+from flash_gate.transmitter.enums import EventAction, EventType
+from flash_gate.transmitter.formatters import JsonFormatter, orjson
+from .fixtures import CONFIG, make_balance, make_order, make_order_book
+
+NUMBER = 10_000
+
+
+class AsdictEncoder(json.JSONEncoder):
+    """
+    Кодировщик в том виде, в котором он был до появления сериализаторов
+    """
+
+    def default(self, obj):
+        if dataclasses.is_dataclass(obj):
+            return dataclasses.asdict(obj)
+        if isinstance(obj, Decimal):
+            return str(obj.normalize())
+        if isinstance(obj, datetime):
+            return int(obj.timestamp() * 1_000_000)
+        return json.JSONEncoder.default(self, obj)
+
+
+def legacy_format(event: dict) -> str:
+    template = {
+        "event_id": None,
+        "event": EventType.DATA,
+        "exchange": "exmo",
+        "node": "gate",
+        "instance": "1",
+        "algo": "3m_maker",
+        "action": None,
+        "message": None,
+        "timestamp": int(datetime.now().timestamp() * 1_000_000),
+        "data": None,
+    }
+    filled = template.copy()
+    for key, value in event.items():
+        filled[key] = value
+    return json.dumps(filled, cls=AsdictEncoder)
+
+
+def make_formatter(serializer: str) -> JsonFormatter:
+    config = json.loads(json.dumps(CONFIG))
+    config["data"]["configs"]["gate_config"]["gate"]["serializer"] = serializer
+    return JsonFormatter(config)
+
+
+PAYLOADS = {
+    "order_book": {
+        "event_id": "1",
+        "action": EventAction.ORDER_BOOK_UPDATE,
+        "data": make_order_book(),
+    },
+    "orders": {
+        "event_id": "1",
+        "action": EventAction.ORDERS_UPDATE,
+        "data": [make_order()],
+    },
+    "balance": {
+        "event_id": "1",
+        "action": EventAction.BALANCE_UPDATE,
+        "data": make_balance(),
+    },
+}
+
+
+def bench(function, event: dict) -> float:
+    seconds = min(timeit.repeat(lambda: function(event), number=NUMBER, repeat=5))
+    return seconds / NUMBER * 1_000_000
+
+
+def main():
+    formatters = {"legacy": legacy_format, "json": make_formatter("json").format}
+    if orjson is not None:
+        formatters["orjson"] = make_formatter("orjson").format
+
+    print(f"{'payload':>12}" + "".join(f"{name + ', us':>14}" for name in formatters))
+    for name, event in PAYLOADS.items():
+        timings = [bench(formatter, event) for formatter in formatters.values()]
+        print(f"{name:>12}" + "".join(f"{timing:>14.2f}" for timing in timings))
+
+
+if __name__ == "__main__":
+    main()
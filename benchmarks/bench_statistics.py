@@ -0,0 +1,57 @@
+"""
+Сравнение расчёта процентилей задержек по списку и по гистограмме
+
+Запуск: python -m benchmarks.bench_statistics
+"""
+
+import random
+import timeit
+from flash_gate.gate.statistics import LatencyHistogram, latency_percentile
+
+# Количество задержек, накопленных за одну секунду при разной частоте запросов
+SIZES = [100, 1_000, 10_000, 100_000]
+REPEAT = 5
+
+
+def make_latencies(size: int) -> list[int]:
+    rng = random.Random(size)
+    return [int(rng.lognormvariate(9, 0.5)) for _ in range(size)]
+
+
+def bench_list(latencies: list[int]) -> float:
+    def run():
+        data = []
+        for latency in latencies:
+            data.append(latency)
+        latency_percentile(data)
+
+    return min(timeit.repeat(run, number=1, repeat=REPEAT))
+
+
+def bench_histogram(latencies: list[int]) -> float:
+    histogram = LatencyHistogram()
+
+    def run():
+        histogram.reset()
+        for latency in latencies:
+            histogram.record(latency)
+        histogram.percentiles()
+
+    return min(timeit.repeat(run, number=1, repeat=REPEAT))
+
+
+def main():
+    print(f"{'size':>10} {'list, ms':>12} {'histogram, ms':>15} {'speedup':>10}")
+    for size in SIZES:
+        latencies = make_latencies(size)
+        list_time = bench_list(latencies)
+        histogram_time = bench_histogram(latencies)
+        speedup = list_time / histogram_time
+        print(
+            f"{size:>10} {list_time * 1000:>12.2f} "
+            f"{histogram_time * 1000:>15.2f} {speedup:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""
+Реалистичные данные для бенчмарков
+"""
+
+import dataclasses
+import random
+from datetime import datetime, timezone
+from decimal import Decimal
+from enum import Enum
+
+CONFIG = {
+    "algo": "3m_maker",
+    "data": {
+        "configs": {
+            "gate_config": {
+                "info": {"node": "gate", "instance": "1"},
+                "exchange": {"exchange_id": "exmo"},
+                "gate": {},
+            }
+        }
+    },
+}
+
+
+def make_gate_config(accounts: int = 1, private_limit: float | None = None) -> dict:
+    """
+    Получить полную конфигурацию гейта, все подключения которого идут
+    с локального адреса
+    """
+    localhost = ["127.0.0.1"]
+    return {
+        "algo": "3m_maker",
+        "data": {
+            "markets": [{"common_symbol": "BTC/USDT"}],
+            "assets_labels": [{"common": "BTC"}, {"common": "USDT"}],
+            "configs": {
+                "gate_config": {
+                    "info": {"node": "gate", "instance": "1"},
+                    "exchange": {
+                        "exchange_id": "exmo",
+                        "credentials": {
+                            "api_key": "key",
+                            "secret_key": "secret",
+                            "password": "",
+                        },
+                        "timeout_ms": 10_000,
+                        "is_test_keys": False,
+                        "accounts": [
+                            {"apiKey": f"key-{i}", "secret": f"secret-{i}"}
+                            for i in range(accounts)
+                        ],
+                    },
+                    "rate_limits": {
+                        "enable_ccxt_rate_limiter": False,
+                        "api_requests_per_seconds": {
+                            "public": {"ip_list": localhost},
+                            "private": {"ip_list": localhost, "limit": private_limit},
+                        },
+                        "fetch_orderbooks": True,
+                        "subscribe_timeout": 1,
+                    },
+                    "data_collection_method": {"order_book": "rest"},
+                    "gate": {"order_book_depth": 10},
+                }
+            },
+        },
+    }
+
+
+class OrderStatus(str, Enum):
+    OPEN = "open"
+
+
+@dataclasses.dataclass
+class Order:
+    """
+    Ордер в том же виде, в котором его возвращает rock
+    """
+
+    id: str
+    client_order_id: str
+    symbol: str
+    type: str
+    side: str
+    price: Decimal
+    amount: Decimal
+    filled: Decimal
+    status: OrderStatus
+    timestamp: datetime
+
+
+@dataclasses.dataclass
+class Asset:
+    free: Decimal
+    used: Decimal
+    total: Decimal
+
+
+@dataclasses.dataclass
+class Balance:
+    """
+    Баланс в том же виде, в котором его возвращает rock
+    """
+
+    assets: dict[str, Asset]
+    timestamp: datetime
+
+
+def make_order_book(symbol: str = "BTC/USDT", depth: int = 10) -> dict:
+    rng = random.Random(symbol)
+    mid = rng.uniform(100, 30_000)
+    bids = [[round(mid - i / 2, 2), round(rng.uniform(0, 5), 6)] for i in range(depth)]
+    asks = [[round(mid + i / 2, 2), round(rng.uniform(0, 5), 6)] for i in range(depth)]
+    return {
+        "symbol": symbol,
+        "bids": bids,
+        "asks": asks,
+        "timestamp": 1_656_633_600_000_000,
+    }
+
+
+def make_ccxt_order_book(symbol: str = "BTC/USDT", depth: int = 10) -> dict:
+    order_book = make_order_book(symbol, depth)
+    order_book["timestamp"] = 1_656_633_600_000
+    order_book["datetime"] = "2022-07-01T00:00:00.000Z"
+    order_book["nonce"] = None
+    return order_book
+
+
+def make_ccxt_order(order_id: str = "28456703391") -> dict:
+    return {
+        "id": order_id,
+        "clientOrderId": None,
+        "timestamp": 1_656_633_600_000,
+        "datetime": "2022-07-01T00:00:00.000Z",
+        "lastTradeTimestamp": None,
+        "status": "open",
+        "symbol": "BTC/USDT",
+        "type": "limit",
+        "timeInForce": None,
+        "postOnly": None,
+        "side": "buy",
+        "price": 20_000.1,
+        "stopPrice": None,
+        "cost": 0.0,
+        "amount": 0.001,
+        "filled": 0.0,
+        "remaining": 0.001,
+        "average": None,
+        "trades": [],
+        "fee": None,
+        "info": {"order_id": int(order_id), "client_id": 0},
+        "fees": [],
+    }
+
+
+def make_order(order_id: str = "28456703391") -> Order:
+    return Order(
+        id=order_id,
+        client_order_id="5f9b8a2e-8d6c-4f3e-9a1b-2c3d4e5f6a7b",
+        symbol="BTC/USDT",
+        type="limit",
+        side="buy",
+        price=Decimal("20000.10"),
+        amount=Decimal("0.00100000"),
+        filled=Decimal("0"),
+        status=OrderStatus.OPEN,
+        timestamp=datetime(2022, 7, 1, tzinfo=timezone.utc),
+    )
+
+
+def make_balance(assets: tuple[str, ...] = ("BTC", "USDT", "ETH")) -> Balance:
+    return Balance(
+        assets={
+            asset: Asset(Decimal("1.5"), Decimal("0.25"), Decimal("1.75"))
+            for asset in assets
+        },
+        timestamp=datetime(2022, 7, 1, tzinfo=timezone.utc),
+    )
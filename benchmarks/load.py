@@ -0,0 +1,199 @@
+"""
+Нагрузочный тест гейта против локальной имитации биржи
+
+Гейт выставляет, запрашивает и отменяет ордера на MockExmo с заданной
+частотой команд. Сообщения ядра подаются прямо в обработчик гейта,
+ответы считает передатчик-счётчик, поэтому тест не требует Aeron,
+сети и ключей биржи
+
+Запуск: python -m benchmarks.load --rate 200 --duration 10 --latency 0.02
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import time
+import uuid
+from urllib.parse import urlsplit
+from flash_gate.gate import Gate
+from flash_gate.replay.stub import ReplayTransmitter
+from flash_gate.transmitter.enums import EventAction, EventType
+from .fixtures import make_gate_config
+from .mock_exchange import MockExmo
+
+SYMBOL = "BTC/USDT"
+
+# Цикл команд для одного ордера
+ACTIONS = (
+    EventAction.CREATE_ORDERS,
+    EventAction.GET_ORDERS,
+    EventAction.CANCEL_ORDERS,
+)
+
+
+class LoadTransmitter(ReplayTransmitter):
+    """
+    Передатчик, который дополнительно считает ошибки по командам
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.errors = {}
+
+    def offer(self, event, *destinations) -> None:
+        super().offer(event, *destinations)
+        if event.get("event") == EventType.ERROR:
+            action = event.get("action")
+            self.errors[action] = self.errors.get(action, 0) + 1
+
+
+def redirect(gate: Gate, base_url: str) -> None:
+    """
+    Направить запросы всех подключений гейта на имитацию биржи
+    """
+    for exchange in gate.exchanges:
+        urls = exchange.exchange.urls
+        urls["api"] = rebase(urls["api"], base_url)
+        # Имитация не отдаёт список валют
+        exchange.exchange.has["fetchCurrencies"] = False
+
+
+def rebase(urls: str | dict, base_url: str) -> str | dict:
+    """
+    Заменить схему и хост адресов REST API, сохранив пути
+
+    Адреса веб-сокетов остаются прежними
+    """
+    if isinstance(urls, dict):
+        return {name: rebase(url, base_url) for name, url in urls.items()}
+
+    url = urlsplit(urls)
+    if url.scheme not in ("http", "https"):
+        return urls
+
+    target = urlsplit(base_url)
+    return url._replace(scheme=target.scheme, netloc=target.netloc).geturl()
+
+
+def make_message(action: str, client_order_id: str) -> str:
+    param = {"client_order_id": client_order_id, "symbol": SYMBOL}
+    if action == EventAction.CREATE_ORDERS:
+        param |= {"type": "limit", "side": "buy", "amount": 0.001, "price": 90}
+
+    event = {
+        "event_id": str(uuid.uuid4()),
+        "event": EventType.COMMAND,
+        "action": action,
+        "data": [param],
+    }
+    return json.dumps(event)
+
+
+async def run(
+    rate: float,
+    duration: float,
+    server: MockExmo,
+    lag: float = 0.5,
+    accounts: int = 1,
+    private_limit: float | None = None,
+) -> dict:
+    """
+    Подавать команды в гейт с частотой rate в течение duration секунд
+    и получить отчёт
+
+    Каждый ордер выставляется, запрашивается и отменяется. Запрос
+    и отмена отстают от предыдущей команды по ордеру на lag секунд
+    """
+    base_url = await server.start()
+    transmitter = LoadTransmitter()
+    config = make_gate_config(accounts, private_limit)
+    gate = Gate(config, transmitter=transmitter)
+
+    try:
+        redirect(gate, base_url)
+        markets = await gate.exchange_pool.exchanges[0].fetch_markets()
+        for exchange in gate.exchanges:
+            exchange.set_markets(markets)
+
+        # Ядро запрашивает и отменяет ордер спустя lag секунд после
+        # предыдущей команды по нему, когда ответ на неё уже получен
+        lag_cycles = math.ceil(lag * rate / len(ACTIONS))
+        commands = 0
+        interval = 1 / rate
+        start = time.monotonic()
+
+        for cycle in itertools.count():
+            if time.monotonic() - start >= duration:
+                break
+            for step, action in enumerate(ACTIONS):
+                if (order := cycle - step * lag_cycles) < 0:
+                    continue
+                gate.handler(make_message(action, f"load-{order}"))
+                commands += 1
+                due = commands * interval
+                await asyncio.sleep(max(due - (time.monotonic() - start), 0))
+
+        sent = time.monotonic() - start
+        while gate.background_tasks:
+            await asyncio.gather(*gate.background_tasks)
+        elapsed = time.monotonic() - start
+
+    finally:
+        for exchange in gate.exchanges:
+            await exchange.close()
+        await gate.connections.close()
+        await server.stop()
+
+    return {
+        "commands": commands,
+        "target_rate": rate,
+        "sent_rate": commands / sent,
+        "throughput": commands / elapsed,
+        "latency": gate.tracer.metrics(),
+        "errors": transmitter.errors,
+        "offered": dict(transmitter.offered),
+        "exchange": server.stats(),
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Load test the gate offline")
+    parser.add_argument("--rate", type=float, default=100, help="Commands per second")
+    parser.add_argument("--duration", type=float, default=10, help="Seconds")
+    parser.add_argument(
+        "--lag", type=float, default=0.5, help="Seconds between commands per order"
+    )
+    parser.add_argument("--accounts", type=int, default=1)
+    parser.add_argument("--private-limit", type=float, default=None)
+    parser.add_argument("--latency", type=float, default=0.005)
+    parser.add_argument("--jitter", type=float, default=0.002)
+    parser.add_argument("--rate-limit-ratio", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    server = MockExmo(
+        latency=args.latency,
+        jitter=args.jitter,
+        rate_limit_ratio=args.rate_limit_ratio,
+        seed=args.seed,
+    )
+    report = asyncio.run(
+        run(
+            args.rate,
+            args.duration,
+            server,
+            args.lag,
+            args.accounts,
+            args.private_limit,
+        )
+    )
+    print(json.dumps(report, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+"""
+Локальная имитация REST API EXMO v1.1 для нагрузочных тестов
+
+Сервер отвечает на запросы, которые выполняет CcxtExchange, с настраиваемой
+задержкой, разбросом задержки и долей ответов 429. Подписи запросов
+не проверяются, состояние ордеров хранится в памяти
+
+Запуск: python -m benchmarks.mock_exchange --port 8080 --latency 0.01
+"""
+
+import argparse
+import asyncio
+import itertools
+import random
+import time
+from collections import Counter
+from typing import Optional
+from aiohttp import web
+
+API_PREFIX = "/v1.1"
+
+# Ответ EXMO на запрос к несуществующему ордеру
+ORDER_NOT_FOUND = {"result": False, "error": "Error 50304: Order was not found"}
+
+
+class MockExmo:
+    def __init__(
+        self,
+        pairs: tuple[str, ...] = ("BTC_USDT",),
+        latency: float = 0.005,
+        jitter: float = 0.0,
+        rate_limit_ratio: float = 0.0,
+        seed: Optional[int] = None,
+    ):
+        """
+        :param pairs: Торговые пары в формате EXMO
+        :param latency: Средняя задержка ответа в секундах
+        :param jitter: Стандартное отклонение задержки в секундах
+        :param rate_limit_ratio: Доля запросов, на которые сервер отвечает 429
+        """
+        self.pairs = pairs
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit_ratio = rate_limit_ratio
+
+        self.requests = Counter()
+        self.rate_limited = 0
+        self.open_orders: dict[str, dict] = {}
+        self.canceled_orders: list[dict] = []
+
+        self._rng = random.Random(seed)
+        self._order_ids = itertools.count(1)
+        self._runner: Optional[web.AppRunner] = None
+
+        self.app = web.Application(middlewares=[self._emulate_network])
+        self.app.add_routes(
+            [
+                web.get(f"{API_PREFIX}/pair_settings", self.pair_settings),
+                web.get(f"{API_PREFIX}/order_book", self.order_book),
+                web.post(f"{API_PREFIX}/user_info", self.user_info),
+                web.post(f"{API_PREFIX}/order_create", self.order_create),
+                web.post(f"{API_PREFIX}/order_cancel", self.order_cancel),
+                web.post(f"{API_PREFIX}/user_open_orders", self.user_open_orders),
+                web.post(
+                    f"{API_PREFIX}/user_cancelled_orders", self.user_cancelled_orders
+                ),
+                web.post(f"{API_PREFIX}/order_trades", self.order_trades),
+            ]
+        )
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """
+        Запустить сервер и получить его адрес
+
+        :param port: Порт. 0 — выбрать свободный порт
+        """
+        self._runner = web.AppRunner(self.app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = self._runner.addresses[0][1]
+        return f"http://{host}:{port}"
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    @web.middleware
+    async def _emulate_network(self, request: web.Request, handler):
+        self.requests[request.path.removeprefix(API_PREFIX + "/")] += 1
+
+        delay = self._rng.gauss(self.latency, self.jitter)
+        await asyncio.sleep(max(delay, 0))
+
+        if self._rng.random() < self.rate_limit_ratio:
+            self.rate_limited += 1
+            return web.json_response({"error": "Too Many Requests"}, status=429)
+
+        return await handler(request)
+
+    async def pair_settings(self, request: web.Request) -> web.Response:
+        settings = {
+            "min_quantity": "0.0001",
+            "max_quantity": "1000",
+            "min_price": "0.01",
+            "max_price": "1000000",
+            "min_amount": "1",
+            "max_amount": "5000000",
+            "price_precision": 2,
+            "commission_taker_percent": "0.4",
+            "commission_maker_percent": "0.4",
+        }
+        return web.json_response({pair: settings for pair in self.pairs})
+
+    async def order_book(self, request: web.Request) -> web.Response:
+        pairs = request.query.get("pair", "").split(",")
+        limit = int(request.query.get("limit", 100))
+        return web.json_response(
+            {pair: self._make_order_book(limit) for pair in pairs if pair}
+        )
+
+    @staticmethod
+    def _make_order_book(limit: int) -> dict:
+        # Уровни EXMO: [цена, количество, сумма]
+        asks = [[f"{100 + i / 2:.2f}", "1", f"{100 + i / 2:.2f}"] for i in range(limit)]
+        bids = [[f"{99 - i / 2:.2f}", "1", f"{99 - i / 2:.2f}"] for i in range(limit)]
+        return {
+            "ask_quantity": str(limit),
+            "ask_amount": "0",
+            "ask_top": asks[0][0] if asks else "0",
+            "bid_quantity": str(limit),
+            "bid_amount": "0",
+            "bid_top": bids[0][0] if bids else "0",
+            "ask": asks,
+            "bid": bids,
+        }
+
+    async def user_info(self, request: web.Request) -> web.Response:
+        currencies = {c for pair in self.pairs for c in pair.split("_")}
+        return web.json_response(
+            {
+                "uid": 1,
+                "server_date": int(time.time()),
+                "balances": {currency: "1000" for currency in currencies},
+                "reserved": {currency: "0" for currency in currencies},
+            }
+        )
+
+    async def order_create(self, request: web.Request) -> web.Response:
+        form = await request.post()
+        order_id = str(next(self._order_ids))
+        quantity = float(form.get("quantity", 0))
+        price = float(form.get("price", 0))
+        self.open_orders[order_id] = {
+            "order_id": order_id,
+            "client_id": "0",
+            "created": str(int(time.time())),
+            "type": form.get("type", "buy"),
+            "pair": form.get("pair"),
+            "price": str(price),
+            "quantity": str(quantity),
+            "amount": str(price * quantity),
+        }
+        return web.json_response(
+            {"result": True, "error": "", "order_id": int(order_id), "client_id": 0}
+        )
+
+    async def order_cancel(self, request: web.Request) -> web.Response:
+        form = await request.post()
+        order = self.open_orders.pop(str(form.get("order_id")), None)
+        if order is None:
+            return web.json_response(ORDER_NOT_FOUND)
+
+        self.canceled_orders.append(
+            {
+                "date": int(time.time()),
+                "order_id": order["order_id"],
+                "order_type": order["type"],
+                "pair": order["pair"],
+                "price": order["price"],
+                "quantity": order["quantity"],
+                "amount": order["amount"],
+            }
+        )
+        return web.json_response({"result": True, "error": ""})
+
+    async def user_open_orders(self, request: web.Request) -> web.Response:
+        orders = {}
+        for order in self.open_orders.values():
+            orders.setdefault(order["pair"], []).append(order)
+        return web.json_response(orders)
+
+    async def user_cancelled_orders(self, request: web.Request) -> web.Response:
+        form = await request.post()
+        limit = int(form.get("limit", 100))
+        return web.json_response(self.canceled_orders[-limit:][::-1])
+
+    async def order_trades(self, request: web.Request) -> web.Response:
+        # Ордера имитации не исполняются, поэтому сделок по ним нет
+        return web.json_response(ORDER_NOT_FOUND)
+
+    def stats(self) -> dict:
+        return {
+            "requests": dict(self.requests),
+            "rate_limited": self.rate_limited,
+            "open_orders": len(self.open_orders),
+        }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Mock EXMO REST API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.005)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--rate-limit-ratio", type=float, default=0.0)
+    return parser.parse_args()
+
+
+async def main():
+    args = parse_args()
+    server = MockExmo(
+        latency=args.latency,
+        jitter=args.jitter,
+        rate_limit_ratio=args.rate_limit_ratio,
+    )
+    url = await server.start(args.host, args.port)
+    print(f"Mock EXMO is listening on {url}{API_PREFIX}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
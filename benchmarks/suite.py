@@ -0,0 +1,256 @@
+"""
+Микробенчмарки горячих функций гейта с сохранением и сравнением замеров
+
+Для каждой функции выводится время одного вызова в микросекундах. Замеры
+можно сохранить в файл и сравнить с ними следующий запуск: если функция
+замедлилась больше допустимого, команда завершится с кодом 1
+
+Запуск:
+    python -m benchmarks.suite --save baseline.json
+    python -m benchmarks.suite --compare baseline.json
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import random
+import sys
+import timeit
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Callable, ContextManager, Iterator
+from flash_gate.exchange.formatters import CcxtOrderBookFormatter, CcxtOrderFormatter
+from flash_gate.gate import Gate
+from flash_gate.gate.statistics import latency_percentile
+from flash_gate.replay.stub import ReplayTransmitter
+from flash_gate.transmitter.enums import EventAction, EventType
+from flash_gate.transmitter.formatters import JsonFormatter, RoboTradeEncoder
+from .fixtures import (
+    CONFIG,
+    make_balance,
+    make_ccxt_order,
+    make_ccxt_order_book,
+    make_gate_config,
+    make_order,
+    make_order_book,
+)
+
+REPEAT = 5
+# Допустимое замедление относительно сохранённого замера
+THRESHOLD = 0.2
+# Количество команд, обрабатываемых гейтом за один прогон
+HANDLER_BATCH = 100
+
+Benchmark = Callable[[], ContextManager[tuple[Callable[[], object], int]]]
+BENCHMARKS: dict[str, Benchmark] = {}
+
+
+def benchmark(name: str):
+    """
+    Зарегистрировать бенчмарк
+
+    Функция бенчмарка — контекстный менеджер, который готовит данные
+    и отдаёт измеряемую функцию и количество операций за один её вызов
+    """
+
+    def register(function):
+        BENCHMARKS[name] = contextmanager(function)
+        return function
+
+    return register
+
+
+@benchmark("json_formatter.order_book")
+def bench_json_formatter_order_book():
+    formatter = JsonFormatter(CONFIG)
+    event = {
+        "event_id": "1",
+        "action": EventAction.ORDER_BOOK_UPDATE,
+        "data": make_order_book(),
+    }
+    yield lambda: formatter.format(event), 1
+
+
+@benchmark("json_formatter.orders")
+def bench_json_formatter_orders():
+    formatter = JsonFormatter(CONFIG)
+    event = {
+        "event_id": "1",
+        "action": EventAction.ORDERS_UPDATE,
+        "data": [make_order()],
+    }
+    yield lambda: formatter.format(event), 1
+
+
+@benchmark("robotrade_encoder.order")
+def bench_robotrade_encoder_order():
+    order = make_order()
+    yield lambda: json.dumps(order, cls=RoboTradeEncoder), 1
+
+
+@benchmark("robotrade_encoder.balance")
+def bench_robotrade_encoder_balance():
+    balance = make_balance()
+    yield lambda: json.dumps(balance, cls=RoboTradeEncoder), 1
+
+
+@benchmark("ccxt_order_book_formatter")
+def bench_ccxt_order_book_formatter():
+    formatter = CcxtOrderBookFormatter()
+    order_book = make_ccxt_order_book(depth=50)
+    yield lambda: formatter.format(order_book, depth=10), 1
+
+
+@benchmark("ccxt_order_formatter")
+def bench_ccxt_order_formatter():
+    formatter = CcxtOrderFormatter()
+    order = make_ccxt_order()
+    yield lambda: formatter.format(order), 1
+
+
+@benchmark("latency_percentile")
+def bench_latency_percentile():
+    rng = random.Random(0)
+    latencies = [int(rng.lognormvariate(9, 0.5)) for _ in range(1_000)]
+    yield lambda: latency_percentile(latencies), 1
+
+
+@contextmanager
+def make_gate() -> Iterator[tuple[Gate, asyncio.AbstractEventLoop]]:
+    """
+    Создать гейт, который не подключается к бирже и не отправляет сообщения
+    """
+
+    async def create() -> Gate:
+        return Gate(make_gate_config(), transmitter=ReplayTransmitter())
+
+    loop = asyncio.new_event_loop()
+    gate = loop.run_until_complete(create())
+    try:
+        yield gate, loop
+    finally:
+        for exchange in gate.exchanges:
+            loop.run_until_complete(exchange.close())
+        loop.run_until_complete(gate.connections.close())
+        loop.close()
+
+
+@benchmark("gate.handler")
+def bench_gate_handler():
+    """
+    Разбор команды, запуск задачи и ответ из снимка баланса без запроса к бирже
+    """
+    with make_gate() as (gate, loop):
+        gate.balance_snapshot.max_age = float("inf")
+        gate.balance_snapshot.update(make_balance())
+        message = json.dumps(
+            {
+                "event_id": "1",
+                "event": EventType.COMMAND,
+                "action": EventAction.GET_BALANCE,
+                "data": ["BTC", "USDT"],
+            }
+        )
+
+        async def dispatch():
+            for _ in range(HANDLER_BATCH):
+                gate.handler(message)
+            await asyncio.gather(*gate.background_tasks)
+
+        yield lambda: loop.run_until_complete(dispatch()), HANDLER_BATCH
+
+
+@benchmark("gate.filter_balance")
+def bench_gate_filter_balance():
+    with make_gate() as (gate, _):
+        balance = make_balance(("BTC", "USDT", "ETH", "XRP", "LTC", "DOGE"))
+        assets = balance.assets
+
+        def run():
+            balance.assets = assets
+            gate.filter_balance(balance)
+
+        yield run, 1
+
+
+def measure(function: Callable[[], object], operations: int) -> float:
+    """
+    Получить лучшее время одной операции в микросекундах
+    """
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    seconds = min(timer.repeat(repeat=REPEAT, number=number))
+    return seconds / number / operations * 1_000_000
+
+
+def run(names: list[str]) -> dict[str, float]:
+    results = {}
+    for name in names:
+        with BENCHMARKS[name]() as (function, operations):
+            results[name] = measure(function, operations)
+    return results
+
+
+def save(path: str, results: dict[str, float]) -> None:
+    baseline = {
+        "created": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+    with open(path, "w") as f:
+        json.dump(baseline, f, indent=2)
+
+
+def load(path: str) -> dict[str, float]:
+    with open(path) as f:
+        return json.load(f)["results"]
+
+
+def report(results: dict[str, float], baseline: dict[str, float]) -> list[str]:
+    """
+    Вывести замеры рядом с сохранёнными и получить имена замедлившихся функций
+    """
+    regressions = []
+    print(f"{'benchmark':<32} {'us':>10} {'baseline, us':>14} {'change':>9}")
+    for name, timing in results.items():
+        if (previous := baseline.get(name)) is None:
+            print(f"{name:<32} {timing:>10.3f}")
+            continue
+
+        change = timing / previous - 1
+        mark = ""
+        if change > THRESHOLD:
+            regressions.append(name)
+            mark = " !"
+        print(f"{name:<32} {timing:>10.3f} {previous:>14.3f} {change:>+9.1%}{mark}")
+    return regressions
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Gate microbenchmarks")
+    parser.add_argument("--save", metavar="FILE", help="Write results as baseline")
+    parser.add_argument("--compare", metavar="FILE", help="Compare with baseline")
+    parser.add_argument(
+        "--filter", default="", help="Run benchmarks whose name contains this"
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    names = [name for name in BENCHMARKS if args.filter in name]
+    results = run(names)
+    baseline = load(args.compare) if args.compare else {}
+    regressions = report(results, baseline)
+
+    if args.save:
+        save(args.save, results)
+    if regressions:
+        print(f"Slower than baseline: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
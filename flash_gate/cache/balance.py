@@ -0,0 +1,44 @@
+import dataclasses
+from time import monotonic
+from typing import Optional
+from rock.exchanges.dataclasses import Balance
+
+
+class BalanceSnapshot:
+    """
+    Последний баланс, полученный из потока балансов
+
+    Снимок считается актуальным в течение max_age секунд с последнего обновления
+    """
+
+    def __init__(self, max_age: float = 10):
+        """
+        :param max_age: Время в секундах, в течение которого снимок актуален
+        """
+        self.max_age = max_age
+        self._balance: Optional[Balance] = None
+        self._updated_at = float("-inf")
+
+    def update(self, balance: Balance) -> None:
+        self._balance = balance
+        self._updated_at = monotonic()
+
+    def invalidate(self) -> None:
+        """
+        Считать снимок неактуальным до следующего обновления
+        """
+        self._updated_at = float("-inf")
+
+    def get(self, assets: list[str]) -> Optional[Balance]:
+        """
+        Получить баланс указанных активов, если снимок актуален и содержит их все
+        """
+        if self._balance is None or monotonic() - self._updated_at >= self.max_age:
+            return None
+
+        snapshot = self._balance.assets
+        if not all(asset in snapshot for asset in assets):
+            return None
+
+        assets = {asset: snapshot[asset] for asset in assets}
+        return dataclasses.replace(self._balance, assets=assets)
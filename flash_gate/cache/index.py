@@ -0,0 +1,192 @@
+import asyncio
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from time import monotonic
+from typing import NoReturn, Optional
+from .memcached import Memcached
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class OrderIndexEntry:
+    client_order_id: str
+    order_id: Optional[str]
+    event_id: Optional[str]
+    expires_at: float
+
+
+class OrderIndex:
+    """
+    Двунаправленный индекс идентификаторов ордеров в памяти процесса
+
+    Связывает client_order_id с order_id и event_id. Memcached используется только
+    для восстановления после перезапуска: записи отправляются в него в фоне,
+    а при промахе по памяти индекс читает их оттуда, не блокируя цикл событий
+    """
+
+    def __init__(self, maxsize: int = 100_000, ttl: float = 86_400):
+        """
+        :param maxsize: Максимальное количество записей в памяти
+        :param ttl: Время жизни записи в секундах
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+
+        self._by_client_order_id: OrderedDict[str, OrderIndexEntry] = OrderedDict()
+        self._by_order_id: dict[str, OrderIndexEntry] = {}
+
+        # Ключевые пространства остаются прежними, чтобы после обновления гейта
+        # можно было прочитать записи, сохранённые предыдущей версией
+        self._event_id_by_client_order_id = Memcached(key_prefix="event_id")
+        self._order_id_by_client_order_id = Memcached(key_prefix="order_id")
+        self._client_order_id_by_order_id = Memcached(key_prefix="client_order_id")
+
+        # pymemcache не потокобезопасен, поэтому обращения к нему выполняются
+        # в отдельном потоке по одному
+        self._memcached_lock = asyncio.Lock()
+        self._write_queue: asyncio.Queue[OrderIndexEntry] = asyncio.Queue()
+
+    def __len__(self) -> int:
+        return len(self._by_client_order_id)
+
+    def add(
+        self, client_order_id: str, order_id: Optional[str], event_id: Optional[str]
+    ) -> OrderIndexEntry:
+        """
+        Добавить запись в индекс и поставить её в очередь на запись в Memcached
+        """
+        entry = self._put(client_order_id, order_id, event_id)
+        self._write_queue.put_nowait(entry)
+        return entry
+
+    def get(self, client_order_id: str) -> Optional[OrderIndexEntry]:
+        """
+        Получить запись по client_order_id только из памяти
+        """
+        entry = self._by_client_order_id.get(client_order_id)
+        return self._check_expired(entry)
+
+    def get_by_order_id(self, order_id: str) -> Optional[OrderIndexEntry]:
+        """
+        Получить запись по order_id только из памяти
+        """
+        entry = self._by_order_id.get(order_id)
+        return self._check_expired(entry)
+
+    async def fetch(self, client_order_id: str) -> Optional[OrderIndexEntry]:
+        """
+        Получить запись по client_order_id, при промахе прочитав её из Memcached
+        """
+        if entry := self.get(client_order_id):
+            return entry
+
+        order_id, event_id = await self._read(client_order_id)
+        if order_id is None and event_id is None:
+            return None
+
+        return self._put(client_order_id, order_id, event_id)
+
+    async def fetch_by_order_id(self, order_id: str) -> Optional[OrderIndexEntry]:
+        """
+        Получить запись по order_id, при промахе прочитав её из Memcached
+        """
+        if entry := self.get_by_order_id(order_id):
+            return entry
+
+        try:
+            async with self._memcached_lock:
+                client_order_id = await asyncio.to_thread(
+                    self._client_order_id_by_order_id.get, order_id
+                )
+        except Exception as e:
+            logger.error("Memcached read error: %s", e)
+            return None
+
+        if client_order_id is None:
+            return None
+
+        return await self.fetch(client_order_id)
+
+    async def _read(self, client_order_id: str) -> tuple:
+        try:
+            async with self._memcached_lock:
+                return await asyncio.to_thread(self._read_sync, client_order_id)
+        except Exception as e:
+            logger.error("Memcached read error: %s", e)
+            return None, None
+
+    async def run(self) -> NoReturn:
+        """
+        Записывать добавленные записи в Memcached
+        """
+        while True:
+            entry = await self._write_queue.get()
+            await self._write(entry)
+
+    async def flush(self) -> None:
+        """
+        Записать в Memcached все записи, ожидающие в очереди
+        """
+        while not self._write_queue.empty():
+            await self._write(self._write_queue.get_nowait())
+
+    async def _write(self, entry: OrderIndexEntry) -> None:
+        try:
+            async with self._memcached_lock:
+                await asyncio.to_thread(self._write_sync, entry)
+        except Exception as e:
+            logger.error("Memcached write error: %s", e)
+
+    def _read_sync(self, client_order_id: str) -> tuple:
+        order_id = self._order_id_by_client_order_id.get(client_order_id)
+        event_id = self._event_id_by_client_order_id.get(client_order_id)
+        return order_id, event_id
+
+    def _write_sync(self, entry: OrderIndexEntry) -> None:
+        client_order_id = entry.client_order_id
+        self._event_id_by_client_order_id.set(client_order_id, entry.event_id)
+        self._order_id_by_client_order_id.set(client_order_id, entry.order_id)
+        if entry.order_id is not None:
+            self._client_order_id_by_order_id.set(entry.order_id, client_order_id)
+
+    def _put(
+        self, client_order_id: str, order_id: Optional[str], event_id: Optional[str]
+    ) -> OrderIndexEntry:
+        if previous := self._by_client_order_id.pop(client_order_id, None):
+            self._by_order_id.pop(previous.order_id, None)
+
+        entry = OrderIndexEntry(
+            client_order_id, order_id, event_id, monotonic() + self.ttl
+        )
+        self._by_client_order_id[client_order_id] = entry
+        if order_id is not None:
+            self._by_order_id[order_id] = entry
+
+        self._evict()
+        return entry
+
+    def _check_expired(
+        self, entry: Optional[OrderIndexEntry]
+    ) -> Optional[OrderIndexEntry]:
+        if entry is not None and entry.expires_at <= monotonic():
+            self._remove(entry)
+            return None
+        return entry
+
+    def _evict(self) -> None:
+        # Время жизни у всех записей одинаковое, поэтому порядок вставки
+        # совпадает с порядком истечения
+        now = monotonic()
+        while self._by_client_order_id:
+            oldest = next(iter(self._by_client_order_id.values()))
+            overflow = len(self._by_client_order_id) > self.maxsize
+            if not overflow and oldest.expires_at > now:
+                break
+            self._remove(oldest)
+
+    def _remove(self, entry: OrderIndexEntry) -> None:
+        self._by_client_order_id.pop(entry.client_order_id, None)
+        if entry.order_id is not None:
+            self._by_order_id.pop(entry.order_id, None)
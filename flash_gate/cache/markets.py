@@ -0,0 +1,84 @@
+import asyncio
+import json
+import logging
+import os
+from pathlib import Path
+from time import time
+from typing import Awaitable, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+MarketData = dict
+
+
+class MarketCache:
+    """
+    Кеш метаданных рынков биржи, сохраняемый в локальный файл
+
+    Метаданные загружаются один раз и передаются всем подключениям к бирже.
+    Если файл свежий, после перезапуска запрос к бирже не выполняется.
+    Если загрузить метаданные не удалось, используется устаревший файл той же биржи
+    """
+
+    def __init__(self, path: str | Path, exchange_id: str, ttl: float = 3600):
+        """
+        :param path: Путь к файлу кеша
+        :param exchange_id: Идентификатор биржи, для которой сохранены рынки
+        :param ttl: Время в секундах, в течение которого файл считается свежим
+        """
+        self.path = Path(path)
+        self.exchange_id = exchange_id
+        self.ttl = ttl
+
+    async def load(self, fetch: Callable[[], Awaitable[MarketData]]) -> MarketData:
+        """
+        Получить метаданные рынков из файла или, если он устарел, от биржи
+
+        :param fetch: Функция, загружающая метаданные с биржи
+        """
+        stored = await asyncio.to_thread(self._read)
+        if stored is not None and self.is_fresh(stored):
+            return stored["data"]
+
+        try:
+            data = await fetch()
+        except Exception as e:
+            if stored is None or not self.is_same_exchange(stored):
+                raise
+            logger.warning("Using stale market metadata: %s", e)
+            return stored["data"]
+
+        await asyncio.to_thread(self._write, data)
+        return data
+
+    def is_fresh(self, stored: dict) -> bool:
+        return (
+            self.is_same_exchange(stored)
+            and time() - stored.get("saved_at", 0) < self.ttl
+        )
+
+    def is_same_exchange(self, stored: dict) -> bool:
+        return stored.get("exchange_id") == self.exchange_id
+
+    def _read(self) -> Optional[dict]:
+        try:
+            with self.path.open(encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning("Market metadata cache is unreadable: %s", e)
+            return None
+
+    def _write(self, data: MarketData) -> None:
+        stored = {"exchange_id": self.exchange_id, "saved_at": time(), "data": data}
+        # Файл заменяется атомарно, чтобы прерванная запись не испортила кеш
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with tmp_path.open("w", encoding="utf-8") as f:
+                json.dump(stored, f)
+            os.replace(tmp_path, self.path)
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning("Market metadata cache is not saved: %s", e)
+            tmp_path.unlink(missing_ok=True)
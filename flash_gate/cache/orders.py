@@ -0,0 +1,90 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from enum import Enum
+from time import monotonic
+from typing import Any, Optional
+
+
+@dataclass(slots=True)
+class OrderState:
+    order: Any
+    status: str
+    updated_at: float
+
+
+class OrderStore:
+    """
+    Последнее известное состояние ордеров в памяти процесса
+
+    Состояние обновляется из потока ордеров и по ответам на выставление ордеров.
+    Ордер в конечном статусе больше не меняется, поэтому всегда считается
+    актуальным. Состояние открытого ордера актуально в течение max_age секунд
+    с последнего обновления
+    """
+
+    TERMINAL_STATUSES = frozenset({"closed", "canceled", "expired", "rejected"})
+
+    def __init__(self, maxsize: int = 100_000, max_age: float = 30):
+        """
+        :param maxsize: Максимальное количество ордеров в памяти
+        :param max_age: Время в секундах, в течение которого состояние открытого
+        ордера считается актуальным
+        """
+        self.maxsize = maxsize
+        self.max_age = max_age
+        self._states: OrderedDict[str, OrderState] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def put(self, order_id: str, order: Any, status: str | Enum) -> None:
+        """
+        Сохранить состояние ордера
+        """
+        if isinstance(status, Enum):
+            status = status.value
+
+        self._states.pop(order_id, None)
+        self._states[order_id] = OrderState(order, status, monotonic())
+        if len(self._states) > self.maxsize:
+            self._states.popitem(last=False)
+
+    def add(self, order_id: str, order: Any, status: str | Enum) -> None:
+        """
+        Сохранить состояние ордера, если оно ещё неизвестно
+
+        Поток ордеров может сообщить об исполнении раньше, чем придёт ответ
+        на выставление ордера, и этот ответ не должен затереть новое состояние
+        """
+        if order_id not in self._states:
+            self.put(order_id, order, status)
+
+    def get(self, order_id: str) -> Optional[Any]:
+        """
+        Получить ордер, если его состояние актуально
+        """
+        if (state := self._states.get(order_id)) is None:
+            return None
+        if state.status in self.TERMINAL_STATUSES:
+            return state.order
+        if monotonic() - state.updated_at < self.max_age:
+            return state.order
+        return None
+
+    def invalidate(self, order_id: str) -> None:
+        """
+        Считать состояние открытого ордера неактуальным до следующего обновления
+        """
+        state = self._states.get(order_id)
+        if state is not None and state.status not in self.TERMINAL_STATUSES:
+            del self._states[order_id]
+
+    def invalidate_open(self) -> None:
+        """
+        Считать неактуальными состояния всех открытых ордеров
+
+        Вызывается, когда обновления ордеров могли быть пропущены
+        """
+        for state in self._states.values():
+            if state.status not in self.TERMINAL_STATUSES:
+                state.updated_at = float("-inf")
@@ -0,0 +1,144 @@
+import asyncio
+import logging
+from typing import NoReturn
+from aiohttp import ClientSession, TCPConnector, TraceConfig
+
+logger = logging.getLogger(__name__)
+
+
+class ConnectionStats:
+    """
+    Счётчики соединений одного локального IP-адреса
+    """
+
+    def __init__(self):
+        self.created = 0
+        self.reused = 0
+        self.dns_hits = 0
+        self.dns_misses = 0
+
+    async def on_connection_create_end(self, session, context, params) -> None:
+        self.created += 1
+
+    async def on_connection_reuseconn(self, session, context, params) -> None:
+        self.reused += 1
+
+    async def on_dns_cache_hit(self, session, context, params) -> None:
+        self.dns_hits += 1
+
+    async def on_dns_cache_miss(self, session, context, params) -> None:
+        self.dns_misses += 1
+
+    def trace_config(self) -> TraceConfig:
+        trace_config = TraceConfig()
+        trace_config.on_connection_create_end.append(self.on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(self.on_connection_reuseconn)
+        trace_config.on_dns_cache_hit.append(self.on_dns_cache_hit)
+        trace_config.on_dns_cache_miss.append(self.on_dns_cache_miss)
+        return trace_config
+
+    def metrics(self) -> dict:
+        return {
+            "created": self.created,
+            "reused": self.reused,
+            "dns_hits": self.dns_hits,
+            "dns_misses": self.dns_misses,
+        }
+
+    def reset(self) -> None:
+        self.created = 0
+        self.reused = 0
+        self.dns_hits = 0
+        self.dns_misses = 0
+
+
+class ConnectionManager:
+    """
+    Менеджер HTTP-соединений с биржей
+
+    Для каждого локального IP-адреса создаётся одна сессия с настроенным
+    коннектором, которую используют и публичные, и приватные подключения.
+    Менеджер заранее открывает соединения и периодически отправляет лёгкие
+    запросы, чтобы соединения не закрывались из-за простоя
+    """
+
+    # Ephemeral port
+    _LOCAL_PORT = 0
+
+    def __init__(
+        self,
+        warm_connections: int = 2,
+        keepalive_interval: float = 20,
+        dns_cache_ttl: int = 300,
+    ):
+        """
+        :param warm_connections: Количество соединений, которые поддерживаются
+        открытыми для каждого локального IP-адреса
+        :param keepalive_interval: Интервал между запросами поддержки соединений
+        в секундах
+        :param dns_cache_ttl: Время жизни записей кеша DNS в секундах
+        """
+        self.warm_connections = warm_connections
+        self.keepalive_interval = keepalive_interval
+        self.dns_cache_ttl = dns_cache_ttl
+
+        self.sessions: dict[str, ClientSession] = {}
+        self.stats: dict[str, ConnectionStats] = {}
+
+    def get_session(self, local_host: str) -> ClientSession:
+        """
+        Получить сессию, отправляющую запросы с локального IP-адреса
+        """
+        if (session := self.sessions.get(local_host)) is None:
+            session = self._create_session(local_host)
+            self.sessions[local_host] = session
+        return session
+
+    def _create_session(self, local_host: str) -> ClientSession:
+        connector = TCPConnector(
+            local_addr=(local_host, self._LOCAL_PORT),
+            use_dns_cache=True,
+            ttl_dns_cache=self.dns_cache_ttl,
+            # Соединения должны пережить интервал между запросами поддержки
+            keepalive_timeout=self.keepalive_interval * 3,
+        )
+        stats = self.stats[local_host] = ConnectionStats()
+        return ClientSession(connector=connector, trace_configs=[stats.trace_config()])
+
+    async def warm_up(self, url: str) -> None:
+        """
+        Открыть соединения и выполнить TLS-рукопожатие для всех сессий
+        """
+        requests = [
+            self._ping(local_host, session, url)
+            for local_host, session in self.sessions.items()
+            for _ in range(self.warm_connections)
+        ]
+        await asyncio.gather(*requests)
+
+    async def keep_alive(self, url: str) -> NoReturn:
+        """
+        Периодически отправлять запросы, чтобы соединения не закрывались
+        """
+        while True:
+            await asyncio.sleep(self.keepalive_interval)
+            await self.warm_up(url)
+
+    @staticmethod
+    async def _ping(local_host: str, session: ClientSession, url: str) -> None:
+        try:
+            async with session.get(url) as response:
+                await response.read()
+        except Exception as e:
+            logger.warning("Connection warm-up failed for %s: %s", local_host, e)
+
+    def metrics(self) -> dict:
+        return {local_host: stats.metrics() for local_host, stats in self.stats.items()}
+
+    def reset_metrics(self) -> None:
+        for stats in self.stats.values():
+            stats.reset()
+
+    async def close(self) -> None:
+        for session in self.sessions.values():
+            await session.close()
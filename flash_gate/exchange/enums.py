@@ -9,3 +9,26 @@ class StructureType(str, Enum):
     ORDER_BOOK = "order_book"
     PARTIAL_BALANCE = "partial_balance"
     ORDER = "order"
+
+
+class Endpoint(str, Enum):
+    """
+    Метод приватного API биржи
+    """
+
+    CREATE_ORDER = "create_order"
+    CANCEL_ORDER = "cancel_order"
+    CANCEL_ALL_ORDERS = "cancel_all_orders"
+    FETCH_ORDER = "fetch_order"
+    FETCH_OPEN_ORDERS = "fetch_open_orders"
+    FETCH_CANCELED_ORDERS = "fetch_canceled_orders"
+    FETCH_BALANCE = "fetch_balance"
+
+
+class SelectionPolicy(str, Enum):
+    """
+    Способ выбора подключения из пула
+    """
+
+    ROUND_ROBIN = "round_robin"
+    ADAPTIVE = "adaptive"
@@ -1,12 +1,16 @@
 import asyncio
-from time import time_ns
+from time import monotonic_ns, time_ns
+from typing import Optional
 import itertools
 import logging
 from abc import ABC, abstractmethod
 import ccxtpro
-from .enums import StructureType
+from flash_gate.replay.recorder import Recorder
+from .enums import Endpoint, StructureType
 from .formatters import CcxtFormatterFactory
-from .types import OrderBook, Balance, Order, FetchOrderParams, CreateOrderParams
+from .instrumentation import RequestStats
+from .orderbook import ArrayOrderBook
+from .types import Balance, Order, FetchOrderParams, CreateOrderParams
 
 
 class Exchange(ABC):
@@ -15,7 +19,7 @@ class Exchange(ABC):
     """
 
     @abstractmethod
-    async def fetch_order_book(self, symbol: str, limit: str) -> OrderBook:
+    async def fetch_order_book(self, symbol: str, limit: int) -> ArrayOrderBook:
         """
         Получить биржевой стакан по HTTP
 
@@ -25,7 +29,7 @@ class Exchange(ABC):
         ...
 
     @abstractmethod
-    async def watch_order_book(self, symbol: str, limit: str) -> OrderBook:
+    async def watch_order_book(self, symbol: str, limit: int) -> ArrayOrderBook:
         """
         Получить биржевой стакан по WS
 
@@ -111,6 +115,13 @@ class CcxtExchange(Exchange):
     def __init__(self, exchange_id: str, config: dict):
         self.logger = logging.getLogger(__name__)
         self.exchange: ccxtpro.Exchange = getattr(ccxtpro, exchange_id)(config)
+        self.stats = RequestStats()
+        self.recorder: Optional[Recorder] = None
+
+        # Форматтеры не хранят состояния, поэтому создаются один раз
+        factory = CcxtFormatterFactory()
+        self._formatters = {t: factory.make_formatter(t) for t in StructureType}
+        self._order_book_formatter = self._formatters[StructureType.ORDER_BOOK]
 
         # Функция для получения nonce — уникального числа для каждой команды.
         # По умолчанию функция возвращает временную метку в миллисекундах
@@ -127,39 +138,86 @@ class CcxtExchange(Exchange):
         """
         return time_ns()
 
-    async def fetch_order_book(self, symbol: str, limit: int) -> OrderBook:
+    @property
+    def api_url(self) -> str:
+        """
+        Получить адрес API биржи, по которому можно прогревать соединения
+        """
+        api = self.exchange.urls["api"]
+        while isinstance(api, dict):
+            api = next(iter(api.values()))
+        return api
+
+    async def _request(self, method: str, *args):
+        """
+        Вызвать метод CCXT, записав запрос и ответ, если включена запись
+        """
+        call = getattr(self.exchange, method)
+        if self.recorder is None:
+            return await call(*args)
+
+        start = monotonic_ns()
+        try:
+            result = await call(*args)
+        except Exception as e:
+            self.recorder.request(method, args, start, monotonic_ns() - start, error=e)
+            raise
+        self.recorder.request(method, args, start, monotonic_ns() - start, result)
+        return result
+
+    async def fetch_markets(self) -> dict:
+        """
+        Загрузить с биржи метаданные рынков и валют
+        """
+        markets = await self.exchange.load_markets(reload=True)
+        return {"markets": markets, "currencies": self.exchange.currencies}
+
+    def set_markets(self, data: dict) -> None:
+        """
+        Установить загруженные ранее метаданные, чтобы CCXT не запрашивал их сам
+        """
+        self.exchange.set_markets(data["markets"], data.get("currencies"))
+
+    async def fetch_order_book(self, symbol: str, limit: int) -> ArrayOrderBook:
         order_book = await self._fetch_order_book(symbol, limit)
         return order_book
 
-    async def _fetch_order_book(self, symbol: str, limit: int) -> OrderBook:
-        raw_order_book = await self.exchange.fetch_order_book(symbol, limit)
-        order_book = self._format(raw_order_book, StructureType.ORDER_BOOK)
+    async def _fetch_order_book(self, symbol: str, limit: int) -> ArrayOrderBook:
+        raw_order_book = await self._request("fetch_order_book", symbol, limit)
+        order_book = self._order_book_formatter.format(raw_order_book, limit)
         return order_book
 
     async def fetch_order_books(
-        self, symbols: list[str], limit: int
-    ) -> list[OrderBook]:
-        order_book = await self._fetch_order_books(symbols, limit)
+        self, symbols: list[str], limit: int, depths: Optional[dict[str, int]] = None
+    ) -> list[ArrayOrderBook]:
+        """
+        :param limit: Количество уровней, запрашиваемых у биржи
+        :param depths: Количество сохраняемых уровней по тикерам. Для тикеров,
+        которых нет в словаре, сохраняется limit уровней
+        """
+        order_book = await self._fetch_order_books(symbols, limit, depths or {})
         return order_book
 
     async def _fetch_order_books(
-        self, symbols: list[str], limit: int
-    ) -> list[OrderBook]:
-        raw_order_books = await self.exchange.fetch_order_books(symbols, limit)
+        self, symbols: list[str], limit: int, depths: dict[str, int]
+    ) -> list[ArrayOrderBook]:
+        raw_order_books = await self._request("fetch_order_books", symbols, limit)
+        formatter = self._order_book_formatter
         order_books = []
         for symbol in symbols:
-            order_book = self._format(raw_order_books[symbol], StructureType.ORDER_BOOK)
+            depth = depths.get(symbol, limit)
+            order_book = formatter.format(raw_order_books[symbol], depth)
             order_books.append(order_book)
 
         return order_books
 
-    async def watch_order_book(self, symbol: str, limit: int) -> OrderBook:
+    async def watch_order_book(self, symbol: str, limit: int) -> ArrayOrderBook:
         order_book = await self._watch_order_book(symbol, limit)
         return order_book
 
-    async def _watch_order_book(self, symbol: str, limit: int) -> OrderBook:
-        raw_order_book = await self.exchange.watch_order_book(symbol, limit)
-        order_book = self._format(raw_order_book, StructureType.ORDER_BOOK)
+    async def _watch_order_book(self, symbol: str, limit: int) -> ArrayOrderBook:
+        raw_order_book = await self._request("watch_order_book", symbol, limit)
+        order_book = self._order_book_formatter.format(raw_order_book, limit)
         return order_book
 
     async def fetch_partial_balance(self, parts: list[str]) -> Balance:
@@ -167,7 +225,8 @@ class CcxtExchange(Exchange):
         return balance
 
     async def _fetch_partial_balance(self, parts: list[str]) -> Balance:
-        raw_balance = await self.exchange.fetch_balance()
+        with self.stats.measure(Endpoint.FETCH_BALANCE):
+            raw_balance = await self._request("fetch_balance")
         raw_partial_balance = self._get_partial_balance(raw_balance, parts)
         balance = self._format(raw_partial_balance, StructureType.PARTIAL_BALANCE)
         return balance
@@ -177,7 +236,7 @@ class CcxtExchange(Exchange):
         return balance
 
     async def _watch_partial_balance(self, parts: list[str]) -> Balance:
-        raw_balance = await self.exchange.watch_balance()
+        raw_balance = await self._request("watch_balance")
         raw_partial_balance = self._get_partial_balance(raw_balance, parts)
         balance = self._format(raw_partial_balance, StructureType.PARTIAL_BALANCE)
         return balance
@@ -200,7 +259,10 @@ class CcxtExchange(Exchange):
         elif order := await self._fetch_order_from_canceled(params):
             self.logger.debug("Fetched from canceled: %s", order)
         else:
-            raw_order = await self.exchange.fetch_order(params["id"], params["symbol"])
+            with self.stats.measure(Endpoint.FETCH_ORDER):
+                raw_order = await self._request(
+                    "fetch_order", params["id"], params["symbol"]
+                )
             order = self._format(raw_order, StructureType.ORDER)
             self.logger.debug("Fetched from fetch: %s", order)
 
@@ -217,11 +279,12 @@ class CcxtExchange(Exchange):
                 return order
 
     async def _fetch_order_from_canceled(self, params: FetchOrderParams) -> Order:
-        raw_orders = await self.exchange.fetch_canceled_orders(params["symbol"])
+        with self.stats.measure(Endpoint.FETCH_CANCELED_ORDERS):
+            raw_orders = await self._request("fetch_canceled_orders", params["symbol"])
         for raw_order in raw_orders:
             if raw_order["id"] == params["id"]:
-                raw_order["status"] = "canceled"
                 order = self._format(raw_order, StructureType.ORDER)
+                order["status"] = "canceled"
                 return order
 
     async def fetch_open_orders(self, symbols: list[str]) -> list[Order]:
@@ -240,7 +303,7 @@ class CcxtExchange(Exchange):
         return orders
 
     async def _watch_orders(self) -> list[Order]:
-        raw_orders = await self.exchange.watch_orders()
+        raw_orders = await self._request("watch_orders")
         orders = [self._format(order, StructureType.ORDER) for order in raw_orders]
         return orders
 
@@ -257,13 +320,15 @@ class CcxtExchange(Exchange):
 
     async def create_order(self, params: CreateOrderParams) -> Order:
         self.logger.debug("Trying to create order: %s", params)
-        raw_order = await self.exchange.create_order(
-            params["symbol"],
-            params["type"],
-            params["side"],
-            params["amount"],
-            params["price"] if params["type"] != "market" else 0,
-        )
+        with self.stats.measure(Endpoint.CREATE_ORDER):
+            raw_order = await self._request(
+                "create_order",
+                params["symbol"],
+                params["type"],
+                params["side"],
+                params["amount"],
+                params["price"] if params["type"] != "market" else 0,
+            )
         order = self._format(raw_order, StructureType.ORDER)
         self.logger.debug("Order has been successfully created: %s", order)
         return order
@@ -277,7 +342,8 @@ class CcxtExchange(Exchange):
 
     async def cancel_order(self, order: FetchOrderParams) -> None:
         self.logger.debug("Trying to cancel order: %s", order)
-        result = await self.exchange.cancel_order(order["id"], order["symbol"])
+        with self.stats.measure(Endpoint.CANCEL_ORDER):
+            result = await self._request("cancel_order", order["id"], order["symbol"])
         self.logger.debug("Order has been successfully cancelled: %s", result)
 
     async def cancel_all_orders(self, symbols: list[str]) -> None:
@@ -286,25 +352,43 @@ class CcxtExchange(Exchange):
         self.logger.debug("All orders has been successfully cancelled")
 
     async def _cancel_all_orders(self, symbols: list[str]) -> None:
+        if self.has_cancel_all_orders:
+            await asyncio.gather(*(self.cancel_symbol_orders(s) for s in symbols))
+            return
+
         raw_orders = await self._fetch_raw_open_orders(symbols)
-        for raw_order in raw_orders:
-            await self.exchange.cancel_order(raw_order["id"], raw_order["symbol"])
-            await asyncio.sleep(0.3)
+        orders = [{"id": o["id"], "symbol": o["symbol"]} for o in raw_orders]
+        await asyncio.gather(*(self.cancel_order(order) for order in orders))
 
-    async def _fetch_raw_open_orders(self, symbols: list[str]) -> list[dict]:
-        groups = []
-        for symbol in symbols:
-            orders = await self.exchange.fetch_open_orders(symbol)
-            groups.append(orders)
-            await asyncio.sleep(0.2)
+    @property
+    def has_cancel_all_orders(self) -> bool:
+        """
+        Проверить, что биржа может отменить все ордера тикера одним запросом
+        """
+        return bool(self.exchange.has.get("cancelAllOrders"))
 
+    async def cancel_symbol_orders(self, symbol: str) -> None:
+        """
+        Отменить все открытые ордера тикера одним запросом
+        """
+        self.logger.debug("Trying to cancel all orders: %s", symbol)
+        with self.stats.measure(Endpoint.CANCEL_ALL_ORDERS):
+            await self._request("cancel_all_orders", symbol)
+
+    async def _fetch_raw_open_orders(self, symbols: list[str]) -> list[dict]:
+        groups = await asyncio.gather(
+            *(self._fetch_raw_symbol_open_orders(symbol) for symbol in symbols)
+        )
         raw_orders = list(itertools.chain.from_iterable(groups))
         return raw_orders
 
-    @staticmethod
-    def _format(ccxt_structure: dict, ccxt_structure_type: StructureType):
-        factory = CcxtFormatterFactory()
-        formatter = factory.make_formatter(ccxt_structure_type)
+    async def _fetch_raw_symbol_open_orders(self, symbol: str) -> list[dict]:
+        with self.stats.measure(Endpoint.FETCH_OPEN_ORDERS):
+            orders = await self._request("fetch_open_orders", symbol)
+        return orders
+
+    def _format(self, ccxt_structure: dict, ccxt_structure_type: StructureType):
+        formatter = self._formatters[ccxt_structure_type]
         structure = formatter.format(ccxt_structure)
         return structure
 
@@ -1,6 +1,10 @@
 from abc import ABC, abstractmethod
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Optional
 from .enums import StructureType
-from .types import OrderBook, Balance, Order
+from .orderbook import ArrayOrderBook
+from .types import Balance, Order
 from .utils import filter_dict, get_timestamp_in_us
 
 
@@ -17,12 +21,17 @@ class FormatterFactory(ABC):
 
 
 class CcxtOrderBookFormatter(Formatter):
-    KEYS = ["symbol", "bids", "asks", "timestamp"]
-
-    def format(self, structure: dict) -> OrderBook:
-        order_book = filter_dict(structure, self.KEYS)
-        order_book["timestamp"] = get_timestamp_in_us(structure)
-        return order_book
+    def format(self, structure: dict, depth: Optional[int] = None) -> ArrayOrderBook:
+        """
+        :param depth: Количество сохраняемых уровней каждой стороны
+        """
+        return ArrayOrderBook.from_levels(
+            structure.get("symbol"),
+            structure["bids"],
+            structure["asks"],
+            get_timestamp_in_us(structure),
+            depth,
+        )
 
 
 class CcxtPartialBalanceFormatter(Formatter):
@@ -58,6 +67,60 @@ class CcxtOrderFormatter(Formatter):
         return order
 
 
+class RockOrderFormatter(Formatter):
+    """
+    Приведение ордера rock к виду, который возвращает CcxtOrderFormatter
+    """
+
+    def format(self, structure) -> Order:
+        timestamp = structure.timestamp
+        return {
+            "client_order_id": structure.client_order_id,
+            "symbol": structure.symbol,
+            "type": _plain(structure.type),
+            "side": _plain(structure.side),
+            "amount": _plain(structure.amount),
+            "price": _plain(structure.price),
+            "id": structure.id,
+            "status": _plain(structure.status),
+            "filled": _plain(structure.filled),
+            "timestamp": int(timestamp.timestamp() * 1_000_000) if timestamp else None,
+            "info": None,
+        }
+
+
+class RockBalanceFormatter(Formatter):
+    """
+    Приведение баланса rock к виду, который возвращает CcxtPartialBalanceFormatter
+    """
+
+    def format(self, structure) -> Balance:
+        timestamp = structure.timestamp
+        assets = {
+            asset: {
+                "free": _plain(value.free),
+                "used": _plain(value.used),
+                "total": _plain(value.total),
+            }
+            for asset, value in structure.assets.items()
+        }
+        return {
+            "assets": assets,
+            "timestamp": int(timestamp.timestamp() * 1_000_000) if timestamp else None,
+        }
+
+
+def _plain(value: Any) -> Any:
+    """
+    Заменить перечисление его значением, а Decimal — числом с плавающей точкой
+    """
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
 class CcxtFormatterFactory(FormatterFactory):
     def make_formatter(self, structure_type: StructureType) -> Formatter:
         match structure_type:
@@ -0,0 +1,95 @@
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from time import monotonic_ns
+from typing import Iterator, Optional, Protocol
+from ccxt.base.errors import RateLimitExceeded, RequestTimeout
+from flash_gate.gate.statistics import LatencyHistogram, ns_to_us
+from .enums import Endpoint
+
+
+@dataclass(slots=True)
+class EndpointStats:
+    requests: int = 0
+    errors: int = 0
+    timeouts: int = 0
+    rate_limits: int = 0
+    latencies: LatencyHistogram = field(default_factory=LatencyHistogram)
+
+    def metrics(self) -> dict:
+        percentile = self.latencies.percentiles() if len(self.latencies) else None
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "rate_limits": self.rate_limits,
+            "latency_percentile": percentile,
+        }
+
+
+class RequestListener(Protocol):
+    def request_started(self, endpoint: Endpoint) -> None: ...
+
+    def request_finished(
+        self, endpoint: Endpoint, latency: float, error: Optional[Exception]
+    ) -> None: ...
+
+
+class RequestStats:
+    """
+    Статистика запросов одного подключения к бирже по методам API
+
+    Если задан listener, он получает уведомления о начале и завершении запросов
+    """
+
+    def __init__(self):
+        self.endpoints: dict[Endpoint, EndpointStats] = {}
+        self.listener: Optional[RequestListener] = None
+
+    @contextmanager
+    def measure(self, endpoint: Endpoint) -> Iterator[None]:
+        """
+        Учесть запрос: его задержку в микросекундах и тип ошибки, если она была
+        """
+        if (stats := self.endpoints.get(endpoint)) is None:
+            stats = self.endpoints[endpoint] = EndpointStats()
+
+        stats.requests += 1
+        if self.listener is not None:
+            self.listener.request_started(endpoint)
+
+        error = None
+        start = monotonic_ns()
+        try:
+            yield
+        except RequestTimeout as e:
+            stats.timeouts += 1
+            error = e
+            raise
+        except RateLimitExceeded as e:
+            stats.rate_limits += 1
+            error = e
+            raise
+        except Exception as e:
+            stats.errors += 1
+            error = e
+            raise
+        finally:
+            elapsed = monotonic_ns() - start
+            stats.latencies.record(ns_to_us(elapsed))
+            if self.listener is not None:
+                self.listener.request_finished(endpoint, elapsed / 1e9, error)
+
+    def metrics(self) -> dict:
+        return {
+            endpoint.value: stats.metrics()
+            for endpoint, stats in self.endpoints.items()
+            if stats.requests
+        }
+
+    def reset(self) -> None:
+        for stats in self.endpoints.values():
+            stats.requests = 0
+            stats.errors = 0
+            stats.timeouts = 0
+            stats.rate_limits = 0
+            stats.latencies.reset()
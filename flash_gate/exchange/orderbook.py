@@ -0,0 +1,121 @@
+import sys
+from array import array
+from operator import itemgetter
+from typing import Iterable, Optional
+
+_price = itemgetter(0)
+_amount = itemgetter(1)
+
+
+class ArrayOrderBook:
+    """
+    Ордербук, уровни которого хранятся в массивах float64
+
+    Цены и объёмы каждой стороны лежат в отдельных непрерывных массивах.
+    Для совместимости с кодом, работающим со словарями, поля доступны
+    по ключам symbol, bids, asks и timestamp. Списки уровней bids и asks
+    создаются только при обращении к ним
+    """
+
+    __slots__ = (
+        "symbol",
+        "timestamp",
+        "bid_prices",
+        "bid_amounts",
+        "ask_prices",
+        "ask_amounts",
+    )
+
+    def __init__(
+        self,
+        symbol: str,
+        timestamp: Optional[int],
+        bid_prices: array,
+        bid_amounts: array,
+        ask_prices: array,
+        ask_amounts: array,
+    ):
+        self.symbol = symbol
+        self.timestamp = timestamp
+        self.bid_prices = bid_prices
+        self.bid_amounts = bid_amounts
+        self.ask_prices = ask_prices
+        self.ask_amounts = ask_amounts
+
+    @classmethod
+    def from_levels(
+        cls,
+        symbol: str,
+        bids: list,
+        asks: list,
+        timestamp: Optional[int],
+        depth: Optional[int] = None,
+    ) -> "ArrayOrderBook":
+        """
+        Создать ордербук из уровней [цена, объём], оставив depth лучших уровней
+        """
+        if depth is not None:
+            bids = bids[:depth]
+            asks = asks[:depth]
+
+        return cls(
+            symbol,
+            timestamp,
+            array("d", map(_price, bids)),
+            array("d", map(_amount, bids)),
+            array("d", map(_price, asks)),
+            array("d", map(_amount, asks)),
+        )
+
+    @property
+    def bids(self) -> list[list[float]]:
+        return _levels(self.bid_prices, self.bid_amounts)
+
+    @property
+    def asks(self) -> list[list[float]]:
+        return _levels(self.ask_prices, self.ask_amounts)
+
+    def __getitem__(self, key: str):
+        if key not in ("symbol", "timestamp", "bids", "asks"):
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, ArrayOrderBook):
+            return NotImplemented
+        return all(getattr(self, k) == getattr(other, k) for k in self.__slots__)
+
+    def arrays(self) -> tuple[array, array, array, array]:
+        return self.bid_prices, self.bid_amounts, self.ask_prices, self.ask_amounts
+
+    def fingerprint(self) -> int:
+        """
+        Получить отпечаток уровней ордербука без создания списков уровней
+        """
+        return hash(tuple(values.tobytes() for values in self.arrays()))
+
+    def to_bytes(self) -> bytes:
+        """
+        Получить массивы цен и объёмов bids и asks подряд в little-endian
+        """
+        if sys.byteorder == "little":
+            return b"".join(values.tobytes() for values in self.arrays())
+
+        swapped = []
+        for values in self.arrays():
+            values = array("d", values)
+            values.byteswap()
+            swapped.append(values.tobytes())
+        return b"".join(swapped)
+
+    def to_dict(self) -> dict:
+        return {
+            "symbol": self.symbol,
+            "bids": self.bids,
+            "asks": self.asks,
+            "timestamp": self.timestamp,
+        }
+
+
+def _levels(prices: Iterable[float], amounts: Iterable[float]) -> list[list[float]]:
+    return [[price, amount] for price, amount in zip(prices, amounts)]
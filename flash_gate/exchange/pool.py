@@ -1,96 +1,247 @@
-import asyncio
-from dataclasses import dataclass
-from queue import Queue
-from time import monotonic, sleep
-from aiohttp import ClientSession, TCPConnector
+import logging
+from contextlib import asynccontextmanager
+from time import monotonic
+from typing import AsyncIterator, Optional
+from ccxt.base.errors import RateLimitExceeded, RequestTimeout
+from .connections import ConnectionManager
+from .enums import Endpoint, SelectionPolicy
 from .exchanges import CcxtExchange
+from .scheduler import AdaptiveScheduler, Scheduler
 
-
-@dataclass
-class AcquiredExchange:
-    exchange: CcxtExchange
-    last_acquire: float
-    delay: float
-
-    @property
-    def remaining(self):
-        now = monotonic()
-        return self.last_acquire + self.delay - now
+logger = logging.getLogger(__name__)
 
 
 class ExchangePool:
-    # Ephemeral port
-    _LOCAL_PORT = 0
+    def __init__(
+        self,
+        exchange_id: str,
+        config: dict,
+        local_hosts: list[str],
+        rate_limit: Optional[float] = None,
+        connections: Optional[ConnectionManager] = None,
+    ):
+        """
+        Пул exchange с публичным соединением. Каждый exchange отправляет запросы
+        со своего локального IP-адреса
 
-    def __init__(self, exchange_id: str, config: dict, local_hosts: list[str], delay):
+        :param rate_limit: Допустимое количество запросов в секунду с одного IP
+        :param connections: Менеджер соединений, общий с приватным пулом
+        """
         self._exchange_id = exchange_id
         self._config = config | {"session": None}  # CCXT does not own session
+        self._connections = connections or ConnectionManager()
 
-        self._queue: Queue[AcquiredExchange] = Queue()
-        for exchange in self._create_exchanges(local_hosts):
-            self._queue.put(AcquiredExchange(exchange, monotonic(), delay))
+        exchanges = self._create_exchanges(local_hosts)
+        self._scheduler = Scheduler(exchanges, rate_limit)
 
     def _create_exchanges(self, local_hosts: list[str]) -> list[CcxtExchange]:
         exchanges = [self._create_exchange(local_host) for local_host in local_hosts]
         return exchanges
 
     def _create_exchange(self, local_host: str) -> CcxtExchange:
-        connector = TCPConnector(local_addr=(local_host, self._LOCAL_PORT))
-        session = ClientSession(connector=connector)
         exchange = CcxtExchange(self._exchange_id, self._config)
-        exchange.exchange.session = session
+        exchange.exchange.session = self._connections.get_session(local_host)
         return exchange
 
     async def acquire(self) -> CcxtExchange:
-        acquired_exchange = self._queue.get()
-        if (remaining := acquired_exchange.remaining) > 0:
-            await asyncio.sleep(remaining)
+        """
+        Получить exchange, который раньше остальных может отправить запрос
+        """
+        return await self._scheduler.acquire()
 
-        now = monotonic()
-        acquired_exchange.last_acquire = now
-        self._queue.put(acquired_exchange)
+    @asynccontextmanager
+    async def lease(self) -> AsyncIterator[CcxtExchange]:
+        """
+        Занять exchange на время запроса, чтобы с одного IP одновременно
+        выполнялось не больше одного запроса
+        """
+        exchange = await self._scheduler.acquire(exclusive=True)
+        try:
+            yield exchange
+        finally:
+            self._scheduler.release(exchange)
+
+    @property
+    def size(self) -> int:
+        return len(self._scheduler.slots)
 
-        return acquired_exchange.exchange
+    @property
+    def api_url(self) -> str:
+        return self._scheduler.items[0].api_url
+
+    @property
+    def exchanges(self) -> list[CcxtExchange]:
+        return self._scheduler.items
 
     async def close(self):
-        while not self._queue.empty():
-            acquired_exchange = self._queue.get()
-            session = acquired_exchange.exchange.exchange.session
-            await session.close()
+        await self._connections.close()
+
+
+class AccountMonitor:
+    """
+    Автоматический выключатель аккаунта
+
+    Передаёт планировщику задержки ответов и исключает аккаунт из выдачи
+    на время восстановления, если биржа ответила превышением лимита запросов
+    или несколько запросов подряд завершились таймаутом
+
+    После восстановления выключатель полуоткрыт: планировщик выдаёт аккаунт
+    для одного проверочного запроса. Превышение лимита или таймаут снова
+    исключают аккаунт из выдачи, любой ответ биржи замыкает выключатель
+    """
+
+    def __init__(
+        self,
+        scheduler: Scheduler[CcxtExchange],
+        exchange: CcxtExchange,
+        name: str,
+        cooldown: float,
+        max_timeouts: int,
+    ):
+        self.scheduler = scheduler
+        self.exchange = exchange
+        self.name = name
+        self.cooldown = cooldown
+        self.max_timeouts = max_timeouts
+        self.timeouts = 0
+        # Время monotonic, после которого выключатель полуоткрыт
+        self.half_open_at: Optional[float] = None
+
+    def request_started(self, endpoint: Endpoint) -> None:
+        self.scheduler.request_started(self.exchange)
+
+    def request_finished(
+        self, endpoint: Endpoint, latency: float, error: Optional[Exception]
+    ) -> None:
+        self.scheduler.request_finished(self.exchange, latency)
+
+        if self.half_open and monotonic() - latency >= self.half_open_at:
+            self.probe(error)
+        elif isinstance(error, RateLimitExceeded):
+            self.trip("rate limit exceeded")
+        elif isinstance(error, RequestTimeout):
+            self.timeouts += 1
+            if self.timeouts >= self.max_timeouts:
+                self.trip(f"{self.timeouts} timeouts in a row")
+        elif error is None:
+            self.timeouts = 0
+
+    def trip(self, reason: str) -> None:
+        logger.warning(
+            "Account %s is disabled for %s s: %s", self.name, self.cooldown, reason
+        )
+        self.scheduler.trip(self.exchange, self.cooldown)
+        self.timeouts = 0
+        self.half_open_at = monotonic() + self.cooldown
+
+    @property
+    def half_open(self) -> bool:
+        return self.half_open_at is not None
+
+    def probe(self, error: Optional[Exception]) -> None:
+        """
+        Замкнуть или снова разомкнуть выключатель по ответу на проверочный запрос
+        """
+        if isinstance(error, (RateLimitExceeded, RequestTimeout)):
+            self.trip(f"probe failed: {type(error).__name__}")
+        else:
+            logger.info("Account %s is recovered", self.name)
+            self.half_open_at = None
+            self.scheduler.close(self.exchange)
 
 
 class PrivateExchangePool:
-    def __init__(self, exchange_id: str, config: dict, accounts: list[dict], delay=0):
+    def __init__(
+        self,
+        exchange_id: str,
+        config: dict,
+        accounts: list[dict],
+        rate_limit: Optional[float] = None,
+        burst: float = 1,
+        selection: SelectionPolicy = SelectionPolicy.ADAPTIVE,
+        breaker_cooldown: float = 10,
+        breaker_timeouts: int = 3,
+        local_hosts: Optional[list[str]] = None,
+        connections: Optional[ConnectionManager] = None,
+    ):
         """
         Пул exchange с приватным соединением. Создает подключения с помощью переданных ключей.
+
+        :param rate_limit: Допустимое количество запросов в секунду с одного аккаунта
+        :param burst: Количество запросов, которое аккаунт может отправить без ожидания
+        :param selection: Способ выбора аккаунта для очередного запроса
+        :param breaker_cooldown: Время в секундах, на которое аккаунт исключается
+        из выдачи после превышения лимита или повторяющихся таймаутов
+        :param breaker_timeouts: Количество таймаутов подряд, после которого
+        аккаунт исключается из выдачи
+        :param local_hosts: Локальные IP-адреса, между которыми по очереди
+        распределяются аккаунты. Если не заданы, CCXT сам создает соединения
+        :param connections: Менеджер соединений, общий с публичным пулом
         """
         self._exchange_id = exchange_id
         self._config = config
-
-        self._queue: Queue[AcquiredExchange] = Queue()
-        for exchange in self._create_exchanges(accounts):
-            self._queue.put(AcquiredExchange(exchange, monotonic(), delay))
+        self._local_hosts = local_hosts or []
+        self._connections = connections or ConnectionManager()
+
+        exchanges = self._create_exchanges(accounts)
+        match selection:
+            case SelectionPolicy.ADAPTIVE:
+                self._scheduler = AdaptiveScheduler(exchanges, rate_limit, burst)
+            case SelectionPolicy.ROUND_ROBIN:
+                self._scheduler = Scheduler(exchanges, rate_limit, burst)
+            case _:
+                raise ValueError(f"Invalid selection policy: {selection}")
+
+        for i, exchange in enumerate(exchanges):
+            exchange.stats.listener = AccountMonitor(
+                self._scheduler, exchange, str(i), breaker_cooldown, breaker_timeouts
+            )
 
     def _create_exchanges(self, accounts: list[dict]) -> list[CcxtExchange]:
         """
         Создать подключения к бирже
         """
-        exchanges = [self._create_exchange(keys) for keys in accounts]
+        exchanges = [self._create_exchange(i, keys) for i, keys in enumerate(accounts)]
         return exchanges
 
-    def _create_exchange(self, keys: dict) -> CcxtExchange:
+    def _create_exchange(self, i: int, keys: dict) -> CcxtExchange:
         """
         Подключиться к бирже
+        :param i: Порядковый номер аккаунта
         :param keys: словарь с ключами api_key, secret_key
         """
-        config = self._config | keys
+        if not self._local_hosts:
+            return CcxtExchange(self._exchange_id, self._config | keys)
+
+        # CCXT does not own session
+        config = self._config | keys | {"session": None}
         exchange = CcxtExchange(self._exchange_id, config)
+        local_host = self._local_hosts[i % len(self._local_hosts)]
+        exchange.exchange.session = self._connections.get_session(local_host)
         return exchange
 
+    @property
+    def exchanges(self) -> list[CcxtExchange]:
+        return self._scheduler.items
+
     async def acquire(self) -> CcxtExchange:
         """
-        Получить очередной экземпляр exchange
+        Получить экземпляр exchange, который раньше остальных может отправить запрос
+        """
+        return await self._scheduler.acquire()
+
+    def metrics(self) -> dict:
+        """
+        Получить статистику запросов по аккаунтам и методам API
+
+        Аккаунты обозначаются порядковым номером в конфигурации, чтобы ключи
+        не попадали в логи
         """
-        acquired_exchange = self._queue.get()
-        self._queue.put(acquired_exchange)
-        return acquired_exchange.exchange
+        return {
+            str(i): exchange.stats.metrics()
+            for i, exchange in enumerate(self._scheduler.items)
+        }
+
+    def reset_metrics(self) -> None:
+        for exchange in self._scheduler.items:
+            exchange.stats.reset()
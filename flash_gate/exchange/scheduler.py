@@ -0,0 +1,203 @@
+import asyncio
+from dataclasses import dataclass, field
+from time import monotonic
+from typing import Generic, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass
+class TokenBucket:
+    """
+    Корзина токенов, ограничивающая частоту запросов
+
+    Если rate не задан, корзина не ограничивает запросы
+    """
+
+    rate: Optional[float]
+    capacity: float = 1
+    tokens: float = field(init=False)
+    updated: float = field(init=False, default_factory=monotonic)
+
+    def __post_init__(self):
+        self.tokens = self.capacity
+
+    def refill(self, now: float) -> None:
+        if self.rate is None:
+            return
+        elapsed = now - self.updated
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+        self.updated = now
+
+    def remaining(self, now: float) -> float:
+        """
+        Получить время в секундах, через которое в корзине появится токен
+        """
+        if self.rate is None:
+            return 0
+        self.refill(now)
+        if self.tokens >= 1:
+            return 0
+        return (1 - self.tokens) / self.rate
+
+    def consume(self, now: float) -> None:
+        if self.rate is None:
+            return
+        self.refill(now)
+        self.tokens -= 1
+
+
+@dataclass
+class Slot(Generic[T]):
+    item: T
+    bucket: TokenBucket
+    last_acquire: float = 0
+    busy: bool = False
+    # Время monotonic, до которого объект не выдаётся
+    blocked_until: float = 0
+    # Объект исключался из выдачи и ещё не возвращён вызовом close
+    tripped: bool = False
+    # Время в секундах, на которое объект исключается после выдачи для проверки
+    probe_timeout: float = 0
+    # Сглаженная задержка ответов в секундах
+    latency: Optional[float] = None
+    in_flight: int = 0
+
+
+class Scheduler(Generic[T]):
+    """
+    Планировщик, выдающий объекты с учётом ограничения частоты запросов
+
+    У каждого объекта своя корзина токенов. Вызывающие ожидают в порядке очереди,
+    не блокируя цикл событий, и получают объект, который освободится раньше
+    остальных. При равенстве выбирается объект, который дольше не использовался.
+
+    Объект можно занять монопольно: до вызова release другие монопольные
+    вызовы его не получат. Объект можно временно исключить из выдачи вызовом trip
+    """
+
+    # Вес новой задержки при сглаживании
+    LATENCY_SMOOTHING = 0.2
+
+    def __init__(self, items: list[T], rate: Optional[float] = None, burst: float = 1):
+        """
+        :param items: Распределяемые объекты
+        :param rate: Допустимое количество запросов в секунду для одного объекта
+        :param burst: Количество запросов, которое можно выполнить без ожидания
+        """
+        if not items:
+            raise ValueError("Scheduler requires at least one item")
+
+        self.slots = [Slot(item, TokenBucket(rate, burst)) for item in items]
+        self._lock = asyncio.Lock()
+        self._released = asyncio.Event()
+
+    @property
+    def items(self) -> list[T]:
+        return [slot.item for slot in self.slots]
+
+    async def acquire(self, exclusive: bool = False) -> T:
+        """
+        Дождаться свободного объекта и занять его
+
+        :param exclusive: Занять объект до вызова release
+        """
+        async with self._lock:
+            while True:
+                slots = [s for s in self.slots if not (exclusive and s.busy)]
+                if not slots:
+                    self._released.clear()
+                    await self._released.wait()
+                    continue
+
+                now = monotonic()
+                if not (available := [s for s in slots if s.blocked_until <= now]):
+                    await asyncio.sleep(min(s.blocked_until for s in slots) - now)
+                    continue
+
+                slot = min(available, key=lambda s: self._priority(s, now))
+                if (remaining := slot.bucket.remaining(now)) > 0:
+                    await asyncio.sleep(remaining)
+                    continue
+
+                slot.bucket.consume(now)
+                slot.last_acquire = now
+                slot.busy = exclusive
+                if slot.tripped:
+                    # Объект выдан для проверки: до её результата он не выдаётся
+                    slot.blocked_until = now + slot.probe_timeout
+                return slot.item
+
+    def release(self, item: T) -> None:
+        """
+        Освободить монопольно занятый объект
+        """
+        self._get_slot(item).busy = False
+        self._released.set()
+
+    def trip(self, item: T, duration: float) -> None:
+        """
+        Исключить объект из выдачи на duration секунд
+
+        Затем объект выдаётся один раз для проверки и снова исключается
+        на duration секунд. Так повторяется, пока не будет вызван close
+        """
+        slot = self._get_slot(item)
+        slot.blocked_until = monotonic() + duration
+        slot.tripped = True
+        slot.probe_timeout = duration
+
+    def close(self, item: T) -> None:
+        """
+        Вернуть в выдачу объект, прошедший проверку после trip
+        """
+        slot = self._get_slot(item)
+        slot.tripped = False
+        slot.blocked_until = 0
+
+    def request_started(self, item: T) -> None:
+        """
+        Учесть запрос, отправленный через объект
+        """
+        self._get_slot(item).in_flight += 1
+
+    def request_finished(self, item: T, latency: float) -> None:
+        """
+        Учесть завершение запроса, отправленного через объект
+
+        :param latency: Задержка ответа в секундах
+        """
+        slot = self._get_slot(item)
+        slot.in_flight = max(slot.in_flight - 1, 0)
+        if slot.latency is None:
+            slot.latency = latency
+        else:
+            alpha = self.LATENCY_SMOOTHING
+            slot.latency = alpha * latency + (1 - alpha) * slot.latency
+
+    def _get_slot(self, item: T) -> Slot[T]:
+        for slot in self.slots:
+            if slot.item is item:
+                return slot
+        raise ValueError("Item does not belong to scheduler")
+
+    @staticmethod
+    def _priority(slot: Slot, now: float) -> tuple:
+        return slot.bucket.remaining(now), slot.last_acquire
+
+
+class AdaptiveScheduler(Scheduler[T]):
+    """
+    Планировщик, выбирающий объект с наибольшим остатком лимита запросов
+    и наименьшим ожидаемым временем ответа
+
+    Ожидаемое время ответа — сглаженная задержка, умноженная на количество
+    запросов, которые выполнялись бы через объект вместе с новым
+    """
+
+    @staticmethod
+    def _priority(slot: Slot, now: float) -> tuple:
+        remaining = slot.bucket.remaining(now)
+        tokens = slot.bucket.tokens if slot.bucket.rate is not None else 0
+        expected = (slot.in_flight + 1) * (slot.latency or 0)
+        return remaining, -tokens, expected, slot.last_acquire
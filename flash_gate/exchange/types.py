@@ -1,13 +1,6 @@
 from typing import TypedDict, Optional
 
 
-class OrderBook(TypedDict):
-    bids: list
-    asks: list
-    symbol: str
-    timestamp: Optional[int]
-
-
 class Balance(TypedDict):
     assets: dict
     timestamp: Optional[int]
@@ -0,0 +1,159 @@
+import math
+from types import ModuleType
+from typing import Callable, Optional, Sequence
+from flash_gate.exchange.orderbook import ArrayOrderBook
+
+
+def import_numpy() -> Optional[ModuleType]:
+    """
+    Загрузить numpy, если он установлен
+    """
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+class OrderBookAnalytics:
+    """
+    Производные показатели ордербуков, рассчитываемые одним пакетом для всех
+    тикеров
+
+    Для каждого ордербука рассчитываются середина спреда, спред, микроцена,
+    дисбаланс объёмов первых levels уровней и накопленный объём сторон
+    в пределах относительных отступов от середины спреда. Если установлен
+    numpy, пакет рассчитывается векторно, иначе ордербуки обрабатываются
+    по одному на чистом Python с тем же результатом. numpy загружается
+    при создании объекта, то есть только если расчёт показателей включён
+    """
+
+    def __init__(self, levels: int = 5, offsets: Sequence[float] = (0.001, 0.005)):
+        """
+        :param levels: Количество лучших уровней для расчёта дисбаланса
+        :param offsets: Отступы от середины спреда в долях цены, в пределах
+        которых считается накопленный объём
+        """
+        self.levels = levels
+        self.offsets = tuple(offsets)
+        self.np = import_numpy()
+
+    def compute(self, orderbooks: list[ArrayOrderBook]) -> list[dict]:
+        """
+        Рассчитать показатели ордербуков
+        """
+        if not orderbooks:
+            return []
+        if self.np is None:
+            return [self._compute_one(orderbook) for orderbook in orderbooks]
+        return self._compute_batch(orderbooks)
+
+    def _compute_one(self, orderbook: ArrayOrderBook) -> dict:
+        bid_prices, bid_amounts, ask_prices, ask_amounts = orderbook.arrays()
+        best_bid = bid_prices[0] if bid_prices else math.nan
+        best_ask = ask_prices[0] if ask_prices else math.nan
+        bid_size = bid_amounts[0] if bid_amounts else 0.0
+        ask_size = ask_amounts[0] if ask_amounts else 0.0
+
+        mid = (best_bid + best_ask) / 2
+        microprice = _divide(
+            best_bid * ask_size + best_ask * bid_size, bid_size + ask_size
+        )
+        top_bids = sum(bid_amounts[: self.levels], 0.0)
+        top_asks = sum(ask_amounts[: self.levels], 0.0)
+
+        bid_depth = [
+            _depth(bid_prices, bid_amounts, lambda p: p >= mid * (1 - offset))
+            for offset in self.offsets
+        ]
+        ask_depth = [
+            _depth(ask_prices, ask_amounts, lambda p: p <= mid * (1 + offset))
+            for offset in self.offsets
+        ]
+        return {
+            "mid": _value(mid),
+            "spread": _value(best_ask - best_bid),
+            "microprice": _value(microprice),
+            "imbalance": _value(_divide(top_bids - top_asks, top_bids + top_asks)),
+            "depth": {"bids": bid_depth, "asks": ask_depth},
+        }
+
+    def _compute_batch(self, orderbooks: list[ArrayOrderBook]) -> list[dict]:
+        np = self.np
+        offsets = np.asarray(self.offsets, dtype=np.float64)
+
+        bid_prices = self._stack([o.bid_prices for o in orderbooks], np.nan)
+        bid_amounts = self._stack([o.bid_amounts for o in orderbooks], 0)
+        ask_prices = self._stack([o.ask_prices for o in orderbooks], np.nan)
+        ask_amounts = self._stack([o.ask_amounts for o in orderbooks], 0)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            best_bid = bid_prices[:, 0]
+            best_ask = ask_prices[:, 0]
+            bid_size = bid_amounts[:, 0]
+            ask_size = ask_amounts[:, 0]
+
+            mid = (best_bid + best_ask) / 2
+            spread = best_ask - best_bid
+            microprice = (best_bid * ask_size + best_ask * bid_size) / (
+                bid_size + ask_size
+            )
+
+            top_bids = bid_amounts[:, : self.levels].sum(axis=1)
+            top_asks = ask_amounts[:, : self.levels].sum(axis=1)
+            imbalance = (top_bids - top_asks) / (top_bids + top_asks)
+
+            # Границы цен: ордербук × отступ
+            bid_bounds = mid[:, None] * (1 - offsets)
+            ask_bounds = mid[:, None] * (1 + offsets)
+            # Уровни в пределах границы: ордербук × отступ × уровень
+            bid_mask = bid_prices[:, None, :] >= bid_bounds[:, :, None]
+            ask_mask = ask_prices[:, None, :] <= ask_bounds[:, :, None]
+            bid_depth = (bid_amounts[:, None, :] * bid_mask).sum(axis=2)
+            ask_depth = (ask_amounts[:, None, :] * ask_mask).sum(axis=2)
+
+        columns = zip(
+            mid.tolist(),
+            spread.tolist(),
+            microprice.tolist(),
+            imbalance.tolist(),
+            bid_depth.tolist(),
+            ask_depth.tolist(),
+        )
+        return [
+            {
+                "mid": _value(m),
+                "spread": _value(s),
+                "microprice": _value(p),
+                "imbalance": _value(i),
+                "depth": {"bids": bids, "asks": asks},
+            }
+            for m, s, p, i, bids, asks in columns
+        ]
+
+    def _stack(self, arrays: list, fill: float):
+        """
+        Собрать массивы разной длины в матрицу, дополнив короткие значением fill
+        """
+        np = self.np
+        width = max(max(len(values) for values in arrays), 1)
+        matrix = np.full((len(arrays), width), fill, dtype=np.float64)
+        for row, values in zip(matrix, arrays):
+            if len(values):
+                row[: len(values)] = np.frombuffer(values, dtype=np.float64)
+        return matrix
+
+
+def _value(value: float) -> Optional[float]:
+    return None if math.isnan(value) else value
+
+
+def _divide(numerator: float, denominator: float) -> float:
+    return numerator / denominator if denominator else math.nan
+
+
+def _depth(prices, amounts, within: Callable[[float], bool]) -> float:
+    """
+    Получить объём уровней, цены которых удовлетворяют условию
+    """
+    return sum((a for p, a in zip(prices, amounts) if within(p)), 0.0)
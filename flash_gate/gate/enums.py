@@ -0,0 +1,22 @@
+from enum import Enum
+
+
+class DataCollectionMethod(str, Enum):
+    """
+    Способ получения данных с биржи
+    """
+
+    WEBSOCKET = "websocket"
+    REST = "rest"
+
+
+class TraceStage(str, Enum):
+    """
+    Этап обработки команды
+    """
+
+    DISPATCH = "dispatch"
+    ACQUIRE = "acquire"
+    REQUEST_START = "request_start"
+    REQUEST_END = "request_end"
+    REPLY = "reply"
@@ -0,0 +1,70 @@
+from time import monotonic
+from typing import Optional
+from flash_gate.exchange.orderbook import ArrayOrderBook
+
+# Интервал повторной отправки неизменившегося ордербука по умолчанию в секундах
+DEFAULT_HEARTBEAT = 1.0
+
+
+class OrderBookChangeFilter:
+    """
+    Фильтр, пропускающий только изменившиеся ордербуки
+
+    Для каждого тикера хранится отпечаток последнего отправленного стакана.
+    Неизменившийся ордербук всё равно отправляется, когда с последней отправки
+    прошло больше интервала heartbeat, чтобы получатели отличали спокойный
+    рынок от остановившегося потока
+    """
+
+    def __init__(
+        self, enabled: bool = True, heartbeat: Optional[float] = DEFAULT_HEARTBEAT
+    ):
+        """
+        :param enabled: Если фильтр выключен, отправляются все ордербуки
+        :param heartbeat: Интервал повторной отправки неизменившегося ордербука
+        в секундах. None отключает повторную отправку
+        """
+        self.enabled = enabled
+        self.heartbeat = heartbeat
+        self.published = 0
+        self.suppressed = 0
+        self._last: dict[str, tuple[int, float]] = {}
+
+    def is_changed(self, orderbook: dict | ArrayOrderBook) -> bool:
+        """
+        Проверить, нужно ли отправлять ордербук, и учесть его в счётчиках
+        """
+        if not self.enabled:
+            self.published += 1
+            return True
+
+        symbol = orderbook["symbol"]
+        fingerprint = self.fingerprint(orderbook)
+        now = monotonic()
+
+        if last := self._last.get(symbol):
+            last_fingerprint, last_published = last
+            heartbeat = self.heartbeat
+            expired = heartbeat is not None and now - last_published >= heartbeat
+            if fingerprint == last_fingerprint and not expired:
+                self.suppressed += 1
+                return False
+
+        self._last[symbol] = (fingerprint, now)
+        self.published += 1
+        return True
+
+    @staticmethod
+    def fingerprint(orderbook: dict | ArrayOrderBook) -> int:
+        """
+        Получить отпечаток отправляемых уровней ордербука
+        """
+        if isinstance(orderbook, ArrayOrderBook):
+            return orderbook.fingerprint()
+        bids = tuple(map(tuple, orderbook["bids"]))
+        asks = tuple(map(tuple, orderbook["asks"]))
+        return hash((bids, asks))
+
+    def reset_counters(self) -> None:
+        self.published = 0
+        self.suppressed = 0
@@ -14,18 +14,30 @@ class EventFormatter:
 
     @staticmethod
     def metrics_data(
-        orderbook_latency_percentile: LatencyPercentile,
+        orderbook_latency_percentile: LatencyPercentile | None,
         orderbook_rps: int,
         private_api_total_rps: int,
+        orderbook_published: int = 0,
+        orderbook_suppressed: int = 0,
+        transmitter: dict | None = None,
+        commands: dict | None = None,
+        accounts: dict | None = None,
+        connections: dict | None = None,
     ) -> Metrics:
         return {
             "public_api": {
                 "orderbook": {
                     "latency_percentile": orderbook_latency_percentile,
                     "rps": orderbook_rps,
+                    "published": orderbook_published,
+                    "suppressed": orderbook_suppressed,
                 }
             },
             "private_api": {
                 "total_rps": private_api_total_rps,
+                "accounts": accounts or {},
             },
+            "transmitter": transmitter or {},
+            "commands": commands or {},
+            "connections": connections or {},
         }
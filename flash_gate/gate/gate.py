@@ -3,22 +3,35 @@ import json
 import logging
 import uuid
 from time import monotonic_ns
-from typing import NoReturn, Coroutine
-import ccxt.base.errors
+from typing import NoReturn, Coroutine, Optional
+from ccxt.base.errors import OrderNotFound, RateLimitExceeded, RequestTimeout
 from cachetools import LRUCache
 from rock import ExchangeFactory, ExchangeName
 from rock.exchanges.dataclasses import Balance
 from rock.exchanges.enum import OrderStatus
 
-from flash_gate.cache.memcached import Memcached
-from flash_gate.exchange import ExchangePool
+from flash_gate.cache.balance import BalanceSnapshot
+from flash_gate.cache.index import OrderIndex
+from flash_gate.cache.markets import MarketCache
+from flash_gate.cache.orders import OrderStore
+from flash_gate.exchange import CcxtExchange, ExchangePool
+from flash_gate.exchange.connections import ConnectionManager
+from flash_gate.exchange.formatters import RockBalanceFormatter, RockOrderFormatter
+from flash_gate.exchange.orderbook import ArrayOrderBook
 from flash_gate.exchange.pool import PrivateExchangePool
+from flash_gate.replay.recorder import Recorder
 from flash_gate.transmitter import AeronTransmitter
 from flash_gate.transmitter.enums import EventAction, Destination
+from flash_gate.transmitter.formatters import wrap_message
 from flash_gate.transmitter.types import Event, EventNode, EventType
+from .analytics import OrderBookAnalytics
+from .enums import DataCollectionMethod, TraceStage
+from .filters import OrderBookChangeFilter
 from .formatters import EventFormatter
 from .parsers import ConfigParser
-from .statistics import latency_percentile, ns_to_us
+from .progress import CancelAllProgress
+from .statistics import LatencyHistogram, ns_to_us
+from .tracing import CommandTrace, CommandTracer
 from .typing import Metrics
 
 logger = logging.getLogger(__name__)
@@ -30,7 +43,17 @@ class Gate:
     Шлюз, принимающий команды от торгового ядра и выполняющий их на бирже
     """
 
-    def __init__(self, config: dict):
+    # Задержка перед восстановлением подписки на ордербук в секундах
+    STREAM_RECONNECT_MIN_DELAY = 0.1
+    STREAM_RECONNECT_MAX_DELAY = 5
+    # Количество запросов массовой отмены, выполняемых одновременно
+    CANCEL_ALL_CONCURRENCY = 4
+
+    def __init__(self, config: dict, transmitter=None):
+        """
+        :param transmitter: Передатчик сообщений. По умолчанию создаётся
+        передатчик Aeron
+        """
         config_parser = ConfigParser(config)
         exchange_id = config_parser.exchange_id
         exchange_config = config_parser.exchange_config
@@ -38,33 +61,92 @@ class Gate:
         rock_config = config_parser.rock_config
 
         self.tickers = config_parser.tickers
+        self.order_book_depths = config_parser.order_book_depths
+        # При опросе все ордербуки запрашиваются одним запросом
+        # с наибольшей глубиной
+        self.order_book_limit = max(
+            self.order_book_depths.values(), default=config_parser.order_book_limit
+        )
+        self.order_book_collection_method = config_parser.order_book_collection_method
         self.assets = config_parser.assets
 
         # Кеширование
-        self.event_id_by_client_order_id = Memcached(key_prefix="event_id")
-        self.order_id_by_client_order_id = Memcached(key_prefix="order_id")
-        self.client_order_id_by_order_id = Memcached(key_prefix="client_order_id")
+        self.order_index = OrderIndex(
+            maxsize=config_parser.order_index_size,
+            ttl=config_parser.order_index_ttl,
+        )
         self.canceled_orders = LRUCache(10000)
+        self.order_store = OrderStore(
+            maxsize=config_parser.order_index_size,
+            max_age=config_parser.order_state_max_age,
+        )
+        self.rock_order_formatter = RockOrderFormatter()
+        self.rock_balance_formatter = RockBalanceFormatter()
+        self.balance_snapshot = BalanceSnapshot(config_parser.balance_max_age)
+        self.market_cache = MarketCache(
+            config_parser.markets_cache_path,
+            exchange_id,
+            config_parser.markets_cache_ttl,
+        )
+
+        # Сколько ордеров одной команды выставляется одновременно
+        self.create_orders_concurrency = config_parser.create_orders_concurrency
 
         # Соединения
         self.rock = ExchangeFactory.create_exchange(rock_name, rock_config)
+        # Публичный и приватный пулы используют общие соединения с одного IP
+        self.connections = ConnectionManager(
+            warm_connections=config_parser.warm_connections,
+            keepalive_interval=config_parser.keepalive_interval,
+            dns_cache_ttl=config_parser.dns_cache_ttl,
+        )
         self.private_exchange_pool = PrivateExchangePool(
             exchange_id=exchange_id,
             config=exchange_config,
             accounts=config_parser.accounts,
+            rate_limit=config_parser.private_rate_limit,
+            burst=config_parser.private_rate_burst,
+            selection=config_parser.account_selection,
+            breaker_cooldown=config_parser.breaker_cooldown,
+            breaker_timeouts=config_parser.breaker_timeouts,
+            local_hosts=config_parser.private_ip,
+            connections=self.connections,
         )
         self.exchange_pool = ExchangePool(
             exchange_id,
             config_parser.public_config,
             config_parser.public_ip,
-            config_parser.public_delay,
+            config_parser.public_rate_limit,
+            self.connections,
         )
-        self.transmitter = AeronTransmitter(self.handler, config)
+        if transmitter is None:
+            transmitter = AeronTransmitter(self.handler, config)
+        self.transmitter = transmitter
+
+        # Запись входящих команд и запросов к бирже для воспроизведения
+        self.recorder = None
+        if (record_path := config_parser.record_path) is not None:
+            self.recorder = Recorder(record_path)
+            for exchange in self.exchanges:
+                exchange.recorder = self.recorder
 
         # Метрики
-        self.orderbook_latencies = []
+        self.orderbook_latencies = LatencyHistogram()
         self.orderbook_rps = 0
         self.private_api_total_rps = 0
+        self.tracer = CommandTracer()
+        self.trace_commands = config_parser.trace_commands
+
+        # Версии последних опубликованных ордербуков: время отправки запроса
+        # и временная метка биржи
+        self.orderbook_versions: dict[str, tuple[int, int | None]] = {}
+        self.orderbook_filter = OrderBookChangeFilter(
+            enabled=config_parser.suppress_unchanged_order_books,
+            heartbeat=config_parser.order_book_heartbeat,
+        )
+        self.orderbook_analytics = None
+        if (analytics := config_parser.order_book_analytics) is not None:
+            self.orderbook_analytics = OrderBookAnalytics(**analytics)
 
         # Временное хранение сильных ссылок на задачи
         self.background_tasks = set()
@@ -74,31 +156,47 @@ class Gate:
         await asyncio.gather(*tasks)
 
     def get_periodical_tasks(self) -> list[Coroutine]:
-        return [
+        tasks = [
             self.transmitter.run(),
             self.watch_orderbooks(),
             self.watch_balance(),
             self.watch_orders(),
             self.metrics(),
+            self.order_index.run(),
+            self.connections.keep_alive(self.exchange_pool.api_url),
         ]
+        return tasks
 
     def handler(self, message: str):
+        received = monotonic_ns()
+        if self.recorder is not None:
+            self.recorder.command(message)
         logger.debug("Message: %s", message)
         event = self.deserialize_message(message)
         if event is not None:
-            self.create_task(event)
+            self.create_task(event, received)
+            # Логирование откладывается, чтобы запрос к бирже начался раньше
+            asyncio.get_running_loop().call_soon(self.log, message)
+
+    @property
+    def exchanges(self) -> list[CcxtExchange]:
+        """
+        Все подключения к бирже: публичные и приватные
+        """
+        return self.exchange_pool.exchanges + self.private_exchange_pool.exchanges
 
     async def get_exchange(self):
         """
         Получить экземпляр биржи
         """
         self.private_api_total_rps += 1
-        return await self.private_exchange_pool.acquire()
+        exchange = await self.private_exchange_pool.acquire()
+        self.tracer.mark(TraceStage.ACQUIRE)
+        return exchange
 
     def deserialize_message(self, message: str) -> Event | None:
         try:
             event = json.loads(message)
-            self.log(event)
             return event
         except Exception as e:
             logger.error("Message deserialize error: %s", e)
@@ -109,25 +207,31 @@ class Gate:
                 "message": f"Message deserialize error: {e}",
                 "data": [message],
             }
-            self.transmitter.offer(log_event, Destination.CORE)
-            self.transmitter.offer(log_event, Destination.LOGS)
+            self.transmitter.offer(log_event, Destination.CORE, Destination.LOGS)
 
-    def log(self, event: Event):
-        event = event.copy()
-        event["node"] = EventNode.GATE
-        self.transmitter.offer(event, Destination.LOGS)
+    def log(self, message: str):
+        """
+        Отправить входящее сообщение в логи в конверте с узлом гейта
 
-    def create_task(self, event: Event):
+        Сообщение отправляется в исходном виде без повторного кодирования
+        """
+        wrapped = wrap_message(message, EventNode.GATE)
+        self.transmitter.offer_raw(wrapped, Destination.LOGS)
+
+    def create_task(self, event: Event, received: int | None = None):
         if not isinstance(event, dict):
             return
 
+        if received is None:
+            received = monotonic_ns()
+
         match event.get("action"):
             case EventAction.CREATE_ORDERS:
                 action = self.create_orders(event)
             case EventAction.CANCEL_ORDERS:
                 action = self.cancel_orders(event)
             case EventAction.CANCEL_ALL_ORDERS:
-                action = self.cancel_all_orders()
+                action = self.cancel_all_orders(event)
             case EventAction.GET_ORDERS:
                 action = self.get_orders(event)
             case EventAction.GET_BALANCE:
@@ -141,53 +245,205 @@ class Gate:
                     "message": f"Unsupported action: {event.get('action')}",
                     "data": [event],
                 }
-                self.transmitter.offer(log_event, Destination.CORE)
-                self.transmitter.offer(log_event, Destination.LOGS)
+                self.transmitter.offer(log_event, Destination.CORE, Destination.LOGS)
                 action = asyncio.sleep(0)
 
-        task = asyncio.create_task(action)
+        task = asyncio.create_task(self.run_command(event, action, received))
 
         # Save reference to result, to avoid task disappearing
         self.background_tasks.add(task)
         task.add_done_callback(self.background_tasks.discard)
 
+    async def run_command(self, event: Event, action: Coroutine, received: int):
+        """
+        Выполнить команду, отслеживая время её обработки
+        """
+        action_name = event.get("action")
+        if action_name not in EventAction.__members__.values():
+            action_name = "unsupported"
+
+        trace = self.tracer.start(event.get("event_id"), action_name, received)
+        self.tracer.mark(TraceStage.DISPATCH)
+        try:
+            await action
+        finally:
+            if self.trace_commands:
+                self.offer_trace(trace)
+
+    def offer_trace(self, trace: CommandTrace) -> None:
+        """
+        Отправить этапы обработки команды на сервер логирования
+        """
+        event: Event = {
+            "event_id": trace.event_id,
+            "action": EventAction.TRACE,
+            "data": {
+                "action": trace.action,
+                "stages": [[stage, elapsed] for stage, elapsed in trace.stages],
+            },
+        }
+        self.transmitter.offer(event, Destination.LOGS)
+
+    async def reply(self, event: Event, *destinations: Destination) -> None:
+        """
+        Отправить ответ на команду ядра, дождавшись места в очереди
+        """
+        await self.transmitter.offer_wait(event, *destinations)
+        self.tracer.mark(TraceStage.REPLY)
+
     async def create_orders(self, event: Event):
-        for param in event.get("data", []):
-            await self.create_order(param, event.get("event_id"))
+        """
+        Выставить ордера команды
+
+        Ограничение на количество одновременных запросов действует внутри
+        команды: разные команды выполняются независимо друг от друга
+        """
+        event_id = event.get("event_id")
+        semaphore = asyncio.Semaphore(self.create_orders_concurrency)
+
+        async def create_order(param: dict):
+            async with semaphore:
+                await self.create_order(param, event_id)
+
+        await asyncio.gather(*(create_order(p) for p in event.get("data", [])))
 
     async def get_orders(self, event: Event):
-        for param in event.get("data", []):
-            await self.get_order(param)
+        orders = [self.get_order(param) for param in event.get("data", [])]
+        await asyncio.gather(*orders)
 
     async def cancel_orders(self, event: Event):
         for param in event.get("data", []):
             await self.cancel_order(param)
 
-    async def cancel_all_orders(self):
+    async def cancel_all_orders(self, event: Event):
+        """
+        Отменить все открытые ордера по тикерам гейта
+
+        Тикеры обрабатываются одновременно, но одновременно выполняется
+        не больше CANCEL_ALL_CONCURRENCY запросов, а запросы распределяются между
+        аккаунтами с учётом лимита запросов. После каждого изменения ядру
+        отправляется список ордеров, отмена которых ещё не подтверждена
+        """
+        progress = CancelAllProgress()
+        limit = asyncio.Semaphore(self.CANCEL_ALL_CONCURRENCY)
+        self.tracer.mark(TraceStage.REQUEST_START)
+        symbols = [
+            self.cancel_symbol_orders(event, s, progress, limit) for s in self.tickers
+        ]
+        await asyncio.gather(*symbols)
+        self.tracer.mark(TraceStage.REQUEST_END)
+
+        event: Event = {
+            "event_id": event.get("event_id"),
+            "action": EventAction.CANCEL_ALL_ORDERS,
+            "data": progress.data(finished=True),
+        }
+        await self.reply(event, Destination.CORE, Destination.LOGS)
+
+    async def cancel_symbol_orders(
+        self,
+        event: Event,
+        symbol: str,
+        progress: CancelAllProgress,
+        limit: asyncio.Semaphore,
+    ):
         try:
-            exchange = await self.get_exchange()
-            await exchange.cancel_all_orders(self.tickers)
+            async with limit:
+                exchange = await self.get_exchange()
+                orders = await exchange.fetch_open_orders([symbol])
+        except Exception as e:
+            message = self.describe_exception(e)
+            log_event: Event = {
+                "event_id": str(uuid.uuid4()),
+                "event": EventType.ERROR,
+                "action": EventAction.CANCEL_ALL_ORDERS,
+                "message": message,
+                "data": [symbol],
+            }
+            self.transmitter.offer(log_event, Destination.CORE, Destination.LOGS)
+            return
 
+        if not orders:
+            return
+
+        order_ids = [order["id"] for order in orders]
+        for order_id in order_ids:
+            progress.add(order_id, symbol)
+        self.offer_cancel_progress(event, progress)
+
+        if not exchange.has_cancel_all_orders:
+            cancels = [
+                self.cancel_live_order(event, o, progress, limit) for o in orders
+            ]
+            await asyncio.gather(*cancels)
+            return
+
+        try:
+            async with limit:
+                exchange = await self.get_exchange()
+                await exchange.cancel_symbol_orders(symbol)
         except Exception as e:
-            logger.exception(e)
+            self.describe_exception(e)
+            for order_id in order_ids:
+                progress.fail(order_id)
+        else:
+            for order_id in order_ids:
+                self.mark_canceled(order_id)
+                progress.cancel(order_id)
+        self.offer_cancel_progress(event, progress)
+
+    async def cancel_live_order(
+        self,
+        event: Event,
+        order: dict,
+        progress: CancelAllProgress,
+        limit: asyncio.Semaphore,
+    ):
+        order_id = order["id"]
+        try:
+            async with limit:
+                exchange = await self.get_exchange()
+                await exchange.cancel_order({"id": order_id, "symbol": order["symbol"]})
+        except OrderNotFound:
+            progress.discard(order_id)
+        except Exception as e:
+            self.describe_exception(e)
+            progress.fail(order_id)
+        else:
+            self.mark_canceled(order_id)
+            progress.cancel(order_id)
+        self.offer_cancel_progress(event, progress)
+
+    def offer_cancel_progress(self, event: Event, progress: CancelAllProgress):
+        event: Event = {
+            "event_id": event.get("event_id"),
+            "action": EventAction.CANCEL_ALL_ORDERS,
+            "data": progress.data(),
+        }
+        self.transmitter.offer(event, Destination.CORE, Destination.LOGS)
+
+    def mark_canceled(self, order_id: str):
+        self.canceled_orders[order_id] = True
+        # Итоговое состояние ордера придёт из потока ордеров или по запросу
+        self.order_store.invalidate(order_id)
 
     async def create_order(self, param: dict, event_id: str):
         try:
             exchange = await self.get_exchange()
+            self.tracer.mark(TraceStage.REQUEST_START)
             order = await exchange.create_order(param)
+            self.tracer.mark(TraceStage.REQUEST_END)
 
             order["client_order_id"] = param["client_order_id"]
-            self.event_id_by_client_order_id.set(order["client_order_id"], event_id)
-            self.order_id_by_client_order_id.set(order["client_order_id"], order["id"])
-            self.client_order_id_by_order_id.set(order["id"], order["client_order_id"])
+            self.order_index.add(order["client_order_id"], order["id"], event_id)
+            self.order_store.add(order["id"], order, order["status"])
 
             event: Event = {
                 "event_id": event_id,
                 "action": EventAction.CREATE_ORDERS,
                 "data": [order],
             }
-            self.transmitter.offer(event, Destination.CORE)
-            self.transmitter.offer(event, Destination.LOGS)
+            await self.reply(event, Destination.CORE, Destination.LOGS)
 
         except Exception as e:
             message = self.describe_exception(e)
@@ -198,12 +454,12 @@ class Gate:
                 "message": message,
                 "data": [param],
             }
-            self.transmitter.offer(log_event, Destination.CORE)
-            self.transmitter.offer(log_event, Destination.LOGS)
+            await self.reply(log_event, Destination.CORE, Destination.LOGS)
 
     async def cancel_order(self, param: dict):
         client_order_id = param["client_order_id"]
-        order_id = self.order_id_by_client_order_id.get(param["client_order_id"])
+        entry = await self.order_index.fetch(client_order_id)
+        order_id = entry.order_id if entry else None
         symbol = param["symbol"]
 
         try:
@@ -211,14 +467,14 @@ class Gate:
                 raise ValueError(f"order_id not found for {client_order_id}")
 
             exchange = await self.get_exchange()
+            self.tracer.mark(TraceStage.REQUEST_START)
             await exchange.cancel_order({"id": order_id, "symbol": symbol})
-            self.canceled_orders[order_id] = True
+            self.tracer.mark(TraceStage.REQUEST_END)
+            self.mark_canceled(order_id)
 
-        except ccxt.base.errors.OrderNotFound as e:
+        except OrderNotFound as e:
             event: Event = {
-                "event_id": self.event_id_by_client_order_id.get(
-                    param["client_order_id"]
-                ),
+                "event_id": entry.event_id,
                 "action": EventAction.ORDERS_UPDATE,
                 "data": [
                     {
@@ -235,8 +491,7 @@ class Gate:
                     }
                 ],
             }
-            self.transmitter.offer(event, Destination.CORE)
-            self.transmitter.offer(event, Destination.LOGS)
+            await self.reply(event, Destination.CORE, Destination.LOGS)
 
             logger.exception(e)
             log_event: Event = {
@@ -246,8 +501,7 @@ class Gate:
                 "message": str(e),
                 "data": [param],
             }
-            self.transmitter.offer(log_event, Destination.CORE)
-            self.transmitter.offer(log_event, Destination.LOGS)
+            await self.reply(log_event, Destination.CORE, Destination.LOGS)
 
         except Exception as e:
             message = self.describe_exception(e)
@@ -258,32 +512,28 @@ class Gate:
                 "message": message,
                 "data": [param],
             }
-            self.transmitter.offer(log_event, Destination.CORE)
-            self.transmitter.offer(log_event, Destination.LOGS)
+            await self.reply(log_event, Destination.CORE, Destination.LOGS)
 
     async def get_order(self, param: dict):
         try:
             client_order_id = param["client_order_id"]
-            order_id = self.order_id_by_client_order_id.get(client_order_id)
+            entry = await self.order_index.fetch(client_order_id)
             symbol = param["symbol"]
 
-            if order_id is None:
+            if entry is None or entry.order_id is None:
                 raise ValueError(f"order_id not found for {client_order_id}")
 
-            exchange = await self.get_exchange()
-            order = await exchange.fetch_order({"id": order_id, "symbol": symbol})
-
-            order["client_order_id"] = param["client_order_id"]
+            if (order := self.order_store.get(entry.order_id)) is None:
+                order = await self.fetch_order(entry.order_id, symbol)
+                order["client_order_id"] = param["client_order_id"]
+                self.order_store.put(entry.order_id, order, order["status"])
 
             event: Event = {
-                "event_id": self.event_id_by_client_order_id.get(
-                    order["client_order_id"]
-                ),
+                "event_id": entry.event_id,
                 "action": EventAction.GET_ORDERS,
                 "data": [order],
             }
-            self.transmitter.offer(event, Destination.CORE)
-            self.transmitter.offer(event, Destination.LOGS)
+            await self.reply(event, Destination.CORE, Destination.LOGS)
 
         except Exception as e:
             message = self.describe_exception(e)
@@ -294,8 +544,17 @@ class Gate:
                 "message": message,
                 "data": [param],
             }
-            self.transmitter.offer(log_event, Destination.CORE)
-            self.transmitter.offer(log_event, Destination.LOGS)
+            await self.reply(log_event, Destination.CORE, Destination.LOGS)
+
+    async def fetch_order(self, order_id: str, symbol: str):
+        """
+        Запросить состояние ордера у биржи
+        """
+        exchange = await self.get_exchange()
+        self.tracer.mark(TraceStage.REQUEST_START)
+        order = await exchange.fetch_order({"id": order_id, "symbol": symbol})
+        self.tracer.mark(TraceStage.REQUEST_END)
+        return order
 
     @staticmethod
     def describe_exception(exception: Exception):
@@ -303,9 +562,9 @@ class Gate:
         Получить небольшое сообщение, описывающее исключение.
         Логгирует исключение, если оно не относится к ожидаемым.
         """
-        if isinstance(exception, ccxt.errors.RequestTimeout):
+        if isinstance(exception, RequestTimeout):
             message = "Timeout error"
-        elif isinstance(exception, ccxt.errors.RateLimitExceeded):
+        elif isinstance(exception, RateLimitExceeded):
             message = "Rate limit exceeded"
         else:
             logger.exception(exception)
@@ -317,16 +576,18 @@ class Gate:
             assets = self.assets
 
         try:
-            exchange = await self.get_exchange()
-            balance = await exchange.fetch_partial_balance(assets)
+            # Снимок из потока приводится к виду ответа REST
+            if (snapshot := self.balance_snapshot.get(assets)) is not None:
+                balance = self.rock_balance_formatter.format(snapshot)
+            else:
+                balance = await self.fetch_balance(assets)
 
             event: Event = {
                 "event_id": event["event_id"],
                 "action": EventAction.GET_BALANCE,
                 "data": balance,
             }
-            self.transmitter.offer(event, Destination.BALANCE)
-            self.transmitter.offer(event, Destination.LOGS)
+            await self.reply(event, Destination.BALANCE, Destination.LOGS)
 
         except Exception as e:
             message = self.describe_exception(e)
@@ -337,27 +598,121 @@ class Gate:
                 "message": message,
                 "data": assets,
             }
-            self.transmitter.offer(log_event, Destination.CORE)
-            self.transmitter.offer(log_event, Destination.LOGS)
+            await self.reply(log_event, Destination.CORE, Destination.LOGS)
+
+    async def fetch_balance(self, assets: list[str]):
+        """
+        Запросить баланс у биржи
+        """
+        exchange = await self.get_exchange()
+        self.tracer.mark(TraceStage.REQUEST_START)
+        balance = await exchange.fetch_partial_balance(assets)
+        self.tracer.mark(TraceStage.REQUEST_END)
+        return balance
 
     async def watch_orderbooks(self):
+        match self.order_book_collection_method:
+            case DataCollectionMethod.WEBSOCKET:
+                # По одной подписке на каждый тикер
+                watchers = [self.stream_orderbook(symbol) for symbol in self.tickers]
+            case _:
+                # По одному опрашивающему на каждый локальный IP-адрес, чтобы
+                # с каждого адреса постоянно выполнялся один запрос
+                size = self.exchange_pool.size
+                watchers = [self.poll_orderbooks() for _ in range(size)]
+
+        await asyncio.gather(*watchers)
+
+    async def stream_orderbook(self, symbol: str):
+        """
+        Получать ордербук по WS и отправлять каждое обновление
+
+        При ошибке подписки ордербук запрашивается по HTTP с обычной частотой,
+        пока подписка не восстановится
+        """
+        exchange = await self.exchange_pool.acquire()
+        depth = self.order_book_depths[symbol]
+        reconnect_delay = self.STREAM_RECONNECT_MIN_DELAY
+        failover: Optional[asyncio.Task] = None
+
+        try:
+            while True:
+                try:
+                    orderbook = await exchange.watch_order_book(symbol, depth)
+                    if failover is not None:
+                        failover.cancel()
+                        failover = None
+                    self.offer_orderbook(orderbook, monotonic_ns())
+                    reconnect_delay = self.STREAM_RECONNECT_MIN_DELAY
+
+                except Exception as e:
+                    message = self.describe_exception(e)
+                    log_event: Event = {
+                        "event_id": str(uuid.uuid4()),
+                        "event": EventType.ERROR,
+                        "action": EventAction.ORDER_BOOK_UPDATE,
+                        "message": message,
+                        "data": [symbol],
+                    }
+                    self.transmitter.offer(log_event, Destination.LOGS)
+
+                    if failover is None:
+                        failover = asyncio.create_task(self.poll_orderbook(symbol))
+                    await asyncio.sleep(reconnect_delay)
+                    reconnect_delay = min(
+                        reconnect_delay * 2, self.STREAM_RECONNECT_MAX_DELAY
+                    )
+        finally:
+            if failover is not None:
+                failover.cancel()
+
+    async def poll_orderbook(self, symbol: str):
+        """
+        Запрашивать ордербук одного тикера по HTTP, пока задачу не отменят
+        """
         while True:
-            try:
-                exchange = await self.exchange_pool.acquire()
+            await self.fetch_orderbook(symbol)
+            # Запрос мог завершиться ошибкой, не уступив цикл событий
+            await asyncio.sleep(0)
 
+    async def fetch_orderbook(self, symbol: str):
+        """
+        Получить ордербук одного тикера по HTTP и отправить его
+        """
+        try:
+            async with self.exchange_pool.lease() as exchange:
                 start = monotonic_ns()
-                orderbooks = await exchange.fetch_order_books(self.tickers, 10)
+                depth = self.order_book_depths[symbol]
+                orderbook = await exchange.fetch_order_book(symbol, depth)
                 end = monotonic_ns()
 
+            self.save_orderbook_metric(start, end)
+            self.offer_orderbook(orderbook, start)
+
+        except Exception as e:
+            message = self.describe_exception(e)
+            log_event: Event = {
+                "event_id": str(uuid.uuid4()),
+                "event": EventType.ERROR,
+                "action": EventAction.ORDER_BOOK_UPDATE,
+                "message": message,
+                "data": [symbol],
+            }
+            self.transmitter.offer(log_event, Destination.CORE, Destination.LOGS)
+
+    async def poll_orderbooks(self):
+        while True:
+            try:
+                async with self.exchange_pool.lease() as exchange:
+                    start = monotonic_ns()
+                    orderbooks = await exchange.fetch_order_books(
+                        self.tickers, self.order_book_limit, self.order_book_depths
+                    )
+                    end = monotonic_ns()
+
                 self.save_orderbook_metric(start, end)
 
-                for orderbook in orderbooks:
-                    event: Event = {
-                        "event_id": str(uuid.uuid4()),
-                        "action": EventAction.ORDER_BOOK_UPDATE,
-                        "data": orderbook,
-                    }
-                    self.transmitter.offer(event, Destination.ORDER_BOOK)
+                self.offer_orderbooks(orderbooks, start)
 
             except Exception as e:
                 message = self.describe_exception(e)
@@ -368,15 +723,73 @@ class Gate:
                     "message": message,
                     "data": self.tickers,
                 }
-                self.transmitter.offer(log_event, Destination.CORE)
-                self.transmitter.offer(log_event, Destination.LOGS)
+                self.transmitter.offer(log_event, Destination.CORE, Destination.LOGS)
+
+    def offer_orderbook(self, orderbook: ArrayOrderBook, requested_at: int) -> None:
+        """
+        Отправить ордербук, если он новее уже отправленного и отличается от него
+        """
+        self.offer_orderbooks([orderbook], requested_at)
+
+    def offer_orderbooks(
+        self, orderbooks: list[ArrayOrderBook], requested_at: int
+    ) -> None:
+        """
+        Отправить ордербуки, которые новее уже отправленных и отличаются от них
+
+        Показатели рассчитываются одним пакетом только для отправляемых ордербуков
+        """
+        orderbooks = [
+            orderbook
+            for orderbook in orderbooks
+            if not self.is_orderbook_outdated(orderbook, requested_at)
+            and self.orderbook_filter.is_changed(orderbook)
+        ]
+
+        if self.orderbook_analytics is not None:
+            analytics = self.orderbook_analytics.compute(orderbooks)
+        else:
+            analytics = [None] * len(orderbooks)
+
+        for orderbook, features in zip(orderbooks, analytics):
+            event: Event = {
+                "event_id": str(uuid.uuid4()),
+                "action": EventAction.ORDER_BOOK_UPDATE,
+                "data": orderbook,
+            }
+            if features is not None:
+                event["analytics"] = features
+            self.transmitter.offer(event, Destination.ORDER_BOOK)
+
+    def is_orderbook_outdated(
+        self, orderbook: ArrayOrderBook, requested_at: int
+    ) -> bool:
+        """
+        Проверить, что ордербук не новее уже отправленного, и запомнить его версию
+
+        Ответы с разных IP-адресов приходят не по порядку. Ордербук считается
+        устаревшим, если запрос за ним был отправлен раньше запроса за последним
+        опубликованным ордербуком, или если биржа вернула тот же снимок
+        """
+        symbol = orderbook.symbol
+        timestamp = orderbook.timestamp
+
+        if last_version := self.orderbook_versions.get(symbol):
+            last_requested_at, last_timestamp = last_version
+            if requested_at < last_requested_at:
+                return True
+            if None not in (timestamp, last_timestamp) and timestamp <= last_timestamp:
+                return True
+
+        self.orderbook_versions[symbol] = (requested_at, timestamp)
+        return False
 
     def save_orderbook_metric(self, start: int, end: int) -> None:
         """
         Сохранить целевые метрики для ордербука
         """
         latency = ns_to_us(end - start)
-        self.orderbook_latencies.append(latency)
+        self.orderbook_latencies.record(latency)
         self.orderbook_rps += 1
 
     async def watch_balance(self):
@@ -384,16 +797,17 @@ class Gate:
             try:
                 full_balance = await self.rock.watch_balance()
                 balance = self.filter_balance(full_balance)
+                self.balance_snapshot.update(balance)
 
                 event: Event = {
                     "event_id": str(uuid.uuid4()),
                     "action": EventAction.BALANCE_UPDATE,
                     "data": balance,
                 }
-                self.transmitter.offer(event, Destination.BALANCE)
-                self.transmitter.offer(event, Destination.LOGS)
+                self.transmitter.offer(event, Destination.BALANCE, Destination.LOGS)
 
             except Exception as e:
+                self.balance_snapshot.invalidate()
                 message = self.describe_exception(e)
                 log_event: Event = {
                     "event_id": str(uuid.uuid4()),
@@ -401,8 +815,7 @@ class Gate:
                     "action": EventAction.BALANCE_UPDATE,
                     "message": message,
                 }
-                self.transmitter.offer(log_event, Destination.CORE)
-                self.transmitter.offer(log_event, Destination.LOGS)
+                self.transmitter.offer(log_event, Destination.CORE, Destination.LOGS)
 
     def filter_balance(self, balance: Balance) -> Balance:
         """
@@ -418,25 +831,29 @@ class Gate:
                 orders = await self.rock.watch_orders()
 
                 for order in orders:
-                    client_order_id = self.client_order_id_by_order_id.get(order.id)
-                    if client_order_id is None:
+                    entry = await self.order_index.fetch_by_order_id(order.id)
+                    if entry is None:
                         continue
 
-                    event_id = self.event_id_by_client_order_id.get(client_order_id)
-                    order.client_order_id = client_order_id
+                    event_id = entry.event_id
+                    order.client_order_id = entry.client_order_id
 
                     if self.canceled_orders.get(order.id, False):
                         order.status = OrderStatus.CANCELED
+                    # В хранилище ордера лежат в том же виде, что и ответы REST
+                    stored = self.rock_order_formatter.format(order)
+                    self.order_store.put(order.id, stored, order.status)
 
                     event: Event = {
                         "event_id": event_id,
                         "action": EventAction.ORDERS_UPDATE,
                         "data": [order],
                     }
-                    self.transmitter.offer(event, Destination.CORE)
-                    self.transmitter.offer(event, Destination.LOGS)
+                    self.transmitter.offer(event, Destination.CORE, Destination.LOGS)
 
             except Exception as e:
+                # Обновления могли быть пропущены, пока поток был недоступен
+                self.order_store.invalidate_open()
                 message = self.describe_exception(e)
                 log_event: Event = {
                     "event_id": str(uuid.uuid4()),
@@ -444,15 +861,22 @@ class Gate:
                     "action": EventAction.ORDERS_UPDATE,
                     "message": message,
                 }
-                self.transmitter.offer(log_event, Destination.CORE)
-                self.transmitter.offer(log_event, Destination.LOGS)
+                self.transmitter.offer(log_event, Destination.CORE, Destination.LOGS)
 
     async def metrics(self) -> NoReturn:
         while True:
-            if len(self.orderbook_latencies) > 1:
+            if self.has_metrics():
                 self.offer_metrics()
             await asyncio.sleep(1)
 
+    def has_metrics(self) -> bool:
+        """
+        Проверить, что с последней отправки метрик гейт получал данные
+        """
+        received_orderbooks = len(self.orderbook_latencies) > 1
+        published_orderbooks = self.orderbook_filter.published > 0
+        return received_orderbooks or published_orderbooks or bool(self.tracer.counts)
+
     def offer_metrics(self) -> None:
         """
         Отправить целевые метрики на сервер логирования и сбросить данные
@@ -466,28 +890,81 @@ class Gate:
         """
         Получить целевые метрики
         """
-        percentile = latency_percentile(self.orderbook_latencies)
+        percentile = None
+        if len(self.orderbook_latencies):
+            percentile = self.orderbook_latencies.percentiles()
         orderbook_rps = self.orderbook_rps
         private_rps = self.private_api_total_rps
-
-        data = EventFormatter.metrics_data(percentile, orderbook_rps, private_rps)
+        published = self.orderbook_filter.published
+        suppressed = self.orderbook_filter.suppressed
+
+        transmitter = self.transmitter.stats()
+        commands = self.tracer.metrics()
+        accounts = self.private_exchange_pool.metrics()
+        connections = self.connections.metrics()
+
+        data = EventFormatter.metrics_data(
+            percentile,
+            orderbook_rps,
+            private_rps,
+            published,
+            suppressed,
+            transmitter,
+            commands,
+            accounts,
+            connections,
+        )
         return data
 
     def reset_metrics(self) -> None:
         """
         Сбросить данные, по которым считаются метрики
         """
-        self.orderbook_latencies = []
+        self.orderbook_latencies.reset()
         self.orderbook_rps = 0
         self.private_api_total_rps = 0
+        self.orderbook_filter.reset_counters()
+        self.transmitter.reset_stats()
+        self.tracer.reset()
+        self.private_exchange_pool.reset_metrics()
+        self.connections.reset_metrics()
 
     async def close(self):
+        await self.order_index.flush()
         await self.exchange_pool.close()
         self.transmitter.close()
+        if self.recorder is not None:
+            self.recorder.close()
 
     async def __aenter__(self):
+        durations = {}
+
+        start = monotonic_ns()
         await self.rock.init()
+        durations["rock"] = monotonic_ns() - start
+
+        start = monotonic_ns()
+        await self.load_markets()
+        durations["markets"] = monotonic_ns() - start
+
+        # Соединения и TLS-сессии открываются до первой команды ядра
+        start = monotonic_ns()
+        await self.connections.warm_up(self.exchange_pool.api_url)
+        durations["connections"] = monotonic_ns() - start
+
+        durations["total"] = sum(durations.values())
+        phases = ", ".join(f"{k}={v / 1e6:.1f} ms" for k, v in durations.items())
+        logger.info("Startup time: %s", phases)
         return self
 
+    async def load_markets(self) -> None:
+        """
+        Загрузить метаданные рынков один раз и передать их всем подключениям
+        """
+        exchanges = self.exchanges
+        data = await self.market_cache.load(exchanges[0].fetch_markets)
+        for exchange in exchanges:
+            exchange.set_markets(data)
+
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         await self.close()
@@ -1,4 +1,10 @@
+import os
+from pathlib import Path
 from rock import ExchangeConfig
+from flash_gate.exchange.enums import SelectionPolicy
+from flash_gate.transmitter.enums import Destination, Encoding
+from .enums import DataCollectionMethod
+from .filters import DEFAULT_HEARTBEAT
 
 
 class ConfigParser:
@@ -74,6 +80,11 @@ class ConfigParser:
         data_collection_method = self._gate_config["data_collection_method"]
         return data_collection_method
 
+    @property
+    def order_book_collection_method(self) -> DataCollectionMethod:
+        method = self.data_collection_method.get("order_book", "rest")
+        return DataCollectionMethod(method)
+
     @property
     def subscribe_delay(self) -> int:
         subscribe_delay = self._rate_limits["subscribe_timeout"]
@@ -95,6 +106,92 @@ class ConfigParser:
         order_book_limit = self._gate_config["gate"]["order_book_depth"]
         return order_book_limit
 
+    @property
+    def order_book_depths(self) -> dict[str, int]:
+        # Глубину ордербука можно переопределить для отдельного рынка
+        markets = self.config["data"]["markets"]
+        default = self.order_book_limit
+        depths = {
+            market["common_symbol"]: market.get("order_book_depth", default)
+            for market in markets
+        }
+        return depths
+
+    @property
+    def create_orders_concurrency(self) -> int:
+        # Сколько ордеров из одной команды create_orders выставляется одновременно.
+        # Значение 1 сохраняет последовательное выставление
+        concurrency = self._gate_config["gate"].get("create_orders_concurrency", 1)
+        return max(concurrency, 1)
+
+    @property
+    def order_index_size(self) -> int:
+        order_index_size = self._gate_config["gate"].get("order_index_size", 100_000)
+        return order_index_size
+
+    @property
+    def order_index_ttl(self) -> float:
+        order_index_ttl = self._gate_config["gate"].get("order_index_ttl", 86_400)
+        return order_index_ttl
+
+    @property
+    def suppress_unchanged_order_books(self) -> bool:
+        suppress = self._gate_config["gate"].get("suppress_unchanged_order_books", True)
+        return suppress
+
+    @property
+    def order_book_heartbeat(self) -> float | None:
+        # Интервал в секундах, после которого неизменившийся ордербук
+        # отправляется повторно. Значение null отключает повторную отправку
+        gate = self._gate_config["gate"]
+        heartbeat = gate.get("order_book_heartbeat", DEFAULT_HEARTBEAT)
+        return heartbeat
+
+    @property
+    def order_book_analytics(self) -> dict | None:
+        # Параметры расчёта показателей ордербуков: levels и offsets.
+        # Отсутствие значения отключает расчёт
+        analytics = self._gate_config["gate"].get("order_book_analytics")
+        # Бинарный формат ордербука не содержит показателей
+        if analytics is not None and self.order_book_encoding == Encoding.BINARY:
+            raise ValueError("Order book analytics require JSON encoding")
+        return analytics
+
+    @property
+    def order_book_encoding(self) -> Encoding:
+        publishers = self._gate_config.get("aeron", {}).get("publishers", {})
+        encoding = publishers.get(Destination.ORDER_BOOK, {}).get("encoding", "json")
+        return Encoding(encoding)
+
+    @property
+    def record_path(self) -> str | None:
+        # Файл для записи трафика гейта. Отсутствие значения отключает запись
+        record_path = self._gate_config["gate"].get("record_path")
+        return record_path
+
+    @property
+    def trace_commands(self) -> bool:
+        # Отправлять этапы обработки каждой команды на сервер логирования
+        trace_commands = self._gate_config["gate"].get("trace_commands", False)
+        return trace_commands
+
+    @property
+    def account_selection(self) -> SelectionPolicy:
+        selection = self._gate_config["gate"].get("account_selection", "adaptive")
+        return SelectionPolicy(selection)
+
+    @property
+    def breaker_cooldown(self) -> float:
+        # Время в секундах, на которое аккаунт исключается из пула
+        cooldown = self._gate_config["gate"].get("circuit_breaker_cooldown", 10)
+        return cooldown
+
+    @property
+    def breaker_timeouts(self) -> int:
+        # Количество таймаутов подряд, после которого аккаунт исключается из пула
+        timeouts = self._gate_config["gate"].get("circuit_breaker_timeouts", 3)
+        return timeouts
+
     @property
     def assets(self) -> list[str]:
         assets_labels = self.config["data"]["assets_labels"]
@@ -135,5 +232,65 @@ class ConfigParser:
         return private_ip
 
     @property
-    def public_delay(self) -> float:
-        return 0
+    def order_state_max_age(self) -> float:
+        # Время в секундах, в течение которого get_orders отвечает из памяти
+        max_age = self._gate_config["gate"].get("order_state_max_age", 30)
+        return max_age
+
+    @property
+    def balance_max_age(self) -> float:
+        # Время в секундах, в течение которого get_balance отвечает из потока
+        balance_max_age = self._gate_config["gate"].get("balance_max_age", 10)
+        return balance_max_age
+
+    @property
+    def markets_cache_path(self) -> str:
+        # По умолчанию файл лежит в каталоге кеша пользователя, а не в рабочем
+        # каталоге процесса, чтобы не попадать в репозиторий
+        cache_dir = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+        default = Path(cache_dir) / "flash_gate" / f"{self.exchange_id}_markets.json"
+        path = self._gate_config["gate"].get("markets_cache_path", str(default))
+        return path
+
+    @property
+    def markets_cache_ttl(self) -> float:
+        # Время в секундах, в течение которого сохранённые рынки не перезагружаются
+        markets_cache_ttl = self._gate_config["gate"].get("markets_cache_ttl", 3600)
+        return markets_cache_ttl
+
+    @property
+    def warm_connections(self) -> int:
+        # Количество соединений, открытых заранее для каждого локального IP-адреса
+        warm_connections = self._gate_config["gate"].get("warm_connections", 2)
+        return warm_connections
+
+    @property
+    def keepalive_interval(self) -> float:
+        keepalive_interval = self._gate_config["gate"].get("keepalive_interval", 20)
+        return keepalive_interval
+
+    @property
+    def dns_cache_ttl(self) -> int:
+        dns_cache_ttl = self._gate_config["gate"].get("dns_cache_ttl", 300)
+        return dns_cache_ttl
+
+    @property
+    def public_rate_limit(self) -> float | None:
+        # Допустимое количество запросов в секунду с одного IP-адреса.
+        # Отсутствие значения означает, что гейт не ограничивает запросы
+        public_rate_limit = self.api_requests_per_seconds["public"].get("limit")
+        return public_rate_limit
+
+    @property
+    def private_rate_limit(self) -> float | None:
+        # Допустимое количество запросов в секунду с одного аккаунта
+        private_rate_limit = self.api_requests_per_seconds["private"].get("limit")
+        return private_rate_limit
+
+    @property
+    def private_rate_burst(self) -> float:
+        # Количество запросов, которое аккаунт может отправить без ожидания.
+        # По умолчанию — секундный лимит, который биржа допускает сразу
+        default = max(self.private_rate_limit or 1, 1)
+        burst = self.api_requests_per_seconds["private"].get("burst", default)
+        return burst
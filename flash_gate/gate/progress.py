@@ -0,0 +1,36 @@
+class CancelAllProgress:
+    """
+    Ход массовой отмены ордеров
+
+    Ордер считается живым, пока биржа не подтвердила его отмену. Ордер,
+    который не удалось отменить, остаётся живым и дополнительно попадает в failed
+    """
+
+    def __init__(self):
+        self.live: dict[str, str] = {}
+        self.canceled: list[str] = []
+        self.failed: list[str] = []
+
+    def add(self, order_id: str, symbol: str) -> None:
+        self.live[order_id] = symbol
+
+    def cancel(self, order_id: str) -> None:
+        self.live.pop(order_id, None)
+        self.canceled.append(order_id)
+
+    def fail(self, order_id: str) -> None:
+        self.failed.append(order_id)
+
+    def discard(self, order_id: str) -> None:
+        """
+        Убрать из живых ордер, который уже исполнен или отменён
+        """
+        self.live.pop(order_id, None)
+
+    def data(self, finished: bool = False) -> dict:
+        return {
+            "live": list(self.live),
+            "canceled": list(self.canceled),
+            "failed": list(self.failed),
+            "finished": finished,
+        }
@@ -1,7 +1,11 @@
+import math
 import statistics
 from decimal import Decimal
 from .typing import LatencyPercentile
 
+# Процентили, которые отправляются в метриках
+PERCENTILES = ("50", "90", "99", "99.99")
+
 
 def ns_to_us(ns: int) -> int:
     """
@@ -16,12 +20,7 @@ def latency_percentile(data: list) -> LatencyPercentile:
     Получить 50, 90, 99 и 99.99 процентили из переданного списка
     """
     quantiles = statistics.quantiles(data, n=10000, method="inclusive")
-    percentiles = {
-        "50": int(percentile(quantiles, "50")),
-        "90": int(percentile(quantiles, "90")),
-        "99": int(percentile(quantiles, "99")),
-        "99.99": int(percentile(quantiles, "99.99")),
-    }
+    percentiles = {n: int(percentile(quantiles, n)) for n in PERCENTILES}
     return percentiles
 
 
@@ -30,3 +29,108 @@ def percentile(quantiles: list, n: str) -> float:
     Получить n-й процентиль из квантилей
     """
     return quantiles[int(len(quantiles) * (Decimal(n) / 100) - 1)]
+
+
+class LatencyHistogram:
+    """
+    Гистограмма задержек с логарифмическими корзинами в стиле HdrHistogram
+
+    Запись выполняется за O(1), объём памяти не зависит от количества значений.
+    Значения до 2^SUB_BUCKET_BITS хранятся точно, остальные с относительной
+    погрешностью не больше 2^-(SUB_BUCKET_BITS - 1). Гистограммы с одинаковыми
+    параметрами можно объединять
+    """
+
+    SUB_BUCKET_BITS = 8
+    _SUB_BUCKET_COUNT = 1 << SUB_BUCKET_BITS
+    _HALF_BUCKET_BITS = SUB_BUCKET_BITS - 1
+
+    def __init__(self, max_value: int = 3_600_000_000):
+        """
+        :param max_value: Наибольшее различимое значение, большие значения
+        записываются как max_value
+        """
+        self.max_value = max_value
+        self.counts = [0] * (self._index(max_value) + 1)
+        self.total = 0
+
+    def __len__(self) -> int:
+        return self.total
+
+    @classmethod
+    def _index(cls, value: int) -> int:
+        bits = cls.SUB_BUCKET_BITS
+        if value < 1 << bits:
+            return value
+        shift = value.bit_length() - bits
+        return (shift << (bits - 1)) + (value >> shift)
+
+    @classmethod
+    def _value(cls, index: int) -> int:
+        """
+        Получить середину диапазона значений корзины
+        """
+        bits = cls.SUB_BUCKET_BITS
+        if index < 1 << bits:
+            return index
+        shift = (index >> (bits - 1)) - 1
+        mantissa = index - (shift << (bits - 1))
+        return (mantissa << shift) + ((1 << shift) >> 1)
+
+    def record(self, value: int) -> None:
+        """
+        Записать значение
+        """
+        # Вычисление индекса продублировано из _index: запись выполняется
+        # на каждый запрос, и вызов метода заметно её замедляет
+        if value > self.max_value:
+            value = self.max_value
+        elif value < 0:
+            value = 0
+
+        if value < self._SUB_BUCKET_COUNT:
+            index = value
+        else:
+            shift = value.bit_length() - self.SUB_BUCKET_BITS
+            index = (shift << self._HALF_BUCKET_BITS) + (value >> shift)
+
+        self.counts[index] += 1
+        self.total += 1
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        """
+        Добавить значения другой гистограммы
+        """
+        if other.max_value != self.max_value:
+            raise ValueError("Histograms have different max_value")
+
+        for index, count in enumerate(other.counts):
+            if count:
+                self.counts[index] += count
+        self.total += other.total
+
+    def percentile(self, n: str) -> int:
+        """
+        Получить n-й процентиль
+        """
+        if not self.total:
+            raise ValueError("Histogram is empty")
+
+        rank = max(math.ceil(self.total * Decimal(n) / 100), 1)
+        cumulative = 0
+        for index, count in enumerate(self.counts):
+            cumulative += count
+            if cumulative >= rank:
+                return min(self._value(index), self.max_value)
+
+        return self.max_value
+
+    def percentiles(self) -> LatencyPercentile:
+        """
+        Получить 50, 90, 99 и 99.99 процентили
+        """
+        return {n: self.percentile(n) for n in PERCENTILES}
+
+    def reset(self) -> None:
+        self.counts = [0] * len(self.counts)
+        self.total = 0
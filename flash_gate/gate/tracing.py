@@ -0,0 +1,85 @@
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from time import monotonic_ns
+from typing import Optional
+from .enums import TraceStage
+from .statistics import LatencyHistogram, ns_to_us
+
+
+@dataclass(slots=True)
+class CommandTrace:
+    event_id: Optional[str]
+    action: str
+    received: int
+    stages: list[tuple[TraceStage, int]] = field(default_factory=list)
+
+
+# Трассировка команды, которую обрабатывает текущая задача. Задачи, созданные
+# внутри обработки команды, наследуют её вместе с контекстом
+current_trace: ContextVar[Optional[CommandTrace]] = ContextVar(
+    "current_trace", default=None
+)
+
+
+class CommandTracer:
+    """
+    Трассировка команд ядра
+
+    Для каждого этапа обработки запоминается время в микросекундах с момента
+    получения команды из Aeron. Значения собираются в гистограммы по действию
+    команды и этапу
+    """
+
+    def __init__(self):
+        self.histograms: dict[str, dict[TraceStage, LatencyHistogram]] = {}
+        self.counts: dict[str, int] = {}
+
+    def start(
+        self, event_id: Optional[str], action: str, received: int
+    ) -> CommandTrace:
+        """
+        Начать трассировку команды в текущей задаче
+
+        :param received: Время получения команды по monotonic_ns
+        """
+        trace = CommandTrace(event_id, action, received)
+        current_trace.set(trace)
+        self.counts[action] = self.counts.get(action, 0) + 1
+        return trace
+
+    def mark(self, stage: TraceStage) -> None:
+        """
+        Отметить достижение этапа командой текущей задачи
+        """
+        if (trace := current_trace.get()) is None:
+            return
+
+        elapsed = ns_to_us(monotonic_ns() - trace.received)
+        trace.stages.append((stage, elapsed))
+        self._get_histogram(trace.action, stage).record(elapsed)
+
+    def _get_histogram(self, action: str, stage: TraceStage) -> LatencyHistogram:
+        stages = self.histograms.setdefault(action, {})
+        if (histogram := stages.get(stage)) is None:
+            histogram = stages[stage] = LatencyHistogram()
+        return histogram
+
+    def metrics(self) -> dict:
+        """
+        Получить количество команд и процентили задержек этапов по действиям
+        """
+        metrics = {}
+        for action, count in self.counts.items():
+            stages = self.histograms.get(action, {})
+            metrics[action] = {"count": count} | {
+                stage.value: histogram.percentiles()
+                for stage, histogram in stages.items()
+                if len(histogram)
+            }
+        return metrics
+
+    def reset(self) -> None:
+        for stages in self.histograms.values():
+            for histogram in stages.values():
+                histogram.reset()
+        self.counts = {}
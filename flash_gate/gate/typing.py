@@ -12,18 +12,49 @@ LatencyPercentile = TypedDict(
 
 
 class OrderbookMetrics(TypedDict):
-    latency_percentile: LatencyPercentile
+    latency_percentile: LatencyPercentile | None
     rps: int
+    published: int
+    suppressed: int
 
 
 class PublicApiMetrics(TypedDict):
     orderbook: OrderbookMetrics
 
 
+class EndpointMetrics(TypedDict):
+    requests: int
+    errors: int
+    timeouts: int
+    rate_limits: int
+    latency_percentile: LatencyPercentile | None
+
+
 class PrivateApiMetrics(TypedDict):
     total_rps: int
+    # Статистика по номеру аккаунта и методу API
+    accounts: dict[str, dict[str, EndpointMetrics]]
+
+
+class QueueMetrics(TypedDict):
+    depth: int
+    dropped: int
+    conflated: int
+    overflows: int
+
+
+class ConnectionMetrics(TypedDict):
+    created: int
+    reused: int
+    dns_hits: int
+    dns_misses: int
 
 
 class Metrics(TypedDict):
     public_api: PublicApiMetrics
     private_api: PrivateApiMetrics
+    transmitter: dict[str, QueueMetrics]
+    # Количество команд и процентили задержек этапов по действиям
+    commands: dict[str, dict]
+    # Статистика соединений по локальному IP-адресу
+    connections: dict[str, ConnectionMetrics]
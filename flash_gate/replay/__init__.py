@@ -0,0 +1 @@
+from .recorder import Recorder, Recording
@@ -0,0 +1,56 @@
+"""
+Воспроизведение записанного трафика гейта
+
+    python -m flash_gate.replay traffic.ndjson --speed 10
+"""
+
+import argparse
+import asyncio
+import json
+import logging.config
+from configparser import ConfigParser
+import yaml
+from flash_gate import Configurator
+from .player import Replayer
+from .recorder import Recording
+
+LOGGING_FNAME = "logging.yaml"
+CONFIG_FILENAME = "config.ini"
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Replay recorded gate traffic")
+    parser.add_argument("recording", help="File written by the gate recorder")
+    parser.add_argument(
+        "--speed",
+        type=float,
+        default=1.0,
+        help="Replay speed multiplier; 0 replays as fast as possible",
+    )
+    return parser.parse_args()
+
+
+async def main():
+    args = parse_args()
+
+    with open(LOGGING_FNAME) as f:
+        d = yaml.safe_load(f)
+        logging.config.dictConfig(d)
+
+    ini = ConfigParser()
+    ini.read(CONFIG_FILENAME)
+    configurator_driver_type = ini.get("configuration", "type")
+    configurator_source = ini.get("configuration", "source")
+
+    # noinspection PyTypeChecker
+    configurator = Configurator(configurator_driver_type, configurator_source)
+    config = await configurator.get_config()
+
+    recording = Recording.load(args.recording)
+    replayer = Replayer(config, recording, args.speed or None)
+    report = await replayer.run()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
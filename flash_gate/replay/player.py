@@ -0,0 +1,65 @@
+import asyncio
+import copy
+from time import monotonic_ns
+from typing import Optional
+from flash_gate.gate import Gate
+from .recorder import Recording
+from .stub import ReplayTransmitter, StubExchange
+
+
+class Replayer:
+    """
+    Воспроизведение записанных команд ядра на гейте с заглушкой биржи
+
+    Команды подаются в обработчик гейта с исходными интервалами, делёнными
+    на speed. Если speed не задан, команды подаются без пауз
+    """
+
+    def __init__(self, config: dict, recording: Recording, speed: Optional[float] = 1):
+        self.config = config
+        self.recording = recording
+        self.speed = speed
+
+    async def run(self) -> dict:
+        """
+        Воспроизвести команды и получить отчёт о пропускной способности
+        """
+        # Воспроизведение не должно дописывать запись, из которой читает
+        config = copy.deepcopy(self.config)
+        config["data"]["configs"]["gate_config"]["gate"].pop("record_path", None)
+
+        transmitter = ReplayTransmitter()
+        gate = Gate(config, transmitter=transmitter)
+
+        stub = StubExchange(self.recording.requests, self.speed)
+        for exchange in gate.exchanges:
+            exchange.exchange = stub
+            exchange.recorder = None
+
+        commands = self.recording.commands
+        start = monotonic_ns()
+        first = commands[0]["t"] if commands else 0
+
+        for record in commands:
+            if self.speed is not None:
+                due = (record["t"] - first) / self.speed
+                if (delay := due - (monotonic_ns() - start)) > 0:
+                    await asyncio.sleep(delay / 1e9)
+            gate.handler(record["message"])
+            # Даём начаться обработке команды до подачи следующей
+            await asyncio.sleep(0)
+
+        while gate.background_tasks:
+            await asyncio.gather(*gate.background_tasks)
+
+        elapsed = (monotonic_ns() - start) / 1e9
+        await gate.connections.close()
+
+        return {
+            "commands": len(commands),
+            "elapsed": elapsed,
+            "throughput": len(commands) / elapsed if elapsed else None,
+            "latency": gate.tracer.metrics(),
+            "offered": dict(transmitter.offered),
+            "unanswered": dict(stub.unanswered),
+        }
@@ -0,0 +1,139 @@
+import json
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from queue import Empty, SimpleQueue
+from time import monotonic_ns, time_ns
+from typing import Any, Optional
+
+# Сигнал потоку записи завершить работу
+_STOP = object()
+
+
+class Recorder:
+    """
+    Запись входящих команд и запросов к бирже
+
+    Записи дописываются в конец файла по одному JSON-объекту на строку.
+    У каждой записи есть временная метка monotonic в наносекундах. Метки
+    разных процессов несравнимы, поэтому каждый запуск начинается с записи
+    session. Сериализацию и запись в файл выполняет отдельный поток,
+    цикл событий только ставит записи в очередь
+    """
+
+    # Интервал сброса буфера на диск в секундах
+    FLUSH_INTERVAL = 1
+    # Префикс методов потоков: их результаты CCXT изменяет на месте
+    STREAM_PREFIX = "watch_"
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._queue = SimpleQueue()
+        self._queue.put({"t": monotonic_ns(), "type": "session", "started": time_ns()})
+        self._writer = threading.Thread(
+            target=self._drain, name="recorder", daemon=True
+        )
+        self._writer.start()
+
+    def command(self, message: str) -> None:
+        """
+        Записать входящее сообщение ядра
+        """
+        self._queue.put({"t": monotonic_ns(), "type": "command", "message": message})
+
+    def request(
+        self,
+        method: str,
+        args: tuple,
+        started: int,
+        duration: int,
+        result: Any = None,
+        error: Optional[Exception] = None,
+    ) -> None:
+        """
+        Записать запрос к бирже и его результат
+
+        :param started: Время отправки запроса, monotonic в наносекундах
+        :param duration: Длительность запроса в наносекундах
+        """
+        record = {
+            "t": started,
+            "type": "request",
+            "method": method,
+            "args": list(args),
+            "duration": duration,
+        }
+        if error is not None:
+            record["error"] = {"type": type(error).__name__, "message": str(error)}
+        elif method.startswith(self.STREAM_PREFIX):
+            # Поток записи не должен увидеть следующее обновление структуры
+            record["result"] = _snapshot(result)
+        else:
+            record["result"] = result
+        self._queue.put(record)
+
+    def _drain(self) -> None:
+        with self.path.open("a", encoding="utf-8", buffering=1 << 16) as f:
+            while True:
+                try:
+                    record = self._queue.get(timeout=self.FLUSH_INTERVAL)
+                except Empty:
+                    f.flush()
+                    continue
+                if record is _STOP:
+                    return
+                f.write(json.dumps(record, default=str) + "\n")
+
+    def close(self) -> None:
+        """
+        Дописать записи из очереди и закрыть файл
+        """
+        if self._writer.is_alive():
+            self._queue.put(_STOP)
+            self._writer.join()
+
+
+def _snapshot(value: Any) -> Any:
+    """
+    Скопировать вложенные словари и списки
+    """
+    if isinstance(value, dict):
+        return {key: _snapshot(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_snapshot(item) for item in value]
+    return value
+
+
+@dataclass
+class Recording:
+    """
+    Записанные команды и запросы к бирже в порядке записи
+
+    Временные метки каждого запуска сдвигаются так, чтобы запуск начинался
+    сразу после последней записи предыдущего
+    """
+
+    commands: list[dict] = field(default_factory=list)
+    requests: list[dict] = field(default_factory=list)
+
+    @classmethod
+    def load(cls, path: str | Path) -> "Recording":
+        recording = cls()
+        offset = last = 0
+        with Path(path).open(encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if record["type"] == "session":
+                    offset = last - record["t"]
+                    continue
+
+                record["t"] += offset
+                last = record["t"]
+                match record["type"]:
+                    case "command":
+                        recording.commands.append(record)
+                    case "request":
+                        recording.requests.append(record)
+        return recording
@@ -0,0 +1,106 @@
+import asyncio
+import copy
+import json
+from collections import Counter, defaultdict, deque
+from typing import Optional
+from ccxt.base import errors
+
+
+class StubExchange:
+    """
+    Заглушка экземпляра CCXT, отвечающая записанными ответами
+
+    Ответ подбирается по методу и аргументам в порядке записи. Если ответа
+    с такими аргументами нет, используется следующий неиспользованный ответ
+    того же метода. Записанная длительность запроса выдерживается с учётом
+    скорости воспроизведения
+    """
+
+    has: dict = {}
+
+    def __init__(self, requests: list[dict], speed: Optional[float] = 1.0):
+        """
+        :param requests: Записанные запросы к бирже
+        :param speed: Множитель скорости. None — отвечать без задержек
+        """
+        self.speed = speed
+        self.unanswered = Counter()
+
+        self._by_args: dict[tuple, deque] = defaultdict(deque)
+        self._by_method: dict[str, deque] = defaultdict(deque)
+        for record in requests:
+            record = {**record, "used": False}
+            self._by_args[self._key(record["method"], record["args"])].append(record)
+            self._by_method[record["method"]].append(record)
+
+    def __getattr__(self, method: str):
+        if method.startswith("_"):
+            raise AttributeError(method)
+
+        async def call(*args):
+            return await self._respond(method, args)
+
+        return call
+
+    async def _respond(self, method: str, args: tuple):
+        record = self._take(self._by_args[self._key(method, args)])
+        if record is None:
+            record = self._take(self._by_method[method])
+        if record is None:
+            self.unanswered[method] += 1
+            raise errors.ExchangeError(f"No recorded response: {method}")
+
+        if self.speed is not None:
+            await asyncio.sleep(record["duration"] / 1e9 / self.speed)
+
+        if error := record.get("error"):
+            error_type = getattr(errors, error["type"], None)
+            if not (isinstance(error_type, type) and issubclass(error_type, Exception)):
+                error_type = errors.ExchangeError
+            raise error_type(error["message"])
+
+        # Гейт может изменять полученные структуры
+        return copy.deepcopy(record["result"])
+
+    @staticmethod
+    def _take(records: deque) -> Optional[dict]:
+        while records:
+            record = records.popleft()
+            if not record["used"]:
+                record["used"] = True
+                return record
+        return None
+
+    @staticmethod
+    def _key(method: str, args) -> tuple:
+        return method, json.dumps(list(args), default=str)
+
+    async def close(self) -> None:
+        pass
+
+
+class ReplayTransmitter:
+    """
+    Передатчик, который только считает отправленные события по каналам
+    """
+
+    def __init__(self):
+        self.offered = Counter()
+
+    def offer(self, event, *destinations) -> None:
+        self.offered.update(destinations)
+
+    async def offer_wait(self, event, *destinations) -> None:
+        self.offer(event, *destinations)
+
+    def offer_raw(self, message: str, *destinations) -> None:
+        self.offered.update(destinations)
+
+    def stats(self) -> dict:
+        return {}
+
+    def reset_stats(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
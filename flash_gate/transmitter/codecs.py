@@ -0,0 +1,84 @@
+import struct
+from typing import Optional
+from flash_gate.exchange.orderbook import ArrayOrderBook
+
+# Заголовок: идентификатор тикера, временная метка в микросекундах,
+# количество уровней bids и asks. Порядок байт little-endian
+HEADER = struct.Struct("<HqHH")
+
+# Временная метка, которую биржа не передала
+NO_TIMESTAMP = -1
+
+
+class BinaryOrderBookEncoder:
+    """
+    Кодировщик ордербука в бинарный формат фиксированной структуры
+
+    После заголовка следуют массивы float64: цены bids, объёмы bids,
+    цены asks, объёмы asks. Идентификатор тикера — его индекс в списке
+    рынков конфигурации
+    """
+
+    def __init__(self, symbols: list[str]):
+        self.symbol_ids = {symbol: i for i, symbol in enumerate(symbols)}
+
+    def encode(self, order_book: dict | ArrayOrderBook) -> bytes:
+        if isinstance(order_book, ArrayOrderBook):
+            return self._encode_arrays(order_book)
+
+        bids = order_book["bids"]
+        asks = order_book["asks"]
+        timestamp = order_book["timestamp"]
+
+        header = HEADER.pack(
+            self.symbol_ids[order_book["symbol"]],
+            NO_TIMESTAMP if timestamp is None else timestamp,
+            len(bids),
+            len(asks),
+        )
+        levels = [level[0] for level in bids]
+        levels += [level[1] for level in bids]
+        levels += [level[0] for level in asks]
+        levels += [level[1] for level in asks]
+        return header + struct.pack(f"<{len(levels)}d", *levels)
+
+    def _encode_arrays(self, order_book: ArrayOrderBook) -> bytes:
+        # Массивы уже лежат в памяти в формате канала и копируются без разбора
+        timestamp = order_book.timestamp
+        header = HEADER.pack(
+            self.symbol_ids[order_book.symbol],
+            NO_TIMESTAMP if timestamp is None else timestamp,
+            len(order_book.bid_prices),
+            len(order_book.ask_prices),
+        )
+        return header + order_book.to_bytes()
+
+
+class BinaryOrderBookDecoder:
+    """
+    Эталонный декодер бинарного формата ордербука для потребителей канала
+    """
+
+    def __init__(self, symbols: Optional[list[str]] = None):
+        """
+        :param symbols: Список рынков конфигурации. Если не передан,
+        в поле symbol возвращается идентификатор тикера
+        """
+        self.symbols = symbols
+
+    def decode(self, message: bytes) -> dict:
+        symbol_id, timestamp, bids_count, asks_count = HEADER.unpack_from(message)
+        count = 2 * (bids_count + asks_count)
+        levels = struct.unpack_from(f"<{count}d", message, HEADER.size)
+
+        bid_prices = levels[:bids_count]
+        bid_amounts = levels[bids_count : 2 * bids_count]
+        ask_prices = levels[2 * bids_count : 2 * bids_count + asks_count]
+        ask_amounts = levels[2 * bids_count + asks_count :]
+
+        return {
+            "symbol": self.symbols[symbol_id] if self.symbols else symbol_id,
+            "bids": [list(level) for level in zip(bid_prices, bid_amounts)],
+            "asks": [list(level) for level in zip(ask_prices, ask_amounts)],
+            "timestamp": None if timestamp == NO_TIMESTAMP else timestamp,
+        }
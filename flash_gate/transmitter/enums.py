@@ -23,6 +23,7 @@ class EventAction(str, Enum):
     ORDERS_UPDATE = "orders_update"
     PING = "ping"
     METRICS = "metrics"
+    TRACE = "trace"
 
 
 class Destination(str, Enum):
@@ -30,3 +31,22 @@ class Destination(str, Enum):
     BALANCE = "balances"
     CORE = "core"
     LOGS = "logs"
+
+
+class SerializerType(str, Enum):
+    JSON = "json"
+    ORJSON = "orjson"
+
+
+class Encoding(str, Enum):
+    JSON = "json"
+    BINARY = "binary"
+
+
+class OverflowPolicy(str, Enum):
+    # Сообщение с тем же ключом заменяет ожидающее отправки
+    CONFLATE = "conflate"
+    # Отправитель ждёт места в очереди, сообщения не отбрасываются
+    BLOCK = "block"
+    # При переполнении отбрасывается самое старое сообщение
+    DROP_OLDEST = "drop_oldest"
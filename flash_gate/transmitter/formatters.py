@@ -1,15 +1,29 @@
 import dataclasses
 import json
+from abc import ABC, abstractmethod
 from datetime import datetime
 from decimal import Decimal
-from .enums import EventType
+from time import time_ns
+from flash_gate.exchange.orderbook import ArrayOrderBook
+from .enums import EventType, SerializerType
 from .types import Event
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 class RoboTradeEncoder(json.JSONEncoder):
+    # Имена полей датаклассов по типам, чтобы не вызывать dataclasses.fields
+    # для каждого объекта
+    _fields: dict[type, tuple[str, ...]] = {}
+
     def default(self, obj):
-        if dataclasses.is_dataclass(obj):
-            representation = dataclasses.asdict(obj)
+        if isinstance(obj, ArrayOrderBook):
+            representation = obj.to_dict()
+        elif dataclasses.is_dataclass(obj):
+            representation = self._dataclass_to_dict(obj)
         elif isinstance(obj, Decimal):
             representation = str(obj.normalize())
         elif isinstance(obj, datetime):
@@ -19,6 +33,93 @@ class RoboTradeEncoder(json.JSONEncoder):
 
         return representation
 
+    @classmethod
+    def _dataclass_to_dict(cls, obj) -> dict:
+        """
+        Преобразовать датакласс в словарь без рекурсивного копирования
+
+        В отличие от dataclasses.asdict, вложенные значения не копируются:
+        вложенные датаклассы кодировщик обработает сам, когда дойдёт до них,
+        поэтому результат сериализации совпадает с результатом asdict
+        """
+        obj_type = type(obj)
+        if (names := cls._fields.get(obj_type)) is None:
+            names = tuple(field.name for field in dataclasses.fields(obj))
+            cls._fields[obj_type] = names
+        return {name: getattr(obj, name) for name in names}
+
+
+def wrap_message(message: str, node: str) -> str:
+    """
+    Вложить сериализованное JSON-сообщение в конверт лога
+
+    Сообщение становится значением поля data как есть, без разбора
+    и повторного кодирования
+    """
+    return f'{{"node": {json.dumps(node)}, "data": {message}}}'
+
+
+def orjson_default(obj):
+    if isinstance(obj, ArrayOrderBook):
+        return obj.to_dict()
+    if isinstance(obj, Decimal):
+        return str(obj.normalize())
+    if isinstance(obj, datetime):
+        return int(obj.timestamp() * 1_000_000)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class Serializer(ABC):
+    @abstractmethod
+    def serialize(self, message: dict) -> str:
+        pass
+
+
+class JsonSerializer(Serializer):
+    """
+    Сериализатор на основе стандартного модуля json
+    """
+
+    def __init__(self):
+        self._encoder = RoboTradeEncoder()
+
+    def serialize(self, message: dict) -> str:
+        return self._encoder.encode(message)
+
+
+class OrjsonSerializer(Serializer):
+    """
+    Сериализатор на основе orjson
+
+    Включается только явно, настройкой gate.serializer = "orjson", и требует
+    отдельно установленного orjson. Разобранные сообщения совпадают
+    с JsonSerializer, но байты отличаются: нет пробелов после разделителей,
+    не-ASCII символы не экранируются, а числа с плавающей точкой могут
+    записываться в другом виде. Потребители, сравнивающие сообщения
+    побайтно, должны использовать JsonSerializer
+    """
+
+    def __init__(self):
+        if orjson is None:
+            raise ImportError("orjson is required for the orjson serializer")
+        self._option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+    def serialize(self, message: dict) -> str:
+        encoded = orjson.dumps(message, default=orjson_default, option=self._option)
+        return encoded.decode()
+
+
+class SerializerFactory:
+    @staticmethod
+    def make_serializer(serializer_type: SerializerType) -> Serializer:
+        match serializer_type:
+            case SerializerType.JSON:
+                return JsonSerializer()
+            case SerializerType.ORJSON:
+                return OrjsonSerializer()
+            case _:
+                raise ValueError(f"Invalid serializer type: {serializer_type}")
+
 
 class JsonFormatter:
     def __init__(self, config: dict):
@@ -29,10 +130,17 @@ class JsonFormatter:
         self.instance = gate_config["info"]["instance"]
         self.exchange = gate_config["exchange"]["exchange_id"]
 
+        # По умолчанию сообщения кодируются стандартным модулем json.
+        # Сериализатор orjson быстрее, но меняет байты сообщений
+        serializer_type = gate_config.get("gate", {}).get("serializer", "json")
+        self.serializer = SerializerFactory.make_serializer(
+            SerializerType(serializer_type)
+        )
+        self._template = self._get_template()
+
     def format(self, event: Event) -> str:
-        template = self._get_template()
-        filled = self._fill_template(template, event)
-        return self._serialize(filled)
+        filled = self._fill_template(self._template, event)
+        return self.serializer.serialize(filled)
 
     def _get_template(self) -> dict:
         return {
@@ -44,21 +152,14 @@ class JsonFormatter:
             "algo": self.algo,
             "action": None,
             "message": None,
-            "timestamp": self._get_timestamp_in_us(),
+            "timestamp": None,
             "data": None,
         }
 
     @staticmethod
     def _get_timestamp_in_us() -> int:
-        return int(datetime.now().timestamp() * 1_000_000)
+        return time_ns() // 1_000
 
-    @staticmethod
-    def _fill_template(template: dict, data: dict) -> dict:
-        filled = template.copy()
-        for key, value in data.items():
-            filled[key] = value
-        return filled
-
-    @staticmethod
-    def _serialize(message: dict) -> str:
-        return json.dumps(message, cls=RoboTradeEncoder)
+    def _fill_template(self, template: dict, data: dict) -> dict:
+        # Распаковка сохраняет порядок ключей шаблона
+        return {**template, "timestamp": self._get_timestamp_in_us(), **data}
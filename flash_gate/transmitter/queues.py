@@ -0,0 +1,120 @@
+import asyncio
+import itertools
+from collections import OrderedDict
+from typing import Hashable, Optional
+from .enums import OverflowPolicy
+
+
+class OutboundQueue:
+    """
+    Ограниченная очередь исходящих сообщений одного направления
+
+    Поведение при переполнении задаётся политикой:
+
+    - CONFLATE: новое сообщение с тем же ключом заменяет ожидающее, сохраняя
+      его место в очереди. Если ключей больше, чем помещается в очередь,
+      отбрасывается самое старое
+    - DROP_OLDEST: отбрасывается самое старое сообщение
+    - BLOCK: put_wait ждёт, пока в очереди освободится место. Синхронный put
+      в заполненную очередь завершается исключением asyncio.QueueFull,
+      отклонённые сообщения учитываются в overflows
+    """
+
+    def __init__(self, policy: OverflowPolicy, maxsize: int):
+        self.policy = policy
+        self.maxsize = maxsize
+        self.dropped = 0
+        self.conflated = 0
+        self.overflows = 0
+
+        self._messages: OrderedDict[Hashable, str | bytes] = OrderedDict()
+        self._sequence = itertools.count()
+        self._not_empty = asyncio.Event()
+        self._not_full = asyncio.Event()
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    def put(self, message: str | bytes, key: Optional[Hashable] = None) -> None:
+        """
+        Поставить сообщение в очередь
+
+        :param key: Ключ для объединения сообщений, учитывается только
+        политикой CONFLATE
+        """
+        if self.policy != OverflowPolicy.CONFLATE or key is None:
+            key = next(self._sequence)
+        elif key in self._messages:
+            self._messages[key] = message
+            self.conflated += 1
+            return
+
+        if self.full():
+            if self.policy == OverflowPolicy.BLOCK:
+                self.overflows += 1
+                raise asyncio.QueueFull(f"Queue is full: {self.maxsize} messages")
+            self._messages.popitem(last=False)
+            self.dropped += 1
+
+        self._messages[key] = message
+        self._not_empty.set()
+
+    async def put_wait(
+        self, message: str | bytes, key: Optional[Hashable] = None
+    ) -> None:
+        """
+        Поставить сообщение в очередь, при политике BLOCK дождавшись места
+        """
+        while self.policy == OverflowPolicy.BLOCK and self.full():
+            self._not_full.clear()
+            await self._not_full.wait()
+        self.put(message, key)
+
+    def full(self) -> bool:
+        return len(self._messages) >= self.maxsize
+
+    async def get(self) -> str | bytes:
+        """
+        Дождаться и извлечь самое старое сообщение
+        """
+        while not self._messages:
+            self._not_empty.clear()
+            await self._not_empty.wait()
+
+        return self.get_nowait()
+
+    async def get_batch(self, max_count: int, max_bytes: int) -> list[str | bytes]:
+        """
+        Дождаться сообщения и извлечь вместе с ним уже ожидающие сообщения
+
+        :param max_count: Наибольшее количество сообщений
+        :param max_bytes: Наибольший суммарный размер сообщений. Первое
+        сообщение извлекается, даже если оно больше
+        """
+        batch = [await self.get()]
+        size = len(batch[0])
+        while self._messages and len(batch) < max_count:
+            message = next(iter(self._messages.values()))
+            size += len(message) + 1
+            if size > max_bytes:
+                break
+            batch.append(self.get_nowait())
+        return batch
+
+    def get_nowait(self) -> str | bytes:
+        _, message = self._messages.popitem(last=False)
+        self._not_full.set()
+        return message
+
+    def stats(self) -> dict:
+        return {
+            "depth": len(self._messages),
+            "dropped": self.dropped,
+            "conflated": self.conflated,
+            "overflows": self.overflows,
+        }
+
+    def reset_counters(self) -> None:
+        self.dropped = 0
+        self.conflated = 0
+        self.overflows = 0
@@ -1,15 +1,44 @@
+import asyncio
 import logging
 from typing import Callable, NoReturn
 import aeron
 from aeron import Publisher, Subscriber
 from aeron.concurrent import AsyncSleepingIdleStrategy
+from .codecs import BinaryOrderBookEncoder
 from .formatters import JsonFormatter
+from .queues import OutboundQueue
 from .types import Event
-from .enums import Destination
-
+from .enums import Destination, Encoding, OverflowPolicy
 
 IDLE_SLEEP_MS = 1
 
+# Задержка между повторными попытками отправки в секундах
+MIN_OFFER_BACKOFF = 0.001
+MAX_OFFER_BACKOFF = 0.1
+
+# Количество неожиданных ошибок, после которого сообщение отбрасывается
+MAX_OFFER_ERRORS = 10
+
+DEFAULT_QUEUE_SIZE = 10_000
+DEFAULT_OVERFLOW_POLICIES = {
+    Destination.ORDER_BOOK: OverflowPolicy.CONFLATE,
+    Destination.BALANCE: OverflowPolicy.BLOCK,
+    Destination.CORE: OverflowPolicy.BLOCK,
+    Destination.LOGS: OverflowPolicy.DROP_OLDEST,
+}
+
+# Наибольший размер сообщения, объединяющего несколько событий, в байтах
+DEFAULT_BATCH_BYTES = 60_000
+
+# Параметры издателя, которые обрабатывает транслятор, а не Aeron
+TRANSMITTER_OPTIONS = (
+    "encoding",
+    "queue_size",
+    "overflow",
+    "batch_size",
+    "batch_bytes",
+)
+
 
 class AeronTransmitter:
     def __init__(self, handler: Callable[[str], None], config: dict):
@@ -21,13 +50,66 @@ class AeronTransmitter:
         self.formatter = JsonFormatter(config)
         self.idle_strategy = AsyncSleepingIdleStrategy(IDLE_SLEEP_MS)
 
+        symbols = [market["common_symbol"] for market in config["data"]["markets"]]
+        self.order_book_encoder = BinaryOrderBookEncoder(symbols)
+        self.encodings = self._get_encodings(publishers)
+        self.queues = self._create_queues(publishers)
+        self.batches = self._get_batches(publishers)
+
         self.subscriber = Subscriber(handler, **subscribers["core"])
-        self.order_book = Publisher(**publishers["orderbooks"])
-        self.balance = Publisher(**publishers["balances"])
-        self.core = Publisher(**publishers["core"])
-        self.logs = Publisher(**publishers["logs"])
+        self.order_book = self._create_publisher(publishers["orderbooks"])
+        self.balance = self._create_publisher(publishers["balances"])
+        self.core = self._create_publisher(publishers["core"])
+        self.logs = self._create_publisher(publishers["logs"])
+
+    @staticmethod
+    def _get_encodings(publishers: dict) -> dict[Destination, Encoding]:
+        encodings = {}
+        for destination in Destination:
+            encoding = Encoding(publishers[destination].get("encoding", "json"))
+            # Бинарный формат описывает только ордербук
+            if encoding == Encoding.BINARY and destination != Destination.ORDER_BOOK:
+                raise ValueError(f"Binary encoding is not supported: {destination}")
+            encodings[destination] = encoding
+        return encodings
+
+    def _get_batches(self, publishers: dict) -> dict[Destination, tuple[int, int]]:
+        batches = {}
+        for destination in Destination:
+            options = publishers[destination]
+            batch_size = options.get("batch_size", 1)
+            batch_bytes = options.get("batch_bytes", DEFAULT_BATCH_BYTES)
+            # Бинарные сообщения нельзя разделить переводом строки
+            if batch_size > 1 and self.encodings[destination] != Encoding.JSON:
+                raise ValueError(f"Batching requires JSON encoding: {destination}")
+            batches[destination] = (batch_size, batch_bytes)
+        return batches
+
+    @staticmethod
+    def _create_queues(publishers: dict) -> dict[Destination, OutboundQueue]:
+        queues = {}
+        for destination in Destination:
+            options = publishers[destination]
+            default_policy = DEFAULT_OVERFLOW_POLICIES[destination]
+            policy = OverflowPolicy(options.get("overflow", default_policy))
+            maxsize = options.get("queue_size", DEFAULT_QUEUE_SIZE)
+            queues[destination] = OutboundQueue(policy, maxsize)
+        return queues
+
+    @staticmethod
+    def _create_publisher(options: dict) -> Publisher:
+        options = {
+            key: value
+            for key, value in options.items()
+            if key not in TRANSMITTER_OPTIONS
+        }
+        return Publisher(**options)
 
     async def run(self) -> NoReturn:
+        drains = [self._drain(destination) for destination in Destination]
+        await asyncio.gather(self._receive(), *drains)
+
+    async def _receive(self) -> NoReturn:
         while True:
             await self._poll()
 
@@ -35,29 +117,141 @@ class AeronTransmitter:
         fragments_read = self.subscriber.poll()
         await self.idle_strategy.idle(fragments_read)
 
-    def offer(self, event: Event, destination: Destination) -> None:
+    def offer(self, event: Event, *destinations: Destination) -> None:
+        """
+        Отправить событие в одно или несколько направлений
+
+        Событие кодируется один раз для каждого используемого формата,
+        и все направления получают одно и то же сообщение
+        """
         try:
-            self._offer(event, destination)
+            for destination, message, key in self._encode_all(event, destinations):
+                self._put(destination, message, key)
         except Exception as e:
             self.logger.error(e)
 
-    def _offer(self, event: Event, destination: Destination):
+    async def offer_wait(self, event: Event, *destinations: Destination) -> None:
+        """
+        Отправить событие, дождавшись места в очередях с политикой BLOCK
+        """
+        try:
+            for destination, message, key in self._encode_all(event, destinations):
+                await self.queues[destination].put_wait(message, key)
+        except Exception as e:
+            self.logger.error(e)
+
+    def offer_raw(self, message: str, *destinations: Destination) -> None:
+        """
+        Отправить уже сериализованное JSON-сообщение без изменений
+        """
+        for destination in destinations:
+            if self.encodings[destination] != Encoding.JSON:
+                self.logger.error("Raw message requires JSON encoding: %s", destination)
+                continue
+            self._put(destination, message)
+
+    def _put(
+        self, destination: Destination, message: str | bytes, key: str | None = None
+    ) -> None:
+        try:
+            self.queues[destination].put(message, key)
+        except asyncio.QueueFull as e:
+            self.logger.error("Message to %s is rejected: %s", destination, e)
+
+    def _encode_all(
+        self, event: Event, destinations: tuple[Destination, ...]
+    ) -> list[tuple[Destination, str | bytes, str | None]]:
+        """
+        Закодировать событие для направлений, по одному разу для каждого формата
+        """
+        messages: dict[Encoding, str | bytes] = {}
+        encoded = []
+        for destination in destinations:
+            encoding = self.encodings[destination]
+            if (message := messages.get(encoding)) is None:
+                message = self._encode(event, destination)
+                messages[encoding] = message
+
+            key = self._get_conflation_key(event, destination)
+            encoded.append((destination, message, key))
+        return encoded
+
+    @staticmethod
+    def _get_conflation_key(event: Event, destination: Destination) -> str | None:
+        if destination == Destination.ORDER_BOOK:
+            return event["data"]["symbol"]
+
+    def _encode(self, event: Event, destination: Destination) -> str | bytes:
+        match self.encodings[destination]:
+            case Encoding.BINARY:
+                return self.order_book_encoder.encode(event["data"])
+            case _:
+                return self.formatter.format(event)
+
+    async def _drain(self, destination: Destination) -> NoReturn:
+        """
+        Отправлять сообщения из очереди направления, не блокируя цикл событий
+        """
         publisher = self._get_publisher(destination)
-        message = self.formatter.format(event)
-        self._offer_while_not_successful(publisher, message)
+        queue = self.queues[destination]
+        batch_size, batch_bytes = self.batches[destination]
+        while True:
+            if batch_size > 1:
+                # Несколько событий объединяются в одно сообщение, по одному
+                # событию в строке
+                messages = await queue.get_batch(batch_size, batch_bytes)
+                message = "\n".join(messages)
+            else:
+                message = await queue.get()
+            await self._offer_while_not_successful(publisher, message)
 
-    def _offer_while_not_successful(self, publisher: Publisher, message: str) -> None:
+    async def _offer_while_not_successful(
+        self, publisher: Publisher, message: str | bytes
+    ) -> None:
+        backoff = MIN_OFFER_BACKOFF
+        errors = 0
         while True:
             try:
-                result = publisher.offer(message)
-                break
+                publisher.offer(message)
+                return
             except aeron.AeronPublicationNotConnectedError as e:
                 self.logger.debug(e)
-                break
+                return
             except aeron.AeronPublicationAdminActionError as e:
-                self.logger.warning(e)
+                self.logger.debug(e)
             except Exception as e:
                 self.logger.exception(e)
+                errors += 1
+                if errors >= MAX_OFFER_ERRORS:
+                    return
+
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, MAX_OFFER_BACKOFF)
+
+    def stats(self) -> dict:
+        """
+        Получить глубину очередей и счётчики отброшенных сообщений
+        """
+        return {
+            destination.value: queue.stats()
+            for destination, queue in self.queues.items()
+        }
+
+    def reset_stats(self) -> None:
+        for queue in self.queues.values():
+            queue.reset_counters()
+
+    def _flush(self) -> None:
+        """
+        Сделать одну попытку отправить оставшиеся в очередях сообщения
+        """
+        for destination, queue in self.queues.items():
+            publisher = self._get_publisher(destination)
+            while len(queue):
+                try:
+                    publisher.offer(queue.get_nowait())
+                except Exception as e:
+                    self.logger.debug(e)
 
     def _get_publisher(self, destination) -> Publisher:
         match destination:
@@ -73,6 +267,7 @@ class AeronTransmitter:
                 raise ValueError(f"Invalid destination: {destination}")
 
     def close(self):
+        self._flush()
         self.subscriber.close()
         self.order_book.close()
         self.balance.close()
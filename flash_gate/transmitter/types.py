@@ -13,3 +13,4 @@ class Event(TypedDict, total=False):
     message: str
     timestamp: int
     data: Any
+    analytics: dict
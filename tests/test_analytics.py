@@ -0,0 +1,72 @@
+import pytest
+from flash_gate.exchange.orderbook import ArrayOrderBook
+from flash_gate.gate import analytics as analytics_module
+from flash_gate.gate.analytics import OrderBookAnalytics
+from flash_gate.gate.parsers import ConfigParser
+
+
+def make_order_book(bids, asks):
+    return ArrayOrderBook.from_levels("BTC/USDT", bids, asks, None)
+
+
+class TestOrderBookAnalytics:
+    @pytest.fixture(autouse=True, params=["numpy", "python"])
+    def implementation(self, request, monkeypatch):
+        if request.param == "numpy":
+            if analytics_module.import_numpy() is None:
+                pytest.skip("numpy is not installed")
+        else:
+            monkeypatch.setattr(analytics_module, "import_numpy", lambda: None)
+
+    def test_features(self):
+        analytics = OrderBookAnalytics(levels=2, offsets=[0.01, 0.02])
+        order_book = make_order_book(
+            bids=[[99.0, 3.0], [98.5, 1.0], [97.0, 5.0]],
+            asks=[[101.0, 1.0], [101.5, 1.0], [103.0, 2.0]],
+        )
+        [features] = analytics.compute([order_book])
+
+        assert features["mid"] == 100.0
+        assert features["spread"] == 2.0
+        assert features["microprice"] == pytest.approx((99 * 1 + 101 * 3) / 4)
+        assert features["imbalance"] == pytest.approx((4 - 2) / 6)
+        assert features["depth"] == {"bids": [3.0, 4.0], "asks": [1.0, 2.0]}
+
+    def test_batch_with_different_depths(self):
+        analytics = OrderBookAnalytics()
+        short = make_order_book(bids=[[10.0, 1.0]], asks=[[11.0, 1.0]])
+        long = make_order_book(
+            bids=[[20.0, 1.0], [19.0, 1.0]], asks=[[21.0, 1.0], [22.0, 1.0]]
+        )
+        short_features, long_features = analytics.compute([short, long])
+
+        assert short_features["mid"] == 10.5
+        assert long_features["mid"] == 20.5
+
+    def test_empty_side(self):
+        analytics = OrderBookAnalytics()
+        [features] = analytics.compute([make_order_book(bids=[], asks=[[1.0, 1.0]])])
+
+        assert features["mid"] is None
+        assert features["spread"] is None
+        assert features["imbalance"] == -1.0
+
+    def test_no_order_books(self):
+        assert OrderBookAnalytics().compute([]) == []
+
+
+class TestConfig:
+    @staticmethod
+    def parser(encoding: str) -> ConfigParser:
+        gate_config = {
+            "gate": {"order_book_analytics": {"levels": 5}},
+            "aeron": {"publishers": {"orderbooks": {"encoding": encoding}}},
+        }
+        return ConfigParser({"data": {"configs": {"gate_config": gate_config}}})
+
+    def test_json_encoding(self):
+        assert self.parser("json").order_book_analytics == {"levels": 5}
+
+    def test_binary_encoding_is_rejected(self):
+        with pytest.raises(ValueError):
+            self.parser("binary").order_book_analytics
@@ -0,0 +1,38 @@
+import dataclasses
+from flash_gate.cache.balance import BalanceSnapshot
+
+
+@dataclasses.dataclass
+class Balance:
+    assets: dict
+    timestamp: int
+
+
+BALANCE = Balance({"BTC": {"free": 1}, "USDT": {"free": 2}}, 1)
+
+
+class TestBalanceSnapshot:
+    def test_empty(self):
+        assert BalanceSnapshot().get(["BTC"]) is None
+
+    def test_partial_balance(self):
+        snapshot = BalanceSnapshot()
+        snapshot.update(BALANCE)
+        assert snapshot.get(["BTC"]) == Balance({"BTC": {"free": 1}}, 1)
+        assert BALANCE.assets.keys() == {"BTC", "USDT"}
+
+    def test_unknown_asset(self):
+        snapshot = BalanceSnapshot()
+        snapshot.update(BALANCE)
+        assert snapshot.get(["BTC", "ETH"]) is None
+
+    def test_stale(self):
+        snapshot = BalanceSnapshot(max_age=0)
+        snapshot.update(BALANCE)
+        assert snapshot.get(["BTC"]) is None
+
+    def test_invalidate(self):
+        snapshot = BalanceSnapshot()
+        snapshot.update(BALANCE)
+        snapshot.invalidate()
+        assert snapshot.get(["BTC"]) is None
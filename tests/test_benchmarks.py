@@ -0,0 +1,15 @@
+from benchmarks.suite import load, report, save
+
+
+def test_baseline_round_trip(tmp_path):
+    path = str(tmp_path / "baseline.json")
+    save(path, {"latency_percentile": 10.0})
+    assert load(path) == {"latency_percentile": 10.0}
+
+
+def test_report_regressions(capsys):
+    results = {"slower": 13.0, "faster": 5.0, "new": 1.0}
+    baseline = {"slower": 10.0, "faster": 10.0}
+
+    assert report(results, baseline) == ["slower"]
+    assert "new" in capsys.readouterr().out
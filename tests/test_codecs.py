@@ -0,0 +1,32 @@
+from flash_gate.transmitter.codecs import (
+    HEADER,
+    BinaryOrderBookDecoder,
+    BinaryOrderBookEncoder,
+)
+
+SYMBOLS = ["BTC/USDT", "ETH/USDT"]
+ORDER_BOOK = {
+    "symbol": "ETH/USDT",
+    "bids": [[1500.5, 2.0], [1500.0, 0.125]],
+    "asks": [[1501.0, 1.5]],
+    "timestamp": 1656633600000000,
+}
+
+
+class TestBinaryOrderBookCodec:
+    def test_round_trip(self):
+        message = BinaryOrderBookEncoder(SYMBOLS).encode(ORDER_BOOK)
+        assert BinaryOrderBookDecoder(SYMBOLS).decode(message) == ORDER_BOOK
+
+    def test_layout(self):
+        message = BinaryOrderBookEncoder(SYMBOLS).encode(ORDER_BOOK)
+        assert len(message) == HEADER.size + 6 * 8
+        assert HEADER.unpack_from(message) == (1, 1656633600000000, 2, 1)
+
+    def test_missing_timestamp(self):
+        order_book = ORDER_BOOK | {"timestamp": None, "asks": []}
+        message = BinaryOrderBookEncoder(SYMBOLS).encode(order_book)
+        decoded = BinaryOrderBookDecoder().decode(message)
+        assert decoded["timestamp"] is None
+        assert decoded["symbol"] == 1
+        assert decoded["asks"] == []
@@ -0,0 +1,43 @@
+import asyncio
+from flash_gate.exchange.connections import ConnectionManager, ConnectionStats
+
+
+class TestConnectionStats:
+    def test_counters(self):
+        stats = ConnectionStats()
+
+        async def trace():
+            await stats.on_dns_cache_miss(None, None, None)
+            await stats.on_connection_create_end(None, None, None)
+            await stats.on_dns_cache_hit(None, None, None)
+            await stats.on_connection_reuseconn(None, None, None)
+            await stats.on_connection_reuseconn(None, None, None)
+
+        asyncio.run(trace())
+        assert stats.metrics() == {
+            "created": 1,
+            "reused": 2,
+            "dns_hits": 1,
+            "dns_misses": 1,
+        }
+
+        stats.reset()
+        assert set(stats.metrics().values()) == {0}
+
+
+class TestConnectionManager:
+    def test_session_per_local_host(self):
+        async def get_sessions():
+            manager = ConnectionManager()
+            sessions = (
+                manager.get_session("127.0.0.1"),
+                manager.get_session("127.0.0.1"),
+                manager.get_session("127.0.0.2"),
+            )
+            await manager.close()
+            return manager, sessions
+
+        manager, (first, second, other) = asyncio.run(get_sessions())
+        assert first is second
+        assert first is not other
+        assert set(manager.metrics()) == {"127.0.0.1", "127.0.0.2"}
@@ -0,0 +1,66 @@
+import itertools
+from flash_gate.gate.filters import DEFAULT_HEARTBEAT, OrderBookChangeFilter
+from flash_gate.gate.parsers import ConfigParser
+
+ORDER_BOOK = {
+    "symbol": "BTC/USDT",
+    "bids": [[20000.0, 0.5], [19999.0, 1.0]],
+    "asks": [[20001.0, 0.3], [20002.0, 2.0]],
+    "timestamp": None,
+}
+
+
+class TestOrderBookChangeFilter:
+    def test_unchanged_order_book_is_suppressed(self):
+        orderbook_filter = OrderBookChangeFilter()
+        assert orderbook_filter.is_changed(ORDER_BOOK)
+        assert not orderbook_filter.is_changed(dict(ORDER_BOOK))
+        assert (orderbook_filter.published, orderbook_filter.suppressed) == (1, 1)
+
+    def test_changed_order_book_is_published(self):
+        orderbook_filter = OrderBookChangeFilter()
+        changed = ORDER_BOOK | {"bids": [[20000.0, 0.6], [19999.0, 1.0]]}
+        assert orderbook_filter.is_changed(ORDER_BOOK)
+        assert orderbook_filter.is_changed(changed)
+
+    def test_heartbeat_republishes_unchanged_order_book(self):
+        orderbook_filter = OrderBookChangeFilter(heartbeat=0)
+        assert orderbook_filter.is_changed(ORDER_BOOK)
+        assert orderbook_filter.is_changed(ORDER_BOOK)
+
+    def test_heartbeat_is_on_by_default(self, monkeypatch):
+        now = 100.0
+        monkeypatch.setattr("flash_gate.gate.filters.monotonic", lambda: now)
+        orderbook_filter = OrderBookChangeFilter()
+        assert orderbook_filter.is_changed(ORDER_BOOK)
+
+        now += DEFAULT_HEARTBEAT / 2
+        assert not orderbook_filter.is_changed(ORDER_BOOK)
+        now += DEFAULT_HEARTBEAT
+        assert orderbook_filter.is_changed(ORDER_BOOK)
+
+    def test_heartbeat_can_be_disabled(self, monkeypatch):
+        clock = itertools.count(0, 1_000)
+        monkeypatch.setattr("flash_gate.gate.filters.monotonic", lambda: next(clock))
+        orderbook_filter = OrderBookChangeFilter(heartbeat=None)
+        assert orderbook_filter.is_changed(ORDER_BOOK)
+        assert not orderbook_filter.is_changed(ORDER_BOOK)
+
+    def test_disabled_filter_publishes_everything(self):
+        orderbook_filter = OrderBookChangeFilter(enabled=False)
+        assert orderbook_filter.is_changed(ORDER_BOOK)
+        assert orderbook_filter.is_changed(ORDER_BOOK)
+        assert orderbook_filter.suppressed == 0
+
+
+class TestConfig:
+    @staticmethod
+    def heartbeat(config: dict, **options) -> float | None:
+        config["data"]["configs"]["gate_config"]["gate"].update(options)
+        return ConfigParser(config).order_book_heartbeat
+
+    def test_default_heartbeat(self, gate_config):
+        assert self.heartbeat(gate_config) == DEFAULT_HEARTBEAT
+
+    def test_null_disables_heartbeat(self, gate_config):
+        assert self.heartbeat(gate_config, order_book_heartbeat=None) is None
@@ -0,0 +1,101 @@
+import dataclasses
+import json
+from datetime import datetime, timezone
+from decimal import Decimal
+from enum import Enum
+import pytest
+from flash_gate.transmitter.formatters import (
+    JsonFormatter,
+    JsonSerializer,
+    OrjsonSerializer,
+    orjson,
+    wrap_message,
+)
+
+
+class Side(str, Enum):
+    BUY = "buy"
+
+
+@dataclasses.dataclass
+class Trade:
+    price: Decimal
+    amount: Decimal
+
+
+@dataclasses.dataclass
+class Order:
+    id: str
+    side: Side
+    price: Decimal
+    timestamp: datetime
+    trades: list[Trade]
+    info: dict
+
+
+ORDER = Order(
+    id="123",
+    side=Side.BUY,
+    price=Decimal("20000.10"),
+    timestamp=datetime(2022, 7, 1, tzinfo=timezone.utc),
+    trades=[Trade(Decimal("20000.1"), Decimal("0.50")), Trade(Decimal("1E+1"), 1)],
+    info={"nested": [Trade(Decimal("1"), Decimal("2"))], "text": "ордер"},
+)
+MESSAGE = {"event_id": "1", "action": Side.BUY, "data": [ORDER], "message": None}
+
+
+class AsdictEncoder(json.JSONEncoder):
+    def default(self, obj):
+        if dataclasses.is_dataclass(obj):
+            return dataclasses.asdict(obj)
+        if isinstance(obj, Decimal):
+            return str(obj.normalize())
+        if isinstance(obj, datetime):
+            return int(obj.timestamp() * 1_000_000)
+        return json.JSONEncoder.default(self, obj)
+
+
+class TestJsonSerializer:
+    def test_output_matches_asdict_encoding(self):
+        expected = json.dumps(MESSAGE, cls=AsdictEncoder)
+        assert JsonSerializer().serialize(MESSAGE) == expected
+
+
+class TestJsonFormatter:
+    CONFIG = {
+        "algo": "3m_maker",
+        "data": {
+            "configs": {
+                "gate_config": {
+                    "info": {"node": "gate", "instance": "1"},
+                    "exchange": {"exchange_id": "exmo"},
+                    "gate": {},
+                }
+            }
+        },
+    }
+
+    def test_json_is_default(self):
+        formatter = JsonFormatter(self.CONFIG)
+        assert isinstance(formatter.serializer, JsonSerializer)
+
+
+@pytest.mark.skipif(orjson is None, reason="orjson is not installed")
+class TestOrjsonSerializer:
+    def test_values_match_json_serializer(self):
+        expected = json.loads(JsonSerializer().serialize(MESSAGE))
+        assert json.loads(OrjsonSerializer().serialize(MESSAGE)) == expected
+
+
+class TestWrapMessage:
+    def test_message_is_kept_verbatim(self):
+        message = '{"event_id": "1", "node": "core", "price": 1.10}'
+        wrapped = wrap_message(message, "gate")
+        assert wrapped == f'{{"node": "gate", "data": {message}}}'
+        assert json.loads(wrapped)["data"]["node"] == "core"
+
+    def test_not_an_object(self):
+        assert json.loads(wrap_message("[1, 2]", "gate")) == {
+            "node": "gate",
+            "data": [1, 2],
+        }
@@ -0,0 +1,424 @@
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from typing import Optional
+import pytest
+from ccxt.base.errors import ExchangeError, OrderNotFound
+from flash_gate.exchange.formatters import (
+    CcxtOrderFormatter,
+    CcxtPartialBalanceFormatter,
+)
+from flash_gate.exchange.orderbook import ArrayOrderBook
+from flash_gate.gate import Gate
+from flash_gate.transmitter.enums import EventAction, EventType
+from tests.conftest import (
+    make_balance,
+    make_ccxt_order,
+    make_gate_config,
+    make_order,
+)
+
+
+class Transmitter:
+    def __init__(self):
+        self.events = []
+        self.raw = []
+
+    def offer(self, event, *destinations) -> None:
+        self.events.append(event)
+
+    async def offer_wait(self, event, *destinations) -> None:
+        self.offer(event, *destinations)
+
+    def offer_raw(self, message: str, *destinations) -> None:
+        self.raw.append(message)
+
+
+@asynccontextmanager
+async def open_gate(**options):
+    config = make_gate_config()
+    config["data"]["configs"]["gate_config"]["gate"].update(options)
+    gate = Gate(config, transmitter=Transmitter())
+    try:
+        yield gate
+    finally:
+        for exchange in gate.exchanges:
+            await exchange.close()
+        await gate.connections.close()
+
+
+class ConcurrencyProbe:
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+
+    async def create_order(self, param: dict, event_id: str):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+
+
+class TestCreateOrders:
+    @staticmethod
+    async def peak(*commands: list[dict], **options) -> int:
+        async with open_gate(**options) as gate:
+            probe = ConcurrencyProbe()
+            gate.create_order = probe.create_order
+            events = [{"event_id": str(i), "data": c} for i, c in enumerate(commands)]
+            await asyncio.gather(*(gate.create_orders(e) for e in events))
+            return probe.peak
+
+    def test_orders_of_one_command_are_limited(self):
+        assert asyncio.run(self.peak([{}, {}, {}])) == 1
+
+    def test_commands_overlap(self):
+        assert asyncio.run(self.peak([{}, {}], [{}])) == 2
+
+    def test_concurrency_option(self):
+        peak = self.peak([{}, {}, {}], create_orders_concurrency=3)
+        assert asyncio.run(peak) == 3
+
+
+class Exchange:
+    def __init__(self, order: dict):
+        self.order = order
+
+    async def create_order(self, param: dict) -> dict:
+        return dict(self.order)
+
+
+class Rock:
+    def __init__(self, orders: list):
+        self.orders = orders
+
+    async def watch_orders(self) -> list:
+        if not self.orders:
+            raise asyncio.CancelledError
+        orders, self.orders = self.orders, []
+        return orders
+
+
+def replies(gate: Gate, action: EventAction) -> list:
+    return [e for e in gate.transmitter.events if e.get("action") == action]
+
+
+class TestGetOrders:
+    @staticmethod
+    async def get_order(gate: Gate, client_order_id: str) -> dict:
+        command = {"data": [{"client_order_id": client_order_id, "symbol": "BTC/USDT"}]}
+        await gate.get_orders(command)
+        [reply] = replies(gate, EventAction.GET_ORDERS)
+        [order] = reply["data"]
+        return order
+
+    async def created_order(self) -> dict:
+        async with open_gate() as gate:
+            exchange = Exchange(CcxtOrderFormatter().format(make_ccxt_order("1")))
+
+            async def get_exchange():
+                return exchange
+
+            gate.get_exchange = get_exchange
+            await gate.create_order({"client_order_id": "a", "symbol": "BTC/USDT"}, "e")
+            return await self.get_order(gate, "a")
+
+    async def streamed_order(self) -> dict:
+        async with open_gate() as gate:
+            gate.order_index.add("b", "2", "e")
+            gate.rock = Rock([make_order("2")])
+            with pytest.raises(asyncio.CancelledError):
+                await gate.watch_orders()
+            return await self.get_order(gate, "b")
+
+    def test_same_shape_from_rest_and_stream(self):
+        created = asyncio.run(self.created_order())
+        streamed = asyncio.run(self.streamed_order())
+
+        assert list(created) == list(streamed)
+        for key in ("price", "amount", "filled"):
+            assert type(created[key]) is type(streamed[key]) is float
+        assert created["status"] == streamed["status"] == "open"
+        assert streamed["client_order_id"] == "b"
+        assert streamed["timestamp"] == 1_656_633_600_000_000
+
+
+class BalanceExchange:
+    async def fetch_partial_balance(self, parts: list[str]) -> dict:
+        asset = {"free": 1.5, "used": 0.25, "total": 1.75}
+        balance = {part: dict(asset) for part in parts}
+        return CcxtPartialBalanceFormatter().format(balance)
+
+
+class TestGetBalance:
+    @staticmethod
+    async def get_balance(gate: Gate) -> dict:
+        await gate.get_balance({"event_id": "1", "data": ["BTC", "USDT"]})
+        [reply] = replies(gate, EventAction.GET_BALANCE)
+        return reply["data"]
+
+    async def fetched_balance(self) -> dict:
+        async with open_gate() as gate:
+
+            async def get_exchange():
+                return BalanceExchange()
+
+            gate.get_exchange = get_exchange
+            return await self.get_balance(gate)
+
+    async def snapshot_balance(self) -> dict:
+        async with open_gate() as gate:
+            gate.balance_snapshot.update(make_balance())
+            return await self.get_balance(gate)
+
+    def test_same_shape_from_rest_and_snapshot(self):
+        fetched = asyncio.run(self.fetched_balance())
+        snapshot = asyncio.run(self.snapshot_balance())
+
+        assert list(fetched) == list(snapshot) == ["assets", "timestamp"]
+        assert fetched["assets"] == snapshot["assets"]
+        assert snapshot["assets"]["BTC"] == {"free": 1.5, "used": 0.25, "total": 1.75}
+        assert snapshot["timestamp"] == 1_656_633_600_000_000
+
+
+class CancelExchange:
+    def __init__(self, count: int, bulk: bool, errors: Optional[dict] = None):
+        self.orders = [{"id": str(i), "symbol": "BTC/USDT"} for i in range(count)]
+        self.has_cancel_all_orders = bulk
+        self.errors = errors or {}
+        self.active = 0
+        self.peak = 0
+
+    async def request(self, key: str) -> None:
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        if key in self.errors:
+            raise self.errors[key]
+
+    async def fetch_open_orders(self, symbols: list[str]) -> list[dict]:
+        await self.request("fetch")
+        return [o for o in self.orders if o["symbol"] in symbols]
+
+    async def cancel_symbol_orders(self, symbol: str) -> None:
+        await self.request("bulk")
+
+    async def cancel_order(self, params: dict) -> None:
+        await self.request(params["id"])
+
+
+def book(timestamp: Optional[int], amount: float, symbol: str = "BTC/USDT"):
+    return ArrayOrderBook.from_levels(
+        symbol, [[100.0, amount]], [[101.0, 1.0]], timestamp
+    )
+
+
+class TestOfferOrderbooks:
+    @staticmethod
+    async def offer(*responses: tuple[ArrayOrderBook, int]) -> list:
+        async with open_gate() as gate:
+            for orderbook, requested_at in responses:
+                gate.offer_orderbooks([orderbook], requested_at)
+            updates = replies(gate, EventAction.ORDER_BOOK_UPDATE)
+            return [event["data"] for event in updates]
+
+    def test_later_request_is_published(self):
+        first, second = book(None, 1.0), book(None, 2.0)
+        published = asyncio.run(self.offer((first, 10), (second, 20)))
+        assert published == [first, second]
+
+    def test_late_response_to_earlier_request_is_dropped(self):
+        late, fresh = book(None, 1.0), book(None, 2.0)
+        published = asyncio.run(self.offer((fresh, 20), (late, 10)))
+        assert published == [fresh]
+
+    def test_older_timestamp_is_dropped(self):
+        fresh, stale = book(2_000, 1.0), book(1_000, 2.0)
+        published = asyncio.run(self.offer((fresh, 10), (stale, 20)))
+        assert published == [fresh]
+
+    def test_equal_timestamp_is_dropped(self):
+        first, same = book(1_000, 1.0), book(1_000, 2.0)
+        published = asyncio.run(self.offer((first, 10), (same, 20)))
+        assert published == [first]
+
+    def test_newer_timestamp_is_published(self):
+        first, newer = book(1_000, 1.0), book(1_001, 2.0)
+        published = asyncio.run(self.offer((first, 10), (newer, 20)))
+        assert published == [first, newer]
+
+    def test_missing_timestamp_is_not_compared(self):
+        first, unknown = book(1_000, 1.0), book(None, 2.0)
+        published = asyncio.run(self.offer((first, 10), (unknown, 20)))
+        assert published == [first, unknown]
+
+    def test_symbols_are_independent(self):
+        btc, eth = book(2_000, 1.0), book(1_000, 1.0, "ETH/USDT")
+        published = asyncio.run(self.offer((btc, 20), (eth, 10)))
+        assert published == [btc, eth]
+
+
+class TestCancelAllOrders:
+    @staticmethod
+    async def cancel_all(exchange: CancelExchange) -> tuple[Gate, list[dict]]:
+        async with open_gate() as gate:
+
+            async def get_exchange():
+                return exchange
+
+            gate.get_exchange = get_exchange
+            await gate.cancel_all_orders({"event_id": "1"})
+            progress = replies(gate, EventAction.CANCEL_ALL_ORDERS)
+            return gate, progress
+
+    def test_bulk_cancel(self):
+        exchange = CancelExchange(3, bulk=True)
+        gate, [started, canceled, final] = asyncio.run(self.cancel_all(exchange))
+
+        assert started["data"]["live"] == ["0", "1", "2"]
+        assert canceled["data"]["live"] == []
+        assert final["data"] == canceled["data"] | {"finished": True}
+        assert final["data"]["canceled"] == ["0", "1", "2"]
+        assert set(gate.canceled_orders) == {"0", "1", "2"}
+
+    def test_bulk_cancel_error_keeps_orders_live(self):
+        exchange = CancelExchange(2, bulk=True, errors={"bulk": ExchangeError()})
+        gate, progress = asyncio.run(self.cancel_all(exchange))
+
+        assert progress[-1]["data"] == {
+            "live": ["0", "1"],
+            "canceled": [],
+            "failed": ["0", "1"],
+            "finished": True,
+        }
+        assert not gate.canceled_orders
+
+    def test_fallback_cancels_each_order(self):
+        exchange = CancelExchange(10, bulk=False)
+        gate, progress = asyncio.run(self.cancel_all(exchange))
+
+        # Список ордеров, ответ на каждую отмену и итог
+        assert len(progress) == 12
+        assert progress[-1]["data"]["live"] == []
+        assert sorted(progress[-1]["data"]["canceled"], key=int) == [
+            str(i) for i in range(10)
+        ]
+
+    def test_fallback_is_bounded(self):
+        exchange = CancelExchange(10, bulk=False)
+        asyncio.run(self.cancel_all(exchange))
+        assert exchange.peak == Gate.CANCEL_ALL_CONCURRENCY
+
+    def test_fallback_errors(self):
+        errors = {"1": ExchangeError(), "2": OrderNotFound()}
+        exchange = CancelExchange(3, bulk=False, errors=errors)
+        gate, progress = asyncio.run(self.cancel_all(exchange))
+
+        assert progress[-1]["data"] == {
+            "live": ["1"],
+            "canceled": ["0"],
+            "failed": ["1"],
+            "finished": True,
+        }
+        assert set(gate.canceled_orders) == {"0"}
+
+    def test_fetch_error(self):
+        exchange = CancelExchange(1, bulk=True, errors={"fetch": ExchangeError()})
+        gate, [error, final] = asyncio.run(self.cancel_all(exchange))
+
+        assert error["event"] == EventType.ERROR
+        assert error["data"] == ["BTC/USDT"]
+        assert final["data"]["live"] == []
+
+
+class TestHandler:
+    def test_command_starts_before_logging(self):
+        async def scenario():
+            async with open_gate() as gate:
+                calls = []
+                log = gate.log
+
+                async def get_balance(event):
+                    calls.append("request")
+
+                def log_message(message):
+                    calls.append("log")
+                    log(message)
+
+                gate.get_balance = get_balance
+                gate.log = log_message
+                gate.handler('{"event_id": "1", "action": "get_balance"}')
+                assert calls == []
+
+                await asyncio.gather(*gate.background_tasks)
+                await asyncio.sleep(0)
+                return calls, gate.transmitter.raw
+
+        calls, logged = asyncio.run(scenario())
+        assert calls == ["request", "log"]
+        [entry] = [json.loads(m) for m in logged]
+        assert entry == {
+            "node": "gate",
+            "data": {"event_id": "1", "action": "get_balance"},
+        }
+
+
+class Stream:
+    def __init__(self, failures: int, timeline: list):
+        self.failures = failures
+        self.timeline = timeline
+
+    async def watch_order_book(self, symbol: str, depth: int):
+        await asyncio.sleep(0.01)
+        if self.failures:
+            self.failures -= 1
+            self.timeline.append("ws error")
+            raise ConnectionError("closed")
+        self.timeline.append("ws")
+        return symbol
+
+
+class TestStreamOrderbook:
+    @staticmethod
+    async def stream(failures: int) -> list:
+        async with open_gate() as gate:
+            timeline = []
+            stream = Stream(failures, timeline)
+
+            async def acquire():
+                return stream
+
+            async def fetch_orderbook(symbol: str):
+                await asyncio.sleep(0.001)
+                timeline.append("rest")
+
+            gate.exchange_pool.acquire = acquire
+            gate.fetch_orderbook = fetch_orderbook
+            gate.offer_orderbook = lambda orderbook, requested_at: None
+            gate.STREAM_RECONNECT_MIN_DELAY = 0.01
+
+            task = asyncio.create_task(gate.stream_orderbook("BTC/USDT"))
+            await asyncio.sleep(0.2)
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            stopped = list(timeline)
+            await asyncio.sleep(0.02)
+            return stopped, timeline
+
+    def test_no_polling_while_stream_works(self):
+        _, timeline = asyncio.run(self.stream(failures=0))
+        assert "rest" not in timeline
+
+    def test_polls_until_stream_recovers(self):
+        _, timeline = asyncio.run(self.stream(failures=3))
+        recovered = timeline.index("ws")
+        outage = timeline[:recovered]
+
+        assert outage.count("rest") > 3 * outage.count("ws error")
+        assert "rest" not in timeline[recovered:]
+
+    def test_polling_stops_with_stream(self):
+        stopped, timeline = asyncio.run(self.stream(failures=100))
+        assert timeline.count("rest") > timeline.count("ws error")
+        assert timeline == stopped
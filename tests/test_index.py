@@ -0,0 +1,126 @@
+import asyncio
+import pytest
+from flash_gate.cache.index import OrderIndex
+
+
+class Memcached:
+    def __init__(self):
+        self.values = {}
+
+    def set(self, key, value) -> None:
+        self.values[key] = value
+
+    def get(self, key: str):
+        return self.values.get(key)
+
+
+def make_index(**options) -> OrderIndex:
+    index = OrderIndex(**options)
+    index._event_id_by_client_order_id = Memcached()
+    index._order_id_by_client_order_id = Memcached()
+    index._client_order_id_by_order_id = Memcached()
+    return index
+
+
+@pytest.fixture
+def index():
+    return make_index()
+
+
+class TestOrderIndex:
+    def test_insert(self, index):
+        entry = index.add("a", "1", "e")
+
+        assert (entry.client_order_id, entry.order_id, entry.event_id) == (
+            "a",
+            "1",
+            "e",
+        )
+        assert index.get("a") is entry
+        assert index.get_by_order_id("1") is entry
+        assert len(index) == 1
+
+    def test_insert_without_order_id(self, index):
+        index.add("a", None, "e")
+        assert index.get("a").event_id == "e"
+        assert index.get_by_order_id("None") is None
+
+    def test_update_replaces_order_id(self, index):
+        index.add("a", None, "e")
+        entry = index.add("a", "1", "e")
+
+        assert index.get("a") is entry
+        assert index.get_by_order_id("1") is entry
+        assert len(index) == 1
+
+    def test_update_drops_previous_order_id(self, index):
+        index.add("a", "1", "e")
+        index.add("a", "2", "e")
+
+        assert index.get_by_order_id("1") is None
+        assert index.get_by_order_id("2").client_order_id == "a"
+
+    def test_missing(self, index):
+        assert index.get("a") is None
+        assert index.get_by_order_id("1") is None
+
+    def test_evicts_oldest_over_maxsize(self):
+        index = make_index(maxsize=2)
+        index.add("a", "1", "e")
+        index.add("b", "2", "e")
+        index.add("c", "3", "e")
+
+        assert len(index) == 2
+        assert index.get("a") is None
+        assert index.get_by_order_id("1") is None
+        assert index.get("c").order_id == "3"
+
+    def test_update_refreshes_eviction_order(self):
+        index = make_index(maxsize=2)
+        index.add("a", "1", "e")
+        index.add("b", "2", "e")
+        index.add("a", "1", "e")
+        index.add("c", "3", "e")
+
+        assert index.get("a") is not None
+        assert index.get("b") is None
+
+    def test_expired_entry(self):
+        index = make_index(ttl=0)
+        index.add("a", "1", "e")
+
+        assert index.get("a") is None
+        assert index.get_by_order_id("1") is None
+        assert len(index) == 0
+
+
+class TestMemcachedFallback:
+    @staticmethod
+    def restart(index: OrderIndex) -> OrderIndex:
+        asyncio.run(index.flush())
+        restarted = make_index()
+        restarted._event_id_by_client_order_id = index._event_id_by_client_order_id
+        restarted._order_id_by_client_order_id = index._order_id_by_client_order_id
+        restarted._client_order_id_by_order_id = index._client_order_id_by_order_id
+        return restarted
+
+    def test_lookup_by_client_order_id(self, index):
+        index.add("a", "1", "e")
+        restarted = self.restart(index)
+
+        entry = asyncio.run(restarted.fetch("a"))
+        assert (entry.order_id, entry.event_id) == ("1", "e")
+        assert restarted.get("a") is entry
+
+    def test_lookup_by_order_id(self, index):
+        index.add("a", "1", "e")
+        restarted = self.restart(index)
+
+        entry = asyncio.run(restarted.fetch_by_order_id("1"))
+        assert entry.client_order_id == "a"
+        assert restarted.get_by_order_id("1") is entry
+
+    def test_unknown(self, index):
+        restarted = self.restart(index)
+        assert asyncio.run(restarted.fetch("a")) is None
+        assert asyncio.run(restarted.fetch_by_order_id("1")) is None
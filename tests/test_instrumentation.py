@@ -0,0 +1,37 @@
+import pytest
+from ccxt.base.errors import RateLimitExceeded, RequestTimeout
+from flash_gate.exchange.enums import Endpoint
+from flash_gate.exchange.instrumentation import RequestStats
+
+
+class TestRequestStats:
+    def test_successful_request(self):
+        stats = RequestStats()
+        with stats.measure(Endpoint.CREATE_ORDER):
+            pass
+        metrics = stats.metrics()["create_order"]
+        assert metrics["requests"] == 1
+        assert metrics["errors"] == 0
+        assert metrics["latency_percentile"] is not None
+
+    @pytest.mark.parametrize(
+        "exception, counter",
+        [
+            (RequestTimeout, "timeouts"),
+            (RateLimitExceeded, "rate_limits"),
+            (ValueError, "errors"),
+        ],
+    )
+    def test_failed_request(self, exception, counter):
+        stats = RequestStats()
+        with pytest.raises(exception):
+            with stats.measure(Endpoint.CANCEL_ORDER):
+                raise exception()
+        assert stats.metrics()["cancel_order"][counter] == 1
+
+    def test_reset(self):
+        stats = RequestStats()
+        with stats.measure(Endpoint.FETCH_BALANCE):
+            pass
+        stats.reset()
+        assert stats.metrics() == {}
@@ -0,0 +1,98 @@
+import asyncio
+import json
+import pytest
+from flash_gate.cache.markets import MarketCache
+from flash_gate.gate.parsers import ConfigParser
+
+DATA = {"markets": {"BTC/USDT": {"id": "BTC_USDT"}}, "currencies": {}}
+
+
+def make_fetch(data=DATA, error=None):
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        if error is not None:
+            raise error
+        return data
+
+    return fetch, calls
+
+
+class TestMarketCache:
+    def test_fetch_and_save(self, tmp_path):
+        cache = MarketCache(tmp_path / "markets.json", "exmo")
+        fetch, calls = make_fetch()
+
+        assert asyncio.run(cache.load(fetch)) == DATA
+        assert len(calls) == 1
+
+        stored = json.loads((tmp_path / "markets.json").read_text())
+        assert stored["exchange_id"] == "exmo"
+        assert stored["data"] == DATA
+
+    def test_fresh_file_skips_fetch(self, tmp_path):
+        cache = MarketCache(tmp_path / "markets.json", "exmo")
+        asyncio.run(cache.load(make_fetch()[0]))
+
+        fetch, calls = make_fetch(data={})
+        assert asyncio.run(cache.load(fetch)) == DATA
+        assert not calls
+
+    def test_stale_file_is_reloaded(self, tmp_path):
+        asyncio.run(MarketCache(tmp_path / "m.json", "exmo").load(make_fetch()[0]))
+
+        cache = MarketCache(tmp_path / "m.json", "exmo", ttl=0)
+        fresh = {"markets": {}, "currencies": {}}
+        fetch, calls = make_fetch(data=fresh)
+        assert asyncio.run(cache.load(fetch)) == fresh
+        assert len(calls) == 1
+
+    def test_other_exchange_is_reloaded(self, tmp_path):
+        asyncio.run(MarketCache(tmp_path / "m.json", "exmo").load(make_fetch()[0]))
+
+        fetch, calls = make_fetch()
+        asyncio.run(MarketCache(tmp_path / "m.json", "binance").load(fetch))
+        assert len(calls) == 1
+
+    def test_stale_file_used_on_error(self, tmp_path):
+        asyncio.run(MarketCache(tmp_path / "m.json", "exmo").load(make_fetch()[0]))
+
+        cache = MarketCache(tmp_path / "m.json", "exmo", ttl=0)
+        fetch, _ = make_fetch(error=ConnectionError())
+        assert asyncio.run(cache.load(fetch)) == DATA
+
+    def test_other_exchange_is_not_used_on_error(self, tmp_path):
+        asyncio.run(MarketCache(tmp_path / "m.json", "exmo").load(make_fetch()[0]))
+
+        cache = MarketCache(tmp_path / "m.json", "binance")
+        fetch, _ = make_fetch(error=ConnectionError())
+        with pytest.raises(ConnectionError):
+            asyncio.run(cache.load(fetch))
+
+    def test_unserializable_data_is_not_saved(self, tmp_path):
+        cache = MarketCache(tmp_path / "m.json", "exmo")
+        data = {"markets": {"BTC/USDT": object()}}
+        fetch, _ = make_fetch(data)
+
+        assert asyncio.run(cache.load(fetch)) is data
+        assert list(tmp_path.iterdir()) == []
+
+    def test_error_without_file(self, tmp_path):
+        cache = MarketCache(tmp_path / "m.json", "exmo")
+        fetch, _ = make_fetch(error=ConnectionError())
+        with pytest.raises(ConnectionError):
+            asyncio.run(cache.load(fetch))
+
+
+class TestConfig:
+    def test_default_path_in_cache_dir(self, tmp_path, monkeypatch, gate_config):
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+        path = ConfigParser(gate_config).markets_cache_path
+        assert path == str(tmp_path / "flash_gate" / "exmo_markets.json")
+
+    def test_creates_cache_dir(self, tmp_path):
+        cache = MarketCache(tmp_path / "flash_gate" / "markets.json", "exmo")
+        fetch, _ = make_fetch()
+        asyncio.run(cache.load(fetch))
+        assert (tmp_path / "flash_gate" / "markets.json").exists()
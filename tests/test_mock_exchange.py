@@ -0,0 +1,55 @@
+import asyncio
+import pytest
+
+aiohttp = pytest.importorskip("aiohttp")
+
+from benchmarks.load import rebase
+from benchmarks.mock_exchange import API_PREFIX, MockExmo
+
+
+async def exchange(server: MockExmo, calls: list[tuple[str, dict]]) -> list:
+    url = await server.start()
+    responses = []
+    try:
+        async with aiohttp.ClientSession() as session:
+            for path, form in calls:
+                async with session.post(f"{url}{API_PREFIX}/{path}", data=form) as r:
+                    responses.append((r.status, await r.json()))
+    finally:
+        await server.stop()
+    return responses
+
+
+def test_order_lifecycle():
+    server = MockExmo(latency=0)
+    calls = [
+        ("order_create", {"pair": "BTC_USDT", "quantity": "1", "price": "90"}),
+        ("user_open_orders", {}),
+        ("order_cancel", {"order_id": "1"}),
+        ("order_cancel", {"order_id": "1"}),
+        ("user_cancelled_orders", {}),
+    ]
+    created, opened, canceled, missing, history = asyncio.run(exchange(server, calls))
+
+    assert created[1]["order_id"] == 1
+    assert [o["order_id"] for o in opened[1]["BTC_USDT"]] == ["1"]
+    assert canceled[1]["result"] is True
+    assert "50304" in missing[1]["error"]
+    assert [o["order_id"] for o in history[1]] == ["1"]
+    assert server.stats()["requests"]["order_cancel"] == 2
+
+
+def test_rate_limit():
+    server = MockExmo(latency=0, rate_limit_ratio=1)
+    [(status, _)] = asyncio.run(exchange(server, [("user_info", {})]))
+
+    assert status == 429
+    assert server.rate_limited == 1
+
+
+def test_rebase_keeps_path():
+    urls = {"public": "https://api.exmo.com/v1.1", "ws": {"public": "wss://ws"}}
+    assert rebase(urls, "http://127.0.0.1:8080") == {
+        "public": "http://127.0.0.1:8080/v1.1",
+        "ws": {"public": "wss://ws"},
+    }
@@ -0,0 +1,69 @@
+import pytest
+from flash_gate.exchange.orderbook import ArrayOrderBook
+from flash_gate.gate.filters import OrderBookChangeFilter
+from flash_gate.transmitter.codecs import BinaryOrderBookEncoder
+from flash_gate.transmitter.formatters import JsonSerializer, OrjsonSerializer, orjson
+
+BIDS = [[100.5, 1.0], [100.0, 2.5], [99.5, 3.0]]
+ASKS = [[101.0, 0.5], [101.5, 1.5], [102.0, 4.0]]
+
+
+def make_dict(depth=None):
+    return {
+        "symbol": "BTC/USDT",
+        "bids": BIDS[:depth],
+        "asks": ASKS[:depth],
+        "timestamp": 1_000_000,
+    }
+
+
+def make_order_book(depth=None):
+    return ArrayOrderBook.from_levels("BTC/USDT", BIDS, ASKS, 1_000_000, depth)
+
+
+class TestArrayOrderBook:
+    def test_levels(self):
+        order_book = make_order_book()
+        assert order_book.bids == BIDS
+        assert order_book.asks == ASKS
+        assert order_book["symbol"] == "BTC/USDT"
+        assert order_book.to_dict() == make_dict()
+
+    def test_depth(self):
+        order_book = make_order_book(depth=2)
+        assert len(order_book.bid_prices) == 2
+        assert order_book.to_dict() == make_dict(depth=2)
+
+    def test_unknown_key(self):
+        with pytest.raises(KeyError):
+            make_order_book()["bid_prices"]
+
+    def test_fingerprint(self):
+        order_book = make_order_book()
+        assert order_book.fingerprint() == make_order_book().fingerprint()
+        assert order_book.fingerprint() != make_order_book(depth=2).fingerprint()
+
+    def test_binary_encoding_matches_dict(self):
+        encoder = BinaryOrderBookEncoder(["BTC/USDT"])
+        assert encoder.encode(make_order_book()) == encoder.encode(make_dict())
+
+    def test_json_matches_dict(self):
+        serializer = JsonSerializer()
+        message = {"data": make_order_book()}
+        assert serializer.serialize(message) == serializer.serialize(
+            {"data": make_dict()}
+        )
+
+    @pytest.mark.skipif(orjson is None, reason="orjson is not installed")
+    def test_orjson_matches_dict(self):
+        serializer = OrjsonSerializer()
+        message = {"data": make_order_book()}
+        assert serializer.serialize(message) == serializer.serialize(
+            {"data": make_dict()}
+        )
+
+    def test_change_filter(self):
+        orderbook_filter = OrderBookChangeFilter()
+        assert orderbook_filter.is_changed(make_order_book())
+        assert not orderbook_filter.is_changed(make_order_book())
+        assert orderbook_filter.is_changed(make_order_book(depth=2))
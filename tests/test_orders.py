@@ -0,0 +1,55 @@
+from enum import Enum
+from flash_gate.cache.orders import OrderStore
+
+
+class Status(Enum):
+    OPEN = "open"
+    CANCELED = "canceled"
+
+
+class TestOrderStore:
+    def test_fresh_open_order(self):
+        store = OrderStore()
+        store.put("1", {"id": "1"}, "open")
+        assert store.get("1") == {"id": "1"}
+        assert store.get("2") is None
+
+    def test_stale_open_order(self):
+        store = OrderStore(max_age=0)
+        store.put("1", {"id": "1"}, "open")
+        assert store.get("1") is None
+
+    def test_terminal_order_never_stale(self):
+        store = OrderStore(max_age=0)
+        store.put("1", {"id": "1"}, Status.CANCELED)
+        assert store.get("1") == {"id": "1"}
+
+    def test_add_keeps_known_state(self):
+        store = OrderStore()
+        store.put("1", "filled", "closed")
+        store.add("1", "created", "open")
+        assert store.get("1") == "filled"
+
+    def test_invalidate(self):
+        store = OrderStore()
+        store.put("1", "open", Status.OPEN)
+        store.put("2", "canceled", "canceled")
+        store.invalidate("1")
+        store.invalidate("2")
+        assert store.get("1") is None
+        assert store.get("2") == "canceled"
+
+    def test_invalidate_open(self):
+        store = OrderStore()
+        store.put("1", "open", "open")
+        store.put("2", "closed", "closed")
+        store.invalidate_open()
+        assert store.get("1") is None
+        assert store.get("2") == "closed"
+
+    def test_maxsize(self):
+        store = OrderStore(maxsize=2)
+        for order_id in "123":
+            store.put(order_id, order_id, "closed")
+        assert len(store) == 2
+        assert store.get("1") is None
@@ -0,0 +1,106 @@
+import asyncio
+import pytest
+from ccxt.base.errors import InsufficientFunds, RateLimitExceeded, RequestTimeout
+from flash_gate.exchange.enums import Endpoint
+from flash_gate.exchange.pool import AccountMonitor
+from flash_gate.exchange.scheduler import AdaptiveScheduler
+from flash_gate.gate.parsers import ConfigParser
+
+COOLDOWN = 0.05
+
+
+@pytest.fixture
+def scheduler():
+    return AdaptiveScheduler(["a", "b"])
+
+
+@pytest.fixture
+def monitor(scheduler):
+    return AccountMonitor(scheduler, "a", "0", COOLDOWN, max_timeouts=2)
+
+
+def finish(monitor: AccountMonitor, error=None, latency: float = 0) -> None:
+    monitor.request_started(Endpoint.CREATE_ORDER)
+    monitor.request_finished(Endpoint.CREATE_ORDER, latency, error)
+
+
+def acquire_many(scheduler: AdaptiveScheduler, count: int = 3) -> list:
+    async def acquire():
+        return [await scheduler.acquire() for _ in range(count)]
+
+    return asyncio.run(acquire())
+
+
+def recover() -> None:
+    asyncio.run(asyncio.sleep(COOLDOWN * 1.2))
+
+
+class TestAccountMonitor:
+    def test_rate_limit_trips(self, monitor, scheduler):
+        finish(monitor, RateLimitExceeded())
+        assert monitor.half_open
+        assert acquire_many(scheduler) == ["b", "b", "b"]
+
+    def test_timeouts_in_a_row_trip(self, monitor, scheduler):
+        finish(monitor, RequestTimeout())
+        assert not monitor.half_open
+
+        finish(monitor, RequestTimeout())
+        assert monitor.half_open
+        assert "a" not in acquire_many(scheduler)
+
+    def test_success_resets_timeouts(self, monitor):
+        finish(monitor, RequestTimeout())
+        finish(monitor)
+        finish(monitor, RequestTimeout())
+        assert monitor.timeouts == 1
+        assert not monitor.half_open
+
+    def test_half_open_account_gets_one_probe(self, monitor, scheduler):
+        finish(monitor, RateLimitExceeded())
+        recover()
+        assert acquire_many(scheduler, 6).count("a") == 1
+
+    def test_failed_probe_trips_again(self, monitor, scheduler):
+        finish(monitor, RateLimitExceeded())
+        recover()
+        finish(monitor, RequestTimeout())
+
+        assert monitor.half_open
+        assert "a" not in acquire_many(scheduler)
+
+    def test_request_sent_before_recovery_is_not_probe(self, monitor):
+        finish(monitor, RateLimitExceeded())
+        recover()
+        finish(monitor, RequestTimeout(), latency=COOLDOWN * 2)
+
+        assert monitor.half_open
+        assert monitor.timeouts == 1
+
+    @pytest.mark.parametrize("error", [None, InsufficientFunds()])
+    def test_answered_probe_closes(self, monitor, scheduler, error):
+        finish(monitor, RateLimitExceeded())
+        recover()
+        finish(monitor, error)
+        assert not monitor.half_open
+
+        finish(monitor, RequestTimeout())
+        assert acquire_many(scheduler, 6).count("a") == 3
+
+
+class TestBurst:
+    @staticmethod
+    def parse(config: dict, **private) -> float:
+        gate_config = config["data"]["configs"]["gate_config"]
+        gate_config["rate_limits"]["api_requests_per_seconds"]["private"] |= private
+        return ConfigParser(config).private_rate_burst
+
+    def test_defaults_to_rate_limit(self, gate_config):
+        assert self.parse(gate_config, limit=10) == 10
+
+    def test_at_least_one_request(self, gate_config):
+        assert self.parse(gate_config, limit=None) == 1
+        assert self.parse(gate_config, limit=0.5) == 1
+
+    def test_explicit_burst(self, gate_config):
+        assert self.parse(gate_config, limit=10, burst=3) == 3
@@ -0,0 +1,20 @@
+from flash_gate.gate.progress import CancelAllProgress
+
+
+class TestCancelAllProgress:
+    def test_progress(self):
+        progress = CancelAllProgress()
+        for order_id in ("1", "2", "3", "4"):
+            progress.add(order_id, "BTC/USDT")
+
+        progress.cancel("1")
+        progress.fail("2")
+        progress.discard("3")
+
+        assert progress.data() == {
+            "live": ["2", "4"],
+            "canceled": ["1"],
+            "failed": ["2"],
+            "finished": False,
+        }
+        assert progress.data(finished=True)["finished"] is True
@@ -0,0 +1,76 @@
+import asyncio
+import pytest
+from flash_gate.transmitter.enums import OverflowPolicy
+from flash_gate.transmitter.queues import OutboundQueue
+
+
+def drain(queue: OutboundQueue) -> list:
+    return [queue.get_nowait() for _ in range(len(queue))]
+
+
+class TestOutboundQueue:
+    def test_conflate_replaces_pending_message_with_same_key(self):
+        queue = OutboundQueue(OverflowPolicy.CONFLATE, 10)
+        queue.put("btc-1", "BTC/USDT")
+        queue.put("eth-1", "ETH/USDT")
+        queue.put("btc-2", "BTC/USDT")
+        assert drain(queue) == ["btc-2", "eth-1"]
+        assert queue.stats()["conflated"] == 1
+
+    def test_drop_oldest(self):
+        queue = OutboundQueue(OverflowPolicy.DROP_OLDEST, 2)
+        for message in ("a", "b", "c"):
+            queue.put(message)
+        assert drain(queue) == ["b", "c"]
+        assert queue.stats()["dropped"] == 1
+
+    def test_block_rejects_put_when_full(self):
+        queue = OutboundQueue(OverflowPolicy.BLOCK, 2)
+        queue.put("a")
+        queue.put("b")
+        with pytest.raises(asyncio.QueueFull):
+            queue.put("c")
+        assert drain(queue) == ["a", "b"]
+        assert queue.stats()["dropped"] == 0
+        assert queue.stats()["overflows"] == 1
+
+    def test_put_wait_waits_for_room(self):
+        async def put_and_get():
+            queue = OutboundQueue(OverflowPolicy.BLOCK, 1)
+            await queue.put_wait("a")
+            put = asyncio.create_task(queue.put_wait("b"))
+            await asyncio.sleep(0.01)
+            assert not put.done()
+            first = await queue.get()
+            await put
+            return first, await queue.get()
+
+        assert asyncio.run(put_and_get()) == ("a", "b")
+
+    def test_put_wait_does_not_wait_without_block(self):
+        async def put():
+            queue = OutboundQueue(OverflowPolicy.DROP_OLDEST, 1)
+            await queue.put_wait("a")
+            await queue.put_wait("b")
+            return drain(queue)
+
+        assert asyncio.run(put()) == ["b"]
+
+    def test_get_waits_for_message(self):
+        async def put_later_and_get():
+            queue = OutboundQueue(OverflowPolicy.BLOCK, 2)
+            asyncio.get_running_loop().call_later(0.01, queue.put, "a")
+            return await queue.get()
+
+        assert asyncio.run(put_later_and_get()) == "a"
+
+    def test_get_batch_respects_limits(self):
+        async def get_batches():
+            queue = OutboundQueue(OverflowPolicy.DROP_OLDEST, 10)
+            for message in ("aaa", "bbb", "ccc", "ddd"):
+                queue.put(message)
+            first = await queue.get_batch(max_count=3, max_bytes=100)
+            second = await queue.get_batch(max_count=3, max_bytes=1)
+            return first, second
+
+        assert asyncio.run(get_batches()) == (["aaa", "bbb", "ccc"], ["ddd"])
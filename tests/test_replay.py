@@ -0,0 +1,97 @@
+import asyncio
+import pytest
+from ccxt.base.errors import ExchangeError, RequestTimeout
+from flash_gate.replay.recorder import Recorder, Recording
+from flash_gate.replay.stub import ReplayTransmitter, StubExchange
+
+
+def record(path):
+    recorder = Recorder(path)
+    recorder.command('{"action": "get_balance"}')
+    recorder.request("fetch_balance", (), 10, 1_000, {"BTC": {"free": 1}})
+    recorder.request("cancel_order", ("1", "BTC/USDT"), 20, 1_000, {"id": "1"})
+    recorder.request("cancel_order", ("2", "BTC/USDT"), 30, 1_000, {"id": "2"})
+    recorder.request("fetch_order", ("3",), 40, 1_000, error=RequestTimeout("slow"))
+    recorder.close()
+
+
+class TestRecorder:
+    def test_round_trip(self, tmp_path):
+        record(tmp_path / "traffic.ndjson")
+        recording = Recording.load(tmp_path / "traffic.ndjson")
+
+        assert [r["message"] for r in recording.commands] == [
+            '{"action": "get_balance"}'
+        ]
+        assert [r["method"] for r in recording.requests] == [
+            "fetch_balance",
+            "cancel_order",
+            "cancel_order",
+            "fetch_order",
+        ]
+        assert recording.requests[3]["error"]["type"] == "RequestTimeout"
+
+    def test_append_only(self, tmp_path):
+        record(tmp_path / "traffic.ndjson")
+        record(tmp_path / "traffic.ndjson")
+        recording = Recording.load(tmp_path / "traffic.ndjson")
+        assert len(recording.commands) == 2
+
+    def test_sessions_are_rebased(self, tmp_path):
+        path = tmp_path / "traffic.ndjson"
+        path.write_text(
+            '{"t": 1000, "type": "session"}\n'
+            '{"t": 1000, "type": "command", "message": "a"}\n'
+            '{"t": 1500, "type": "command", "message": "b"}\n'
+            '{"t": 10, "type": "session"}\n'
+            '{"t": 30, "type": "command", "message": "c"}\n'
+        )
+        recording = Recording.load(path)
+        assert [r["t"] for r in recording.commands] == [0, 500, 520]
+
+    def test_stream_result_is_copied(self, tmp_path):
+        order_book = {"bids": [[1.0, 2.0]], "asks": []}
+        recorder = Recorder(tmp_path / "traffic.ndjson")
+        recorder.request("watch_order_book", ("BTC/USDT",), 10, 1_000, order_book)
+        order_book["bids"][0][1] = 0.0
+        recorder.close()
+
+        recording = Recording.load(tmp_path / "traffic.ndjson")
+        assert recording.requests[0]["result"]["bids"] == [[1.0, 2.0]]
+
+
+class TestStubExchange:
+    @pytest.fixture
+    def stub(self, tmp_path):
+        record(tmp_path / "traffic.ndjson")
+        recording = Recording.load(tmp_path / "traffic.ndjson")
+        return StubExchange(recording.requests, speed=None)
+
+    def test_matches_arguments(self, stub):
+        async def cancel():
+            second = await stub.cancel_order("2", "BTC/USDT")
+            first = await stub.cancel_order("1", "BTC/USDT")
+            return first, second
+
+        assert asyncio.run(cancel()) == ({"id": "1"}, {"id": "2"})
+
+    def test_falls_back_to_method(self, stub):
+        assert asyncio.run(stub.cancel_order("9", "ETH/USDT")) == {"id": "1"}
+
+    def test_recorded_error(self, stub):
+        with pytest.raises(RequestTimeout):
+            asyncio.run(stub.fetch_order("3"))
+
+    def test_unanswered(self, stub):
+        asyncio.run(stub.fetch_balance())
+        with pytest.raises(ExchangeError):
+            asyncio.run(stub.fetch_balance())
+        assert stub.unanswered == {"fetch_balance": 1}
+
+
+class TestReplayTransmitter:
+    def test_counts_destinations(self):
+        transmitter = ReplayTransmitter()
+        transmitter.offer({}, "core", "logs")
+        transmitter.offer_raw("{}", "logs")
+        assert transmitter.offered == {"core": 1, "logs": 2}
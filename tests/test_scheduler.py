@@ -0,0 +1,109 @@
+import asyncio
+from time import monotonic
+from flash_gate.exchange.scheduler import AdaptiveScheduler, Scheduler, TokenBucket
+
+
+class TestTokenBucket:
+    def test_unlimited_bucket_never_waits(self):
+        bucket = TokenBucket(None)
+        for _ in range(100):
+            bucket.consume(monotonic())
+        assert bucket.remaining(monotonic()) == 0
+
+    def test_empty_bucket_waits_for_refill(self):
+        bucket = TokenBucket(10)
+        now = monotonic()
+        bucket.consume(now)
+        assert round(bucket.remaining(now), 2) == 0.1
+
+
+class TestScheduler:
+    def test_unlimited_scheduler_rotates_items(self):
+        scheduler = Scheduler(["a", "b", "c"])
+
+        async def acquire_many():
+            return [await scheduler.acquire() for _ in range(6)]
+
+        assert asyncio.run(acquire_many()) == ["a", "b", "c", "a", "b", "c"]
+
+    def test_limited_scheduler_returns_soonest_free_item(self):
+        scheduler = Scheduler(["a", "b"], rate=20)
+
+        async def acquire_many():
+            start = monotonic()
+            items = [await scheduler.acquire() for _ in range(4)]
+            return items, monotonic() - start
+
+        items, elapsed = asyncio.run(acquire_many())
+        assert sorted(items) == ["a", "a", "b", "b"]
+        assert 0.04 <= elapsed < 0.5
+
+    def test_exclusive_acquire_skips_busy_items(self):
+        scheduler = Scheduler(["a", "b"])
+
+        async def acquire_exclusive():
+            first = await scheduler.acquire(exclusive=True)
+            second = await scheduler.acquire(exclusive=True)
+            waiter = asyncio.create_task(scheduler.acquire(exclusive=True))
+            await asyncio.sleep(0.01)
+            assert not waiter.done()
+            scheduler.release(first)
+            return first, second, await waiter
+
+        assert asyncio.run(acquire_exclusive()) == ("a", "b", "a")
+
+
+class TestAdaptiveScheduler:
+    def test_prefers_lowest_latency(self):
+        scheduler = AdaptiveScheduler(["a", "b"])
+        scheduler.request_finished("a", 0.5)
+        scheduler.request_finished("b", 0.1)
+
+        async def acquire_many():
+            return [await scheduler.acquire() for _ in range(3)]
+
+        assert asyncio.run(acquire_many()) == ["b", "b", "b"]
+
+    def test_prefers_most_remaining_budget(self):
+        scheduler = AdaptiveScheduler(["a", "b"], rate=1, burst=3)
+        scheduler.slots[0].bucket.tokens = 1
+        scheduler.request_finished("b", 1.0)
+
+        async def acquire():
+            return await scheduler.acquire()
+
+        assert asyncio.run(acquire()) == "b"
+
+    def test_tripped_item_is_skipped(self):
+        scheduler = AdaptiveScheduler(["a", "b"])
+        scheduler.trip("a", 60)
+
+        async def acquire_many():
+            return [await scheduler.acquire() for _ in range(3)]
+
+        assert asyncio.run(acquire_many()) == ["b", "b", "b"]
+
+    def test_tripped_item_is_probed_once(self):
+        scheduler = AdaptiveScheduler(["a", "b"])
+        scheduler.trip("a", 0.02)
+
+        async def acquire_after_recovery():
+            await asyncio.sleep(0.03)
+            return [await scheduler.acquire() for _ in range(4)]
+
+        assert asyncio.run(acquire_after_recovery()).count("a") == 1
+        scheduler.close("a")
+        assert asyncio.run(acquire_after_recovery()).count("a") == 2
+
+    def test_waits_for_recovery_when_all_tripped(self):
+        scheduler = AdaptiveScheduler(["a"])
+        scheduler.trip("a", 0.02)
+
+        async def acquire():
+            start = monotonic()
+            item = await scheduler.acquire()
+            return item, monotonic() - start
+
+        item, elapsed = asyncio.run(acquire())
+        assert item == "a"
+        assert elapsed >= 0.015
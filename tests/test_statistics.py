@@ -1,5 +1,5 @@
 import statistics
-from flash_gate.gate.statistics import percentile
+from flash_gate.gate.statistics import LatencyHistogram, percentile
 import pytest
 
 DATA = [1, 2, 2, 2, 3, 3, 4, 4, 5, 5, 6, 6, 7, 7, 7, 7, 8, 8, 10, 10]
@@ -31,3 +31,44 @@ class TestPercentile:
     def test_hundred(self):
         hundred_percentile = percentile(self.quantiles, "100")
         assert round(hundred_percentile, 2) == 10
+
+
+class TestLatencyHistogram:
+    def test_empty_histogram_raises_exception(self):
+        with pytest.raises(Exception):
+            LatencyHistogram().percentile("50")
+
+    def test_small_values_are_exact(self):
+        histogram = LatencyHistogram()
+        for value in DATA:
+            histogram.record(value)
+        assert histogram.percentile("50") == 5
+        assert histogram.percentile("90") == 8
+        assert histogram.percentile("100") == 10
+
+    def test_large_values_within_relative_error(self):
+        histogram = LatencyHistogram()
+        for value in range(1, 100_001):
+            histogram.record(value)
+        for n, expected in (("50", 50_000), ("90", 90_000), ("99", 99_000)):
+            assert abs(histogram.percentile(n) - expected) / expected < 0.01
+
+    def test_values_above_max_are_clamped(self):
+        histogram = LatencyHistogram(max_value=1000)
+        histogram.record(10**9)
+        assert histogram.percentile("100") == 1000
+
+    def test_merge(self):
+        first, second = LatencyHistogram(), LatencyHistogram()
+        for value in DATA[:10]:
+            first.record(value)
+        for value in DATA[10:]:
+            second.record(value)
+        first.merge(second)
+        assert len(first) == len(DATA)
+        assert first.percentile("50") == 5
+
+    def test_percentiles_keys(self):
+        histogram = LatencyHistogram()
+        histogram.record(1)
+        assert list(histogram.percentiles()) == ["50", "90", "99", "99.99"]
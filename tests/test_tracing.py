@@ -0,0 +1,43 @@
+import asyncio
+from time import monotonic_ns
+from flash_gate.gate.enums import TraceStage
+from flash_gate.gate.tracing import CommandTracer
+
+
+class TestCommandTracer:
+    def test_mark_without_trace_is_ignored(self):
+        tracer = CommandTracer()
+        tracer.mark(TraceStage.REPLY)
+        assert tracer.metrics() == {}
+
+    def test_stages_are_recorded_per_action(self):
+        tracer = CommandTracer()
+
+        async def command():
+            trace = tracer.start("1", "create_orders", monotonic_ns())
+            tracer.mark(TraceStage.DISPATCH)
+            await asyncio.gather(child(), child())
+            return trace
+
+        async def child():
+            tracer.mark(TraceStage.REPLY)
+
+        trace = asyncio.run(command())
+        stages = [stage for stage, _ in trace.stages]
+        assert stages == [TraceStage.DISPATCH, TraceStage.REPLY, TraceStage.REPLY]
+
+        metrics = tracer.metrics()["create_orders"]
+        assert metrics["count"] == 1
+        assert set(metrics) == {"count", "dispatch", "reply"}
+        assert list(metrics["reply"]) == ["50", "90", "99", "99.99"]
+
+    def test_reset(self):
+        tracer = CommandTracer()
+
+        async def command():
+            tracer.start("1", "get_balance", monotonic_ns())
+            tracer.mark(TraceStage.REPLY)
+
+        asyncio.run(command())
+        tracer.reset()
+        assert tracer.metrics() == {}